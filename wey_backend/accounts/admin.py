@@ -1,4 +1,38 @@
 from django.contrib import admin
-from .models import User
+from django.contrib.admin.views.main import ChangeList
 
-admin.site.register(User)
+from wey.admin import ScalableModelAdmin
+
+from .models import FriendshipRequest, User
+from .utils import attach_friend_counts
+
+
+class UserChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        # One grouped query for the page instead of a COUNT per row.
+        attach_friend_counts(self.result_list)
+
+
+@admin.register(User)
+class UserAdmin(ScalableModelAdmin):
+    list_display = ("email", "name", "friends_count", "is_active", "date_joined")
+    search_fields = ("email__startswith",)
+    ordering = ("-date_joined",)
+    # The default widget would load every user into a <select>.
+    raw_id_fields = ("friends",)
+
+    def get_changelist(self, request, **kwargs):
+        return UserChangeList
+
+    @admin.display(description="Friends")
+    def friends_count(self, user):
+        return user.friends_total
+
+
+@admin.register(FriendshipRequest)
+class FriendshipRequestAdmin(ScalableModelAdmin):
+    list_display = ("id", "created_by", "created_for", "status", "created_at")
+    list_select_related = ("created_by", "created_for")
+    autocomplete_fields = ("created_by", "created_for")
+    search_fields = ("created_by__email__startswith",)
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0005_uuid7_ids"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["email"],
+                name="user_email_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
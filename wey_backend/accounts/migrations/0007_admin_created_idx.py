@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0006_user_email_prefix_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="friendshiprequest",
+            index=models.Index(
+                fields=["created_at", "id"], name="friendship_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["date_joined", "id"], name="user_joined_idx"),
+        ),
+    ]
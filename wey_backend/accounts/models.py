@@ -1,14 +1,14 @@
-import uuid
-
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, UserManager
 from django.utils import timezone
 
+from wey.ids import uuid7
+
 from .managers import CustomUserManager
 
 
 class User(AbstractBaseUser, PermissionsMixin):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     email = models.EmailField(unique=True)
     name = models.CharField(max_length=255, blank=True, default="")
     avatar = models.ImageField(upload_to="avatars", blank=True, null=True)
@@ -27,6 +27,20 @@ class User(AbstractBaseUser, PermissionsMixin):
     EMAIL_FIELD = "email"
     REQUIRED_FIELDS = ["name"]
 
+    class Meta:
+        indexes = [
+            # The unique index can't answer the admin's email__startswith
+            # (LIKE 'x%') on PostgreSQL unless the collation is "C". Other
+            # databases ignore the opclass and get a plain index.
+            models.Index(
+                fields=["email"],
+                name="user_email_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            # Newest first in the admin, users keep their pre-uuid7 ids.
+            models.Index(fields=["date_joined", "id"], name="user_joined_idx"),
+        ]
+
 
 class FriendshipRequest(models.Model):
     PENDING = "pending"
@@ -39,7 +53,7 @@ class FriendshipRequest(models.Model):
         (REJECTED, "Rejected"),
     )
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
         User, related_name="created_friendship_requests", on_delete=models.CASCADE
@@ -48,3 +62,9 @@ class FriendshipRequest(models.Model):
         User, related_name="received_friendship_requests", on_delete=models.CASCADE
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+
+    class Meta:
+        indexes = [
+            # Newest first in the admin, requests keep their pre-uuid7 ids.
+            models.Index(fields=["created_at", "id"], name="friendship_created_idx")
+        ]
@@ -1,23 +1,66 @@
 from rest_framework import serializers
 
+from wey.serializers import SparseFieldsMixin
+
 from .models import User, FriendshipRequest
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     friends_count = serializers.SerializerMethodField("get_friends_count")
+    # Comes from attach_friend_counts() or a friends_total annotation.
+    method_sources = {"friends_count": []}
 
     def get_friends_count(self, user):
+        if hasattr(user, "friends_total"):
+            return user.friends_total
         return user.friends.count()
 
     class Meta:
         model = User
-        fields = ("id", "name", "email", "friends_count")
+        fields = ("id", "name", "email", "avatar", "friends_count")
+
+
+class UserSummarySerializer(UserSerializer):
+    """
+    UserSerializer without friends_count, for users embedded in responses
+    cached per post (wey.cache.cache_response), which friendship changes
+    don't invalidate.
+    """
+
+    class Meta(UserSerializer.Meta):
+        fields = ("id", "name", "email", "avatar")
 
 
-class FrienshipRequestSerializer(serializers.ModelSerializer):
+class FrienshipRequestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     created_for = UserSerializer(read_only=True)
 
     class Meta:
         model = FriendshipRequest
         fields = ("id", "created_by", "created_for")
+
+
+class FriendshipRequestBatchSerializer(serializers.Serializer):
+    MAX_BATCH_SIZE = 500
+
+    accepted = serializers.ListField(
+        child=serializers.UUIDField(), required=False, max_length=MAX_BATCH_SIZE
+    )
+    rejected = serializers.ListField(
+        child=serializers.UUIDField(), required=False, max_length=MAX_BATCH_SIZE
+    )
+
+    def validate(self, data):
+        accepted = set(data.get("accepted", []))
+        rejected = set(data.get("rejected", []))
+        if not accepted and not rejected:
+            raise serializers.ValidationError("No friendship requests given.")
+        if accepted & rejected:
+            raise serializers.ValidationError(
+                "A friendship request cannot be both accepted and rejected."
+            )
+        if len(accepted) + len(rejected) > self.MAX_BATCH_SIZE:
+            raise serializers.ValidationError(
+                f"At most {self.MAX_BATCH_SIZE} friendship requests per batch."
+            )
+        return data
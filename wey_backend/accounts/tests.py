@@ -192,3 +192,114 @@ class GetFriendsViewTest(APITestCase):
         self.assertEqual(len(requests), 1)
         self.assertTrue(requests[0]["created_for"]["id"], str(self.user_c.id))
         self.assertTrue(requests[0]["created_by"]["id"], str(self.user_a.id))
+
+    def test_sparse_fields_per_section(self):
+        FriendshipRequest.objects.create(
+            created_for=self.user_b, created_by=self.user_c
+        )
+        url = reverse("friends", kwargs={"id": self.user_b.id})
+        response = self.client.get(
+            url, {"fields": "user.name,friends.id,requests.created_by.name"}
+        )
+
+        self.assertEqual(response.data["user"], {"name": "myself"})
+        self.assertEqual(response.data["friends"], [{"id": str(self.user_a.id)}])
+        self.assertEqual(response.data["requests"], [{"created_by": {"name": "ccc"}}])
+
+
+class BatchFriendRequestViewTest(APITestCase):
+    def setUp(self):
+        self.myself = User.objects.create_user(
+            email="myself@abc.com", name="myself", password="foo"
+        )
+        self.senders = [
+            User.objects.create_user(
+                email=f"sender{i}@abc.com", name=f"sender{i}", password="foo"
+            )
+            for i in range(3)
+        ]
+        self.requests = [
+            FriendshipRequest.objects.create(created_by=sender, created_for=self.myself)
+            for sender in self.senders
+        ]
+        user_refresh_token = RefreshToken.for_user(self.myself)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {user_refresh_token.access_token}"
+        )
+
+    def test_accept_and_reject_in_one_call(self):
+        url = reverse("batch_handle_requests")
+        data = {
+            "accepted": [str(self.requests[0].id), str(self.requests[1].id)],
+            "rejected": [str(self.requests[2].id)],
+        }
+        with self.assertNumQueries(6):
+            response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["accepted", "accepted", "rejected"],
+        )
+        self.assertEqual(
+            set(self.myself.friends.values_list("id", flat=True)),
+            {self.senders[0].id, self.senders[1].id},
+        )
+        self.assertEqual(self.senders[0].friends.get(), self.myself)
+        self.assertEqual(
+            FriendshipRequest.objects.filter(status=FriendshipRequest.PENDING).count(),
+            0,
+        )
+
+    def test_unknown_and_foreign_requests_are_reported(self):
+        foreign = FriendshipRequest.objects.create(
+            created_by=self.myself, created_for=self.senders[0]
+        )
+        missing = uuid.uuid4()
+        url = reverse("batch_handle_requests")
+        data = {"accepted": [str(foreign.id), str(missing)]}
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["not_found", "not_found"],
+        )
+        self.assertEqual(self.myself.friends.count(), 0)
+
+    def test_same_request_accepted_and_rejected(self):
+        url = reverse("batch_handle_requests")
+        id = str(self.requests[0].id)
+        response = self.client.post(
+            url, {"accepted": [id], "rejected": [id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UserAdminTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            name="admin", email="admin@abc.com", password="foo"
+        )
+        for i in range(3):
+            friend = User.objects.create_user(
+                name=f"friend{i}", email=f"friend{i}@abc.com", password="foo"
+            )
+            self.admin.friends.add(friend)
+        self.client.force_login(self.admin)
+
+    def test_changelist_shows_friend_counts(self):
+        response = self.client.get(reverse("admin:accounts_user_changelist"))
+        counts = {
+            user.email: user.friends_total
+            for user in response.context["cl"].result_list
+        }
+        self.assertEqual(counts["admin@abc.com"], 3)
+        self.assertEqual(counts["friend0@abc.com"], 1)
+
+    def test_change_form_does_not_list_every_user(self):
+        response = self.client.get(
+            reverse("admin:accounts_user_change", args=[self.admin.id])
+        )
+        self.assertContains(response, "vManyToManyRawIdAdminField")
+        self.assertNotContains(response, "friend2@abc.com")
@@ -7,6 +7,7 @@ from .views import (
     AddFriendView,
     GetFriendsView,
     HandleFriendRequestView,
+    BatchFriendRequestView,
 )
 
 urlpatterns = [
@@ -14,6 +15,11 @@ urlpatterns = [
     path("signup/", SignUpView.as_view(), name="signup"),
     path("login/", TokenObtainPairView.as_view(), name="token_obtain"),
     path("refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "friends/requests/batch",
+        BatchFriendRequestView.as_view(),
+        name="batch_handle_requests",
+    ),
     path("friends/<uuid:id>", GetFriendsView.as_view(), name="friends"),
     path("friends/<uuid:id>/request", AddFriendView.as_view(), name="add_friend"),
     path(
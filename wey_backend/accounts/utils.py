@@ -1,2 +1,77 @@
 def get_dict_values_string(dict) -> str:
     return " ".join([" ".join(x for x in l) for l in list(dict.values())])
+
+
+def attach_friend_counts(users):
+    """Set friends_total on each user with one grouped query."""
+    from django.db.models import Count
+
+    from .models import User
+
+    users = [user for user in users if not hasattr(user, "friends_total")]
+    if not users:
+        return
+    counts = dict(
+        User.friends.through.objects.filter(from_user_id__in={u.id for u in users})
+        .values_list("from_user_id")
+        .annotate(total=Count("*"))
+    )
+    for user in users:
+        user.friends_total = counts.get(user.id, 0)
+
+
+def attach_requested_friend_counts(serializer, *relations):
+    """
+    attach_friend_counts() for the users embedded under each of `relations`
+    (or the serialized users themselves if none are given), but only when the
+    serializer will actually render their friends_count.
+    """
+    from wey.serializers import is_requested
+
+    for relation in relations or [None]:
+        path = f"{relation}.friends_count" if relation else "friends_count"
+        if not is_requested(serializer, path):
+            continue
+        items = serializer.instance
+        if relation:
+            items = [getattr(item, relation) for item in items]
+        attach_friend_counts(items)
+
+
+def _friends_version(user_id):
+    return f"friends:{user_id}"
+
+
+def get_friend_ids(user):
+    """
+    The set of the user's friend ids, cached until friends_changed() is
+    called for them.
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+
+    from wey.cache import get_versions
+
+    from .models import User
+
+    (version,) = get_versions([_friends_version(user.pk)])
+    key = f"friend_ids:{user.pk}:{version}"
+    ids = cache.get(key)
+    if ids is None:
+        ids = set(
+            User.friends.through.objects.filter(from_user_id=user.pk).values_list(
+                "to_user_id", flat=True
+            )
+        )
+        cache.set(key, ids, settings.FRIEND_IDS_CACHE_TIMEOUT)
+    return ids
+
+
+def friends_changed(*user_ids):
+    """
+    Invalidate get_friend_ids() for these users once the transaction commits.
+    Cached search results show their friends_count until they expire.
+    """
+    from wey.cache import bump_version
+
+    bump_version(*map(_friends_version, user_ids))
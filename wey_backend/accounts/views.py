@@ -1,12 +1,27 @@
+from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import render, get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from .utils import get_dict_values_string
+from deletions.purge import schedule_deletion
+from notifications.models import Notification
+from notifications.utils import notify
+from wey.cache import bump_version
+from wey.serializers import sparse_queryset
+from .utils import (
+    get_dict_values_string,
+    attach_requested_friend_counts,
+    friends_changed,
+)
 from .forms import SignupForm
 from .models import FriendshipRequest, User
-from .serializers import UserSerializer, FrienshipRequestSerializer
+from .serializers import (
+    UserSerializer,
+    FrienshipRequestSerializer,
+    FriendshipRequestBatchSerializer,
+)
 
 
 class MeView(APIView):
@@ -19,6 +34,28 @@ class MeView(APIView):
             }
         )
 
+    def delete(self, request):
+        user = request.user
+        # Deactivating locks the account out immediately (tokens of inactive
+        # users are rejected) and dropping the friendships takes it out of
+        # everyone's feed. Everything else is purged by the deletion worker.
+        with transaction.atomic():
+            User.objects.filter(id=user.id).update(is_active=False)
+            friendships = User.friends.through.objects.filter(
+                Q(from_user=user) | Q(to_user=user)
+            )
+            friends_changed(
+                user.id,
+                *friendships.filter(from_user=user).values_list(
+                    "to_user_id", flat=True
+                ),
+            )
+            friendships.delete()
+            schedule_deletion(user)
+            # Cached post details depend on their author's version.
+            bump_version("search", f"user:{user.id}")
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class SignUpView(APIView):
     authentication_classes = []
@@ -64,6 +101,9 @@ class AddFriendView(APIView):
             FriendshipRequest.objects.create(
                 created_for=sending_to, created_by=request.user
             )
+            notify(
+                sending_to.id, sent_by.id, Notification.FRIEND_REQUEST, sending_to.id
+            )
 
             return Response(
                 {"message": "friendship request created"},
@@ -79,17 +119,35 @@ class AddFriendView(APIView):
 class GetFriendsView(APIView):
     def get(self, request, id):
         user = get_object_or_404(User, id=id)
-        requests = []
+        requests = FriendshipRequest.objects.none()
         if user == request.user:
             requests = FriendshipRequest.objects.filter(
                 created_for=request.user, status=FriendshipRequest.PENDING
             )
         friends = user.friends.all()
+
+        context = {"request": request, "sparse_root": "friends"}
+        friends = sparse_queryset(friends, UserSerializer(many=True, context=context))
+        friends_serializer = UserSerializer(list(friends), many=True, context=context)
+        attach_requested_friend_counts(friends_serializer)
+
+        context = {"request": request, "sparse_root": "requests"}
+        requests = sparse_queryset(
+            requests, FrienshipRequestSerializer(many=True, context=context)
+        )
+        requests_serializer = FrienshipRequestSerializer(
+            list(requests), many=True, context=context
+        )
+        attach_requested_friend_counts(requests_serializer, "created_by", "created_for")
+
+        user_serializer = UserSerializer(
+            user, context={"request": request, "sparse_root": "user"}
+        )
         return Response(
             {
-                "user": UserSerializer(user).data,
-                "friends": UserSerializer(friends, many=True).data,
-                "requests": FrienshipRequestSerializer(requests, many=True).data,
+                "user": user_serializer.data,
+                "friends": friends_serializer.data,
+                "requests": requests_serializer.data,
             },
             status=status.HTTP_200_OK,
         )
@@ -107,5 +165,70 @@ class HandleFriendRequestView(APIView):
 
         if status == FriendshipRequest.ACCEPTED:
             sent_request_user.friends.add(received_request_user)
+            friends_changed(sent_request_user.id, received_request_user.id)
 
         return Response({"msg": "Friend Request updated"})
+
+
+class BatchFriendRequestView(APIView):
+    def post(self, request):
+        serializer = FriendshipRequestBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        wanted = {
+            id: FriendshipRequest.ACCEPTED
+            for id in serializer.validated_data.get("accepted", [])
+        }
+        wanted.update(
+            {
+                id: FriendshipRequest.REJECTED
+                for id in serializer.validated_data.get("rejected", [])
+            }
+        )
+
+        with transaction.atomic():
+            pending = {
+                friend_request.id: friend_request
+                for friend_request in FriendshipRequest.objects.select_for_update().filter(
+                    id__in=wanted.keys(),
+                    created_for=request.user,
+                    status=FriendshipRequest.PENDING,
+                )
+            }
+
+            results = []
+            for id, new_status in wanted.items():
+                friend_request = pending.get(id)
+                if friend_request is None:
+                    results.append({"id": id, "status": "not_found"})
+                    continue
+                friend_request.status = new_status
+                results.append({"id": id, "status": new_status})
+
+            FriendshipRequest.objects.bulk_update(pending.values(), ["status"])
+
+            # friends is symmetrical, so each friendship is a row in both directions.
+            Friendship = User.friends.through
+            Friendship.objects.bulk_create(
+                [
+                    Friendship(from_user_id=from_id, to_user_id=to_id)
+                    for friend_request in pending.values()
+                    if friend_request.status == FriendshipRequest.ACCEPTED
+                    for from_id, to_id in (
+                        (friend_request.created_by_id, request.user.id),
+                        (request.user.id, friend_request.created_by_id),
+                    )
+                ],
+                ignore_conflicts=True,
+            )
+            friends_changed(
+                request.user.id,
+                *(
+                    friend_request.created_by_id
+                    for friend_request in pending.values()
+                    if friend_request.status == FriendshipRequest.ACCEPTED
+                ),
+            )
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
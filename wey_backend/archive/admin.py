@@ -0,0 +1,22 @@
+import uuid
+
+from django.contrib import admin
+from django.db.models import Q
+
+from wey.admin import ScalableModelAdmin
+
+from .models import ArchivedRow
+
+
+@admin.register(ArchivedRow)
+class ArchivedRowAdmin(ScalableModelAdmin):
+    list_display = ("id", "model", "object_id", "created_at", "archived_at")
+    raw_id_fields = ("root", "owner")
+
+    def get_search_results(self, request, queryset, search_term):
+        # A pasted id is more likely the original row's than the archive's.
+        try:
+            id = uuid.UUID(search_term.strip())
+        except ValueError:
+            return queryset.none(), False
+        return queryset.filter(Q(pk=id) | Q(object_id=id)), False
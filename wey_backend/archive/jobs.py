@@ -0,0 +1,194 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from deletions.purge import dependents
+from posts.models import Attachment, Comment, Like, Post
+
+from .models import ArchivedRow
+from .reads import POST, _instance
+
+CHUNK_SIZE = 2000
+
+
+def _data(obj):
+    # JSON values as they are, everything else through value_to_string(),
+    # which unlike DjangoJSONEncoder keeps the microseconds of datetimes.
+    data = {}
+    for field in obj._meta.concrete_fields:
+        value = field.value_from_object(obj)
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            value = field.value_to_string(obj)
+        data[field.attname] = value
+    return data
+
+
+def archivable_posts(cutoff):
+    """
+    Live posts created before `cutoff` with no likes or comments since.
+    Posts with attachments stay hot: their files are only cleaned up through
+    the Attachment rows. So do posts with comments waiting to be purged.
+    """
+    recent = {"post": OuterRef("pk"), "created_at__gte": cutoff}
+    return (
+        Post.objects.filter(created_at__lt=cutoff, is_deleted=False)
+        .exclude(Exists(Like.objects.filter(**recent)))
+        .exclude(Exists(Comment.objects.filter(**recent)))
+        .exclude(Exists(Comment.objects.filter(post=OuterRef("pk"), is_deleted=True)))
+        .exclude(Exists(Attachment.objects.filter(post=OuterRef("pk"))))
+        .order_by("created_at")
+    )
+
+
+class Archiver:
+    """
+    Move posts, with everything that cascades from them, into ArchivedRow in
+    batches of about `batch_size` rows (going by the posts' stored counters),
+    one short transaction per batch. Rows are copied top-down and deleted
+    bottom-up, so the deletes never cascade.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        self.archived_posts = 0
+        self.archived_rows = 0
+        self._pending = []
+
+    def run(self, cutoff=None):
+        if cutoff is None:
+            cutoff = timezone.now() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        while True:
+            with transaction.atomic():
+                candidates = archivable_posts(cutoff).select_for_update()
+                posts, rows = [], 0
+                for post in candidates[: self.batch_size]:
+                    rows += 1 + post.likes_count + post.comments_count
+                    if posts and rows > self.batch_size:
+                        break
+                    posts.append(post)
+                if not posts:
+                    return self.archived_posts
+                self.archive(posts)
+
+    def archive(self, posts):
+        roots = {
+            post.pk: ArchivedRow(
+                model=post._meta.label_lower,
+                object_id=post.pk,
+                owner_id=post.created_by_id,
+                created_at=post.created_at,
+                data=_data(post),
+            )
+            for post in posts
+        }
+        ArchivedRow.objects.bulk_create(roots.values())
+        deletes = []
+        self._collect(Post, {pk: pk for pk in roots}, roots, deletes)
+        self._flush()
+        deletes.append(Post._base_manager.filter(pk__in=list(roots)))
+
+        for queryset in deletes:
+            queryset.delete()
+        self.archived_posts += len(posts)
+        self.archived_rows += len(roots)
+
+    def _collect(self, model, parents, roots, deletes):
+        # parents maps the primary keys of this level to their post's.
+        for relation, on_delete in dependents(model):
+            if on_delete is not models.CASCADE:
+                continue
+            child_model = relation.related_model
+            related = child_model._base_manager.filter(
+                **{f"{relation.field.name}__in": list(parents)}
+            )
+            # Only remember the children's posts if there is another level.
+            nested = any(dependents(child_model))
+            children = {}
+            for obj in related.iterator(chunk_size=CHUNK_SIZE):
+                post_pk = parents[getattr(obj, relation.field.attname)]
+                root = roots[post_pk]
+                self._add(
+                    ArchivedRow(
+                        model=obj._meta.label_lower,
+                        object_id=obj.pk,
+                        root=root,
+                        owner_id=getattr(obj, "created_by_id", root.owner_id),
+                        created_at=getattr(obj, "created_at", root.created_at),
+                        data=_data(obj),
+                    )
+                )
+                if nested:
+                    children[obj.pk] = post_pk
+            if children:
+                self._collect(child_model, children, roots, deletes)
+            deletes.append(related)
+
+    def _add(self, row):
+        self._pending.append(row)
+        if len(self._pending) >= CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self):
+        ArchivedRow.objects.bulk_create(self._pending)
+        self.archived_rows += len(self._pending)
+        self._pending = []
+
+
+def _cascade_models(model):
+    # Labels of the models archived with `model`, parents before children.
+    for relation, on_delete in dependents(model):
+        if on_delete is models.CASCADE:
+            yield relation.related_model._meta.label_lower
+            yield from _cascade_models(relation.related_model)
+
+
+def _insert_raw(model, objs):
+    # bulk_create() runs pre_save(), which would give auto_now(_add) fields the
+    # current time. A raw insert keeps the archived values, like loaddata does.
+    for start in range(0, len(objs), CHUNK_SIZE):
+        model._base_manager._insert(
+            objs[start : start + CHUNK_SIZE],
+            fields=model._meta.local_concrete_fields,
+            raw=True,
+        )
+
+
+def restore(post_id):
+    """
+    Move the archived post `post_id` and everything archived with it back into
+    the hot tables, e.g. because someone likes or comments on it. Each model is
+    inserted in chunks of CHUNK_SIZE, parents before children, with the
+    original field values. Returns False if the post isn't archived, or is
+    deleted or belongs to a deactivated account.
+    """
+    with transaction.atomic():
+        row = (
+            ArchivedRow.objects.select_for_update()
+            .filter(
+                model=POST,
+                object_id=post_id,
+                data__is_deleted=False,
+                owner__is_active=True,
+            )
+            .first()
+        )
+        if row is None:
+            return False
+        children = defaultdict(list)
+        for child in ArchivedRow.objects.filter(root=row).iterator(
+            chunk_size=CHUNK_SIZE
+        ):
+            children[child.model].append(_instance(child))
+
+        _insert_raw(Post, [_instance(row)])
+        for label in _cascade_models(Post):
+            if label in children:
+                _insert_raw(apps.get_model(label), children.pop(label))
+        ArchivedRow.objects.filter(root=row).delete()
+        row.delete()
+    return True
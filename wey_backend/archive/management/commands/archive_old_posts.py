@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from archive.jobs import Archiver
+
+
+class Command(BaseCommand):
+    help = "Move old posts nobody interacts with any more to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="archive posts older than this (default ARCHIVE_AFTER_DAYS)",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = None
+        if options["days"] is not None:
+            cutoff = timezone.now() - timedelta(days=options["days"])
+        archiver = Archiver(batch_size=options["batch_size"])
+        archiver.run(cutoff)
+        self.stdout.write(
+            f"Archived {archiver.archived_posts} posts "
+            f"({archiver.archived_rows} rows)."
+        )
@@ -0,0 +1,52 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from accounts.models import User
+from wey.ids import uuid7
+
+
+class ArchivedRow(models.Model):
+    """
+    A post, or a row that belonged to it (like, comment, revision, ...),
+    moved out of the hot tables by archive/jobs.py. `data` holds its field
+    values; archive/reads.py turns them back into unsaved model instances.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # "app_label.modelname" and primary key of the original row.
+    model = models.CharField(max_length=100)
+    object_id = models.UUIDField()
+    # The archived post this row belongs to, None for the post itself.
+    root = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        related_name="+",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    # Who wrote the row (the post's author for rows without created_by), so
+    # account deletion purges their archive too.
+    owner = models.ForeignKey(
+        User, related_name="+", on_delete=models.CASCADE, db_index=False
+    )
+    created_at = models.DateTimeField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "object_id"], name="archived_row_uniq"
+            )
+        ]
+        indexes = [
+            # A profile's archived posts, newest first.
+            models.Index(
+                fields=["owner", "model", "-created_at"], name="archive_owner_idx"
+            ),
+            # Everything under an archived post.
+            models.Index(
+                fields=["root", "model", "created_at"], name="archive_root_idx"
+            ),
+        ]
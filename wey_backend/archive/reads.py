@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from accounts.models import User
+from wey.pagination import before_cursor
+
+from .models import ArchivedRow
+
+POST = "posts.post"
+
+
+def _instance(row):
+    """An unsaved model instance with the archived row's field values."""
+    model = apps.get_model(row.model)
+    obj = model()
+    for field in model._meta.concrete_fields:
+        setattr(obj, field.attname, field.to_python(row.data[field.attname]))
+    return obj
+
+
+def _posts():
+    # Archived posts deleted by their author wait for the deletion worker.
+    return ArchivedRow.objects.filter(model=POST, data__is_deleted=False)
+
+
+def archived_posts(user, cursor, limit, viewer):
+    """
+    Up to `limit` of `user`'s archived posts after the (created_at, id)
+    `cursor` (None for the newest), newest first, with created_by and
+    liked_by_viewer set. A range scan of archive_owner_idx plus one query for
+    the viewer's likes.
+    """
+    rows = list(
+        before_cursor(
+            _posts().filter(owner=user), "created_at", cursor, id_field="object_id"
+        )[:limit]
+    )
+    liked = set(
+        ArchivedRow.objects.filter(
+            root__in=rows, model="posts.like", owner=viewer
+        ).values_list("root_id", flat=True)
+    )
+    posts = []
+    for row in rows:
+        post = _instance(row)
+        post.created_by = user
+        post.liked_by_viewer = row.id in liked
+        posts.append(post)
+    return posts
+
+
+def hot_window_start():
+    """
+    Posts created since then are never archived. Only holds while
+    ARCHIVE_AFTER_DAYS isn't raised after posts have been archived.
+    """
+    return timezone.now() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+
+
+def page_with_archive(hot, user, cursor, limit, viewer):
+    """
+    A page of `user`'s posts after the (created_at, id) `cursor` (None for the
+    newest), newest first: `hot` filtered to the page, falling through to the
+    archive only when the page reaches past the hot window or runs out of hot
+    posts. Returns (posts, has_more).
+    """
+    fields, defer = hot.query.deferred_loading
+    if fields and not defer:
+        # Sparse fields: the page is merged by created_at, so load it too.
+        hot = hot.only(*fields, "created_at")
+    posts = list(before_cursor(hot, "created_at", cursor)[: limit + 1])
+    if len(posts) <= limit or posts[-1].created_at < hot_window_start():
+        posts += archived_posts(user, cursor, limit + 1, viewer)
+        posts.sort(key=lambda post: (post.created_at, post.pk), reverse=True)
+    for post in posts:
+        post.created_by = user
+    return posts[:limit], len(posts) > limit
+
+
+def archived_post(id):
+    """
+    The archived post `id` with its live comments as `archived_comments`,
+    oldest first, or None if it isn't archived.
+    """
+    row = _posts().filter(object_id=id, owner__is_active=True).first()
+    if row is None:
+        return None
+    post = _instance(row)
+    comments = [
+        _instance(child)
+        for child in ArchivedRow.objects.filter(
+            root=row, model="posts.comment"
+        ).order_by("created_at")
+    ]
+    post.archived_comments = [c for c in comments if not c.is_deleted]
+    users = User.objects.in_bulk(
+        {post.created_by_id} | {c.created_by_id for c in post.archived_comments}
+    )
+    post.created_by = users[post.created_by_id]
+    for comment in post.archived_comments:
+        comment.created_by = users[comment.created_by_id]
+    return post
+
+
+def archived_post_row(id, owner):
+    """The ArchivedRow of `owner`'s archived post `id`, or None."""
+    return _posts().filter(object_id=id, owner=owner).first()
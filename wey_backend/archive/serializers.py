@@ -0,0 +1,9 @@
+from posts.serializers import CommentSerializer, PostDetailSerializer
+
+
+class ArchivedPostDetailSerializer(PostDetailSerializer):
+    """PostDetailSerializer for a post from archive.reads.archived_post()."""
+
+    comment_set = CommentSerializer(
+        source="archived_comments", many=True, read_only=True
+    )
@@ -0,0 +1,236 @@
+import io
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from deletions.purge import claim_next, run_deletion, schedule_deletion
+from posts.models import Attachment, Comment, CommentRevision, Like, Post, PostReach
+from posts.views import edit_body
+
+from .jobs import Archiver, restore
+from .models import ArchivedRow
+from .reads import _instance
+
+
+@override_settings(ARCHIVE_AFTER_DAYS=365, MEDIA_ROOT=tempfile.mkdtemp())
+class ArchiveTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="test", email="test@gmail.com", password="test"
+        )
+        self.friend = get_user_model().objects.create_user(
+            name="friend", email="friend@gmail.com", password="test"
+        )
+        refresh = RefreshToken.for_user(self.friend)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def create_post(self, days_ago, body="post"):
+        post = Post.objects.create(body=body, created_by=self.user)
+        created_at = timezone.now() - timedelta(days=days_ago)
+        Post.objects.filter(id=post.id).update(created_at=created_at)
+        post.created_at = created_at
+        return post
+
+    def create_old_post(self):
+        post = self.create_post(days_ago=400, body="old")
+        Like.objects.create(post=post, created_by=self.friend)
+        comment = Comment.objects.create(body="hi", post=post, created_by=self.friend)
+        edit_body(comment, CommentRevision, "hello")
+        Comment.objects.create(body="gone", post=post, created_by=self.user)
+        PostReach.objects.create(post=post, views=3, sketch=b"\x01\x00\x01\x02")
+        old = timezone.now() - timedelta(days=400)
+        Like.objects.filter(post=post).update(created_at=old)
+        Comment.objects.filter(post=post).update(created_at=old)
+        return post
+
+    def test_archives_old_posts_with_their_rows(self):
+        post = self.create_old_post()
+        recent = self.create_post(days_ago=1)
+        liked_lately = self.create_post(days_ago=400)
+        Like.objects.create(post=liked_lately, created_by=self.friend)
+        with_image = self.create_post(days_ago=400)
+        Attachment(post=with_image, created_by=self.user).image.save(
+            "a.png", ContentFile(b"png")
+        )
+
+        archiver = Archiver()
+        self.assertEqual(archiver.run(), 1)
+        # The post, its reach, like, 2 comments and the comment revision.
+        self.assertEqual(archiver.archived_rows, 6)
+        self.assertEqual(ArchivedRow.objects.count(), 6)
+        self.assertFalse(Post.objects.filter(id=post.id).exists())
+        self.assertFalse(Comment.objects.filter(post_id=post.id).exists())
+        self.assertFalse(CommentRevision.objects.exists())
+        self.assertEqual(
+            set(Post.objects.values_list("id", flat=True)),
+            {recent.id, liked_lately.id, with_image.id},
+        )
+
+        row = ArchivedRow.objects.get(model="posts.post", object_id=post.id)
+        restored = _instance(row)
+        self.assertEqual(restored.body, "old")
+        self.assertEqual(restored.created_at, post.created_at)
+        reach = _instance(ArchivedRow.objects.get(model="posts.postreach"))
+        self.assertEqual(reach.sketch, b"\x01\x00\x01\x02")
+
+    def test_batches(self):
+        for i in range(5):
+            self.create_post(days_ago=400 + i)
+        archiver = Archiver(batch_size=2)
+        self.assertEqual(archiver.run(), 5)
+        self.assertFalse(Post.objects.exists())
+
+    def test_command(self):
+        self.create_post(days_ago=40)
+        call_command("archive_old_posts", days=30, stdout=io.StringIO())
+        self.assertFalse(Post.objects.exists())
+
+    def test_post_detail_falls_through_to_archive(self):
+        post = self.create_old_post()
+        Comment.objects.filter(post=post, body="gone").update(is_deleted=True)
+        # Soft-deleted comments keep their post hot until they are purged.
+        Archiver().run()
+        self.assertTrue(Post.objects.filter(id=post.id).exists())
+
+        Comment.objects.filter(post=post, body="gone").delete()
+        Archiver().run()
+        response = self.client.get(reverse("post_detail", args=[post.id]))
+        self.assertEqual(response.status_code, 200)
+        data = response.data["post"]
+        self.assertEqual(data["id"], str(post.id))
+        self.assertEqual(data["created_by"]["id"], str(self.user.id))
+        self.assertEqual([c["body"] for c in data["comment_set"]], ["hello"])
+
+        response = self.client.get(reverse("post_detail", args=[self.user.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_liking_archived_post_restores_it(self):
+        post = self.create_old_post()
+        Archiver().run()
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        response = self.client.post(reverse("like_post", args=[post.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ArchivedRow.objects.exists())
+        restored = Post.objects.get(id=post.id)
+        self.assertEqual(restored.created_at, post.created_at)
+        self.assertEqual(Like.objects.filter(post=post).count(), 2)
+        self.assertEqual(CommentRevision.objects.count(), 1)
+        # The new like keeps it hot.
+        self.assertEqual(Archiver().run(), 0)
+
+        response = self.client.post(
+            reverse("create_comment", args=[post.id]), {"body": "again"}
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_restore_cost_does_not_grow_with_likes(self):
+        def restore_queries(likers):
+            post = self.create_old_post()
+            for i in range(likers):
+                user = get_user_model().objects.create_user(
+                    name=f"fan{i}", email=f"fan{i}-{post.id}@gmail.com", password="x"
+                )
+                Like.objects.create(post=post, created_by=user)
+            Like.objects.filter(post=post).update(
+                created_at=timezone.now() - timedelta(days=400)
+            )
+            Archiver().run()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertTrue(restore(post.id))
+            return len(queries)
+
+        self.assertEqual(restore_queries(1), restore_queries(50))
+
+    def test_profile_posts_page_into_archive(self):
+        archived = self.create_old_post()
+        older = self.create_post(days_ago=500)
+        Archiver().run()
+        recent = self.create_post(days_ago=1)
+        # Older than the hot window but kept hot by a recent like.
+        hot_old = self.create_post(days_ago=450)
+        Like.objects.create(post=hot_old, created_by=self.friend)
+
+        url = reverse("profile_posts", args=[self.user.id])
+        response = self.client.get(url)
+        self.assertEqual(len(response.data["posts"]), 4)
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(url, {"limit": 1})
+        self.assertEqual([p["id"] for p in response.data["posts"]], [str(recent.id)])
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(url, {"before": response.data["next"], "limit": 2})
+        posts = response.data["posts"]
+        self.assertEqual([p["id"] for p in posts], [str(archived.id), str(hot_old.id)])
+        self.assertEqual([p["liked"] for p in posts], [True, True])
+
+        response = self.client.get(url, {"before": response.data["next"], "limit": 2})
+        self.assertEqual([p["id"] for p in response.data["posts"]], [str(older.id)])
+        self.assertIsNone(response.data["next"])
+
+    def test_pages_split_posts_sharing_a_timestamp(self):
+        created_at = self.create_post(days_ago=400).created_at
+        for _ in range(2):
+            self.create_post(days_ago=400)
+        Post.objects.update(created_at=created_at)
+        Archiver().run()
+        for _ in range(3):
+            self.create_post(days_ago=1)
+        # Hot posts with the same timestamp as the archived ones.
+        Post.objects.update(created_at=created_at)
+
+        url = reverse("profile_posts", args=[self.user.id])
+        ids, params = [], {"limit": 2}
+        for _ in range(3):
+            response = self.client.get(url, params)
+            ids += [p["id"] for p in response.data["posts"]]
+            params["before"] = response.data["next"]
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(len(set(ids)), 6)
+
+    def test_hot_page_skips_archive(self):
+        for i in range(3):
+            self.create_post(days_ago=i + 1)
+        url = reverse("profile_posts", args=[self.user.id])
+        # A full page from the hot window never reads the archive.
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {"limit": 2})
+        self.assertEqual(len(response.data["posts"]), 2)
+
+    def test_invalid_cursor(self):
+        url = reverse("profile_posts", args=[self.user.id])
+        response = self.client.get(url, {"before": "2024-01-01T00:00:00"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete_archived_post(self):
+        post = self.create_old_post()
+        Archiver().run()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse("post_detail", args=[post.id]))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(reverse("post_detail", args=[post.id]))
+        self.assertEqual(response.status_code, 404)
+
+        run_deletion(claim_next(), batch_size=2)
+        self.assertFalse(ArchivedRow.objects.exists())
+
+    def test_account_deletion_purges_archive(self):
+        self.create_old_post()
+        Archiver().run()
+        run_deletion(schedule_deletion(self.user), batch_size=2)
+        self.assertFalse(ArchivedRow.objects.exists())
@@ -0,0 +1,74 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from chat.models import Conversation, ConversationMember, Message
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the first inbox page for users with growing numbers of "
+        "conversations. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000]
+        )
+        parser.add_argument("--runs", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for size in options["sizes"]:
+                user = self.make_inbox(size)
+                client = APIClient()
+                client.force_authenticate(user)
+                url = reverse("conversations")
+
+                client.get(url, HTTP_HOST="localhost")
+                started = time.perf_counter()
+                for _ in range(options["runs"]):
+                    with CaptureQueriesContext(connection) as queries:
+                        client.get(url, HTTP_HOST="localhost")
+                elapsed = (time.perf_counter() - started) / options["runs"]
+                self.stdout.write(
+                    f"{size:>6} conversations: {elapsed * 1000:.2f}ms per inbox "
+                    f"page, {len(queries)} queries"
+                )
+            transaction.set_rollback(True)
+
+    def make_inbox(self, size):
+        now = timezone.now()
+        user = User.objects.create_user(
+            name="inbox", email=f"inbox-{size}-{time.time_ns()}@bench.local"
+        )
+        others = User.objects.bulk_create(
+            User(name=f"other{i}", email=f"other-{size}-{i}-{time.time_ns()}@bench")
+            for i in range(size)
+        )
+        conversations = Conversation.objects.bulk_create(
+            Conversation(last_message_at=now - timedelta(minutes=i))
+            for i in range(size)
+        )
+        ConversationMember.objects.bulk_create(
+            ConversationMember(
+                conversation=conversation,
+                user=member,
+                last_message_at=conversation.last_message_at,
+                unread_count=1,
+            )
+            for conversation, other in zip(conversations, others)
+            for member in (user, other)
+        )
+        Message.objects.bulk_create(
+            Message(conversation=conversation, created_by=other, body="hello")
+            for conversation, other in zip(conversations, others)
+        )
+        return user
@@ -0,0 +1,135 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Conversation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "direct_key",
+                    models.CharField(blank=True, max_length=73, null=True, unique=True),
+                ),
+                ("last_message_at", models.DateTimeField()),
+                (
+                    "last_message_body",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ConversationMember",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+                ("last_read_at", models.DateTimeField(blank=True, null=True)),
+                ("last_message_at", models.DateTimeField()),
+                (
+                    "conversation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="members",
+                        to="chat.conversation",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="conversation_memberships",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="participants",
+            field=models.ManyToManyField(
+                related_name="conversations",
+                through="chat.ConversationMember",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.CreateModel(
+            name="Message",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("body", models.TextField()),
+                (
+                    "conversation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="messages",
+                        to="chat.conversation",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("created_at",),
+                "indexes": [
+                    models.Index(
+                        fields=["conversation", "created_at"], name="chat_history_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="conversationmember",
+            index=models.Index(
+                fields=["user", "-last_message_at"], name="chat_inbox_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="conversationmember",
+            constraint=models.UniqueConstraint(
+                fields=("conversation", "user"), name="unique_conversation_member"
+            ),
+        ),
+    ]
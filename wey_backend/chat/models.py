@@ -0,0 +1,56 @@
+from django.db import models
+
+from accounts.models import User
+from posts.models import BaseModel
+from wey.ids import uuid7
+
+
+class Conversation(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Sorted participant ids for one-to-one conversations, so there is at most
+    # one conversation per pair.
+    direct_key = models.CharField(max_length=73, unique=True, null=True, blank=True)
+    last_message_at = models.DateTimeField()
+    last_message_body = models.CharField(max_length=255, blank=True, default="")
+    participants = models.ManyToManyField(
+        User, through="ConversationMember", related_name="conversations"
+    )
+
+
+class ConversationMember(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    conversation = models.ForeignKey(
+        Conversation, related_name="members", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        User, related_name="conversation_memberships", on_delete=models.CASCADE
+    )
+    # Kept up to date on every message and read, never computed with COUNT, and
+    # copied from the conversation so the inbox is a single index range scan.
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    last_message_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["conversation", "user"], name="unique_conversation_member"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "-last_message_at"], name="chat_inbox_idx")
+        ]
+
+
+class Message(BaseModel):
+    conversation = models.ForeignKey(
+        Conversation, related_name="messages", on_delete=models.CASCADE
+    )
+    body = models.TextField()
+
+    class Meta:
+        ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["conversation", "created_at"], name="chat_history_idx")
+        ]
@@ -0,0 +1,47 @@
+from django.utils.timesince import timesince
+from rest_framework import serializers
+
+from accounts.models import User
+
+from .models import ConversationMember, Message
+
+
+class ParticipantSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ("id", "name")
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source="conversation_id")
+    participants = serializers.SerializerMethodField("get_participants")
+    last_message_body = serializers.CharField(source="conversation.last_message_body")
+
+    def get_participants(self, member):
+        return ParticipantSerializer(
+            [m.user for m in member.conversation.members.all()], many=True
+        ).data
+
+    class Meta:
+        model = ConversationMember
+        fields = (
+            "id",
+            "participants",
+            "unread_count",
+            "last_read_at",
+            "last_message_at",
+            "last_message_body",
+        )
+
+
+class MessageSerializer(serializers.ModelSerializer):
+    created_by = ParticipantSerializer(read_only=True)
+    created_at_formatted = serializers.SerializerMethodField("format_created_at")
+
+    def format_created_at(self, message):
+        return timesince(message.created_at)
+
+    class Meta:
+        model = Message
+        fields = ("id", "body", "created_by", "created_at", "created_at_formatted")
+        read_only_fields = ("id", "created_by", "created_at")
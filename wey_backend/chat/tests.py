@@ -0,0 +1,183 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Conversation, ConversationMember, Message
+
+
+class ChatTestCase(APITestCase):
+    def setUp(self):
+        self.alice = get_user_model().objects.create_user(
+            name="alice", email="alice@gmail.com", password="test"
+        )
+        self.bob = get_user_model().objects.create_user(
+            name="bob", email="bob@gmail.com", password="test"
+        )
+        self.login(self.alice)
+
+    def login(self, user):
+        refresh_token = RefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {refresh_token.access_token}"
+        )
+
+    def start_conversation(self, other):
+        url = reverse("direct_conversation", kwargs={"id": other.id})
+        return self.client.post(url).data["id"]
+
+    def send(self, conversation_id, body):
+        url = reverse("conversation_messages", kwargs={"id": conversation_id})
+        return self.client.post(url, {"body": body})
+
+    def unread(self, conversation_id, user):
+        return ConversationMember.objects.get(
+            conversation_id=conversation_id, user=user
+        ).unread_count
+
+
+class DirectConversationViewTests(ChatTestCase):
+    def test_one_conversation_per_pair(self):
+        first = self.start_conversation(self.bob)
+        self.login(self.bob)
+        second = self.start_conversation(self.alice)
+
+        self.assertEqual(first, second)
+        self.assertEqual(Conversation.objects.count(), 1)
+        self.assertEqual(ConversationMember.objects.count(), 2)
+
+    def test_cannot_talk_to_self(self):
+        url = reverse("direct_conversation", kwargs={"id": self.alice.id})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConversationMessagesViewTests(ChatTestCase):
+    def test_send_updates_unread_counters(self):
+        conversation = self.start_conversation(self.bob)
+        response = self.send(conversation, "hi")
+        self.send(conversation, "there")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.unread(conversation, self.bob), 2)
+        self.assertEqual(self.unread(conversation, self.alice), 0)
+        self.assertEqual(
+            Conversation.objects.get(id=conversation).last_message_body, "there"
+        )
+
+    def test_history_is_cursor_paginated(self):
+        conversation = self.start_conversation(self.bob)
+        for i in range(5):
+            self.send(conversation, f"message {i}")
+
+        url = reverse("conversation_messages", kwargs={"id": conversation})
+        response = self.client.get(url, {"limit": 3})
+        self.assertEqual(
+            [m["body"] for m in response.data["messages"]],
+            ["message 4", "message 3", "message 2"],
+        )
+
+        response = self.client.get(url, {"limit": 3, "before": response.data["next"]})
+        self.assertEqual(
+            [m["body"] for m in response.data["messages"]], ["message 1", "message 0"]
+        )
+        self.assertIsNone(response.data["next"])
+
+    def test_history_keeps_messages_sharing_a_timestamp(self):
+        conversation = self.start_conversation(self.bob)
+        for i in range(5):
+            self.send(conversation, f"message {i}")
+        Message.objects.update(created_at=timezone.now())
+
+        url = reverse("conversation_messages", kwargs={"id": conversation})
+        bodies, params = [], {"limit": 2}
+        while True:
+            response = self.client.get(url, params)
+            bodies += [m["body"] for m in response.data["messages"]]
+            if response.data["next"] is None:
+                break
+            params["before"] = response.data["next"]
+        self.assertEqual(sorted(bodies), [f"message {i}" for i in range(5)])
+
+    def test_invalid_cursor(self):
+        conversation = self.start_conversation(self.bob)
+        url = reverse("conversation_messages", kwargs={"id": conversation})
+        response = self.client.get(url, {"before": "2020-01-01T00:00:00Z"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_members_cannot_read(self):
+        conversation = self.start_conversation(self.bob)
+        outsider = get_user_model().objects.create_user(
+            name="eve", email="eve@gmail.com", password="test"
+        )
+        self.login(outsider)
+        url = reverse("conversation_messages", kwargs={"id": conversation})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MarkReadViewTests(ChatTestCase):
+    def test_mark_read_up_to_cursor(self):
+        conversation = self.start_conversation(self.bob)
+        self.send(conversation, "one")
+        self.send(conversation, "two")
+        self.send(conversation, "three")
+
+        self.login(self.bob)
+        url = reverse("conversation_messages", kwargs={"id": conversation})
+        messages = self.client.get(url).data["messages"]
+
+        url = reverse("mark_read", kwargs={"id": conversation})
+        response = self.client.post(url, {"cursor": messages[1]["created_at"]})
+        self.assertEqual(response.data["unread_count"], 1)
+        self.assertEqual(self.unread(conversation, self.bob), 1)
+
+        response = self.client.post(url)
+        self.assertEqual(response.data["unread_count"], 0)
+        self.assertEqual(self.unread(conversation, self.bob), 0)
+
+    def test_mark_read_up_to_history_cursor(self):
+        conversation = self.start_conversation(self.bob)
+        for body in ("one", "two", "three"):
+            self.send(conversation, body)
+        # All three share a timestamp, the cursor's id tells them apart.
+        Message.objects.update(created_at=timezone.now())
+
+        self.login(self.bob)
+        url = reverse("conversation_messages", kwargs={"id": conversation})
+        cursor = self.client.get(url, {"limit": 2}).data["next"]
+
+        url = reverse("mark_read", kwargs={"id": conversation})
+        response = self.client.post(url, {"cursor": cursor})
+        self.assertEqual(response.data["unread_count"], 1)
+
+    def test_mark_read_rejects_bad_cursors(self):
+        conversation = self.start_conversation(self.bob)
+        url = reverse("mark_read", kwargs={"id": conversation})
+        for cursor in ("2024-01-01T00:00:00", "9999-99-99T00:00:00Z", 5, "junk"):
+            response = self.client.post(url, {"cursor": cursor}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConversationListViewTests(ChatTestCase):
+    def test_inbox_is_ordered_by_latest_message(self):
+        carol = get_user_model().objects.create_user(
+            name="carol", email="carol@gmail.com", password="test"
+        )
+        with_bob = self.start_conversation(self.bob)
+        with_carol = self.start_conversation(carol)
+        self.send(with_carol, "hi carol")
+        self.send(with_bob, "hi bob")
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("conversations"))
+
+        conversations = response.data["conversations"]
+        self.assertEqual(
+            [c["id"] for c in conversations], [str(with_bob), str(with_carol)]
+        )
+        self.assertEqual(conversations[0]["last_message_body"], "hi bob")
+        self.assertEqual(
+            {p["name"] for p in conversations[0]["participants"]}, {"alice", "bob"}
+        )
@@ -0,0 +1,21 @@
+from django.urls import path
+
+from .views import (
+    ConversationListView,
+    DirectConversationView,
+    ConversationMessagesView,
+    MarkReadView,
+)
+
+urlpatterns = [
+    path("", ConversationListView.as_view(), name="conversations"),
+    path(
+        "with/<uuid:id>", DirectConversationView.as_view(), name="direct_conversation"
+    ),
+    path(
+        "<uuid:id>/messages",
+        ConversationMessagesView.as_view(),
+        name="conversation_messages",
+    ),
+    path("<uuid:id>/read", MarkReadView.as_view(), name="mark_read"),
+]
@@ -0,0 +1,218 @@
+from django.db import transaction
+from django.db.models import F, Prefetch, Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.models import User
+from realtime.events import publish_to_users
+from wey.pagination import before_cursor, decode_cursor, encode_cursor, get_cursor
+
+from .models import Conversation, ConversationMember, Message
+from .serializers import ConversationSerializer, MessageSerializer
+
+PAGE_SIZE = 30
+
+
+def get_limit(request):
+    try:
+        return max(1, min(int(request.query_params.get("limit", PAGE_SIZE)), 100))
+    except ValueError:
+        return PAGE_SIZE
+
+
+class ConversationListView(APIView):
+    """The inbox, newest activity first, paginated with ?before=<next>."""
+
+    def get(self, request):
+        limit = get_limit(request)
+        members = (
+            ConversationMember.objects.filter(user=request.user)
+            .select_related("conversation")
+            .prefetch_related(
+                Prefetch(
+                    "conversation__members",
+                    queryset=ConversationMember.objects.select_related("user").only(
+                        "conversation_id", "user__id", "user__name"
+                    ),
+                )
+            )
+        )
+        members = before_cursor(members, "last_message_at", get_cursor(request))
+
+        members = list(members[: limit + 1])
+        page = members[:limit]
+        return Response(
+            {
+                "conversations": ConversationSerializer(page, many=True).data,
+                "next": (
+                    encode_cursor(page[-1].last_message_at, page[-1].id)
+                    if len(members) > limit
+                    else None
+                ),
+            }
+        )
+
+
+class DirectConversationView(APIView):
+    def post(self, request, id):
+        other = get_object_or_404(User, id=id)
+        if other.id == request.user.id:
+            return Response(
+                {"message": "Bad Request."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        direct_key = ":".join(sorted([str(request.user.id), str(other.id)]))
+        with transaction.atomic():
+            conversation, created = Conversation.objects.get_or_create(
+                direct_key=direct_key, defaults={"last_message_at": timezone.now()}
+            )
+            if created:
+                ConversationMember.objects.bulk_create(
+                    [
+                        ConversationMember(
+                            conversation=conversation,
+                            user=user,
+                            last_message_at=conversation.last_message_at,
+                        )
+                        for user in (request.user, other)
+                    ]
+                )
+
+        return Response(
+            {"id": conversation.id},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class ConversationMessagesView(APIView):
+    def get(self, request, id):
+        """History, newest first, paginated with ?before=<next>."""
+        member = get_object_or_404(
+            ConversationMember, conversation_id=id, user=request.user
+        )
+        limit = get_limit(request)
+        messages = before_cursor(
+            Message.objects.filter(
+                conversation_id=member.conversation_id
+            ).select_related("created_by"),
+            "created_at",
+            get_cursor(request),
+        )
+
+        messages = list(messages[: limit + 1])
+        page = messages[:limit]
+        return Response(
+            {
+                "messages": MessageSerializer(page, many=True).data,
+                "next": (
+                    encode_cursor(page[-1].created_at, page[-1].id)
+                    if len(messages) > limit
+                    else None
+                ),
+            }
+        )
+
+    def post(self, request, id):
+        member = get_object_or_404(
+            ConversationMember, conversation_id=id, user=request.user
+        )
+        serializer = MessageSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            message = serializer.save(
+                created_by=request.user, conversation_id=member.conversation_id
+            )
+            Conversation.objects.filter(id=member.conversation_id).update(
+                last_message_at=message.created_at,
+                last_message_body=message.body[:255],
+            )
+            ConversationMember.objects.filter(
+                conversation_id=member.conversation_id
+            ).exclude(user=request.user).update(
+                unread_count=F("unread_count") + 1,
+                last_message_at=message.created_at,
+            )
+            ConversationMember.objects.filter(id=member.id).update(
+                last_message_at=message.created_at,
+                last_read_at=message.created_at,
+            )
+            recipients = ConversationMember.objects.filter(
+                conversation_id=member.conversation_id
+            ).values_list("user_id", flat=True)
+            publish_to_users(
+                list(recipients),
+                "message_created",
+                {"conversation": member.conversation_id, "message": serializer.data},
+            )
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+def read_cursor(value):
+    """
+    (datetime, message id or None) for the "cursor" of MarkReadView: a cursor
+    returned by the history endpoint, or an ISO datetime with a timezone.
+    """
+    if not value:
+        return timezone.now(), None
+    if not isinstance(value, str):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+    try:
+        created_at, message_id = decode_cursor(value)
+    except ValueError:
+        try:
+            created_at, message_id = parse_datetime(value), None
+        except ValueError:
+            created_at = None
+    if created_at is None or timezone.is_naive(created_at):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+    return created_at, message_id
+
+
+class MarkReadView(APIView):
+    def post(self, request, id):
+        """
+        Mark everything up to the "cursor" in the body (the `next` of a history
+        page, or an ISO datetime, default: now) as read in one update. Only
+        messages after the cursor are counted, using the
+        (conversation, created_at) index.
+        """
+        cursor, message_id = read_cursor(request.data.get("cursor"))
+
+        with transaction.atomic():
+            member = get_object_or_404(
+                ConversationMember.objects.select_for_update().select_related(
+                    "conversation"
+                ),
+                conversation_id=id,
+                user=request.user,
+            )
+            if member.last_read_at and cursor < member.last_read_at:
+                return Response({"unread_count": member.unread_count})
+
+            if message_id is None and cursor >= member.conversation.last_message_at:
+                unread_count = 0
+            else:
+                after = Q(created_at__gt=cursor)
+                if message_id is not None:
+                    # Messages sharing the cursor's timestamp are ordered by id.
+                    after |= Q(created_at=cursor, id__gt=message_id)
+                unread_count = (
+                    Message.objects.filter(
+                        after, conversation_id=member.conversation_id
+                    )
+                    .exclude(created_by=request.user)
+                    .count()
+                )
+            ConversationMember.objects.filter(id=member.id).update(
+                last_read_at=cursor, unread_count=unread_count
+            )
+
+        return Response({"unread_count": unread_count})
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from deletions.purge import claim_next, run_deletion
+
+
+class Command(BaseCommand):
+    help = "Background worker that purges soft-deleted accounts and posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="exit when the queue is empty"
+        )
+        parser.add_argument("--poll-interval", type=float, default=5)
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            job = claim_next()
+            if job is not None:
+                run_deletion(job, options["batch_size"])
+                self.stdout.write(
+                    f"{job.model} {job.object_id}: {job.status}, "
+                    f"{job.deleted_rows} rows"
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
@@ -0,0 +1,34 @@
+from django.db import models
+
+from wey.ids import uuid7
+
+
+class DeletionJob(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # "app_label.ModelName" and primary key of the row being purged. Not a
+    # foreign key, the target disappears when the job finishes.
+    model = models.CharField(max_length=100)
+    object_id = models.UUIDField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    deleted_rows = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="deletion_queue_idx")
+        ]
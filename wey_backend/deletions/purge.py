@@ -0,0 +1,142 @@
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from posts import counters
+
+from .models import DeletionJob
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_deletion(obj):
+    """Queue `obj` and everything that depends on it for purging."""
+    return DeletionJob.objects.create(model=obj._meta.label, object_id=obj.pk)
+
+
+def dependents(model):
+    """(relation, on_delete) for every foreign key pointing at `model`."""
+    for field in model._meta.get_fields(include_hidden=True):
+        if field.one_to_many or field.one_to_one:
+            if field.auto_created and not field.concrete:
+                yield field, field.on_delete
+
+
+class Purger:
+    """
+    Delete rows bottom-up in batches of `batch_size`: for each batch, first
+    purge whatever cascades from it (recursively), null out SET_NULL
+    references, then delete the batch itself. Each delete is its own short
+    transaction touching at most `batch_size` rows, instead of one collector
+    loading the whole object graph and holding its locks until the end.
+    """
+
+    def __init__(self, batch_size=None, on_progress=None):
+        self.batch_size = batch_size or settings.DELETION_BATCH_SIZE
+        self.on_progress = on_progress
+        self.deleted_rows = 0
+
+    def purge(self, queryset):
+        model = queryset.model
+        file_fields = [
+            f for f in model._meta.concrete_fields if isinstance(f, models.FileField)
+        ]
+        while True:
+            pks = list(queryset.values_list("pk", flat=True)[: self.batch_size])
+            if not pks:
+                return
+
+            for relation, on_delete in dependents(model):
+                related = relation.related_model._base_manager.filter(
+                    **{f"{relation.field.name}__in": pks}
+                )
+                if on_delete is models.CASCADE:
+                    self.purge(related)
+                elif on_delete is models.SET_NULL:
+                    self.nullify(related, relation.field.name)
+
+            files = {}
+            for field in file_fields:
+                names = model._base_manager.filter(pk__in=pks).values_list(
+                    field.name, flat=True
+                )
+                files[field] = {name for name in names if name}
+
+            with transaction.atomic():
+                batch = model._base_manager.filter(pk__in=pks)
+                counters.forget(batch)
+                deleted, _ = batch.delete()
+            self.deleted_rows += deleted
+            for field, names in files.items():
+                # Content-hashed storage gives identical uploads the same name,
+                # so keep files that surviving rows still point at.
+                names -= set(
+                    model._base_manager.filter(
+                        **{f"{field.name}__in": names}
+                    ).values_list(field.name, flat=True)
+                )
+                for name in names:
+                    field.storage.delete(name)
+            if self.on_progress:
+                self.on_progress(self.deleted_rows)
+
+    def nullify(self, queryset, field_name):
+        queryset = queryset.filter(**{f"{field_name}__isnull": False})
+        while True:
+            pks = list(queryset.values_list("pk", flat=True)[: self.batch_size])
+            if not pks:
+                return
+            queryset.model._base_manager.filter(pk__in=pks).update(**{field_name: None})
+
+
+def requeue_stale():
+    """
+    Put RUNNING jobs whose worker stopped reporting progress back in the
+    queue. Purging is idempotent, the next worker picks up where it stopped.
+    """
+    DeletionJob.objects.filter(
+        status=DeletionJob.RUNNING,
+        updated_at__lt=timezone.now()
+        - timedelta(seconds=settings.DELETION_STALE_SECONDS),
+    ).update(status=DeletionJob.PENDING)
+
+
+def claim_next():
+    """Atomically take the oldest pending job, or return None."""
+    requeue_stale()
+    while True:
+        job = DeletionJob.objects.filter(status=DeletionJob.PENDING).order_by(
+            "created_at"
+        )
+        job = job.first()
+        if job is None:
+            return None
+        if DeletionJob.objects.filter(id=job.id, status=DeletionJob.PENDING).update(
+            status=DeletionJob.RUNNING, updated_at=timezone.now()
+        ):
+            job.status = DeletionJob.RUNNING
+            return job
+
+
+def run_deletion(job, batch_size=None):
+    def on_progress(deleted_rows):
+        DeletionJob.objects.filter(id=job.id).update(
+            deleted_rows=deleted_rows, updated_at=timezone.now()
+        )
+
+    purger = Purger(batch_size, on_progress)
+    try:
+        model = apps.get_model(job.model)
+        purger.purge(model._base_manager.filter(pk=job.object_id))
+        job.status = DeletionJob.DONE
+    except Exception as e:
+        logger.exception("Deletion %s failed", job.id)
+        job.status = DeletionJob.FAILED
+        job.error = str(e)
+    job.deleted_rows = purger.deleted_rows
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "deleted_rows", "error", "finished_at"])
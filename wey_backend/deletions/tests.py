@@ -0,0 +1,174 @@
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from notifications.models import Notification
+from notifications.utils import notify
+from posts import counters
+from posts.models import Attachment, Comment, Like, Post
+
+from .models import DeletionJob
+from .purge import claim_next, run_deletion, schedule_deletion
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DeletionTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="test", email="test@gmail.com", password="test"
+        )
+        self.friend = get_user_model().objects.create_user(
+            name="friend", email="friend@gmail.com", password="test"
+        )
+        self.user.friends.add(self.friend)
+        self.friend.friends.add(self.user)
+
+        self.post = Post.objects.create(body="Something", created_by=self.user)
+        for user in (self.user, self.friend):
+            Like.objects.create(post=self.post, created_by=user)
+            for i in range(3):
+                Comment.objects.create(body=str(i), post=self.post, created_by=user)
+        self.attachment = Attachment(post=self.post, created_by=self.user)
+        self.attachment.image.save("a.png", ContentFile(b"png"))
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def purge(self):
+        job = claim_next()
+        run_deletion(job, batch_size=2)
+        job.refresh_from_db()
+        return job
+
+    def test_delete_post_hides_it_then_purges(self):
+        storage = self.attachment.image.storage
+        name = self.attachment.image.name
+
+        response = self.client.delete(reverse("post_detail", args=[self.post.id]))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(reverse("post_detail", args=[self.post.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Post.objects.filter(id=self.post.id).exists())
+
+        job = self.purge()
+        self.assertEqual(job.status, DeletionJob.DONE)
+        # The post, 2 likes, 6 comments and the attachment.
+        self.assertEqual(job.deleted_rows, 10)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(storage.exists(name))
+
+    def test_shared_file_is_kept(self):
+        other = Post.objects.create(body="Same picture", created_by=self.friend)
+        copy = Attachment(post=other, created_by=self.friend)
+        copy.image.save("b.png", ContentFile(b"png"))
+        self.assertEqual(copy.image.name, self.attachment.image.name)
+
+        self.client.delete(reverse("post_detail", args=[self.post.id]))
+        self.purge()
+        self.assertTrue(copy.image.storage.exists(copy.image.name))
+
+    def test_only_author_can_delete_post(self):
+        post = Post.objects.create(body="Mine", created_by=self.friend)
+        response = self.client.delete(reverse("post_detail", args=[post.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(DeletionJob.objects.exists())
+
+    def test_delete_account(self):
+        notify(
+            self.friend.id, self.user.id, Notification.FRIEND_REQUEST, self.friend.id
+        )
+        notify(self.friend.id, self.user.id, Notification.LIKE, self.post.id)
+
+        response = self.client.delete(reverse("me"))
+        self.assertEqual(response.status_code, 204)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(self.friend.friends.exists())
+        response = self.client.get(reverse("profile_posts", args=[self.user.id]))
+        self.assertEqual(response.status_code, 401)
+
+        job = self.purge()
+        self.assertEqual(job.status, DeletionJob.DONE)
+        self.assertFalse(get_user_model().objects.filter(id=self.user.id).exists())
+        self.assertFalse(Post.objects.exists())
+        # The friend's own likes and comments went with the post, nothing of
+        # theirs is left dangling.
+        self.assertEqual(Like.objects.count(), 0)
+        self.assertEqual(
+            list(Notification.objects.values_list("last_actor", flat=True)),
+            [None, None],
+        )
+
+    def test_purge_takes_back_counts(self):
+        post = Post.objects.create(
+            body="Theirs", created_by=self.friend, likes_count=1, comments_count=1
+        )
+        Like.objects.create(post=post, created_by=self.user)
+        Comment.objects.create(body="Mine", post=post, created_by=self.user)
+        Comment.objects.create(
+            body="Gone", post=post, created_by=self.user, is_deleted=True
+        )
+
+        self.client.delete(reverse("me"))
+        self.purge()
+        counters.buffer.flush()
+        post.refresh_from_db()
+        self.assertEqual((post.likes_count, post.comments_count), (0, 0))
+
+    def test_deleted_account_posts_are_hidden(self):
+        friend_token = RefreshToken.for_user(self.friend).access_token
+        detail = reverse("post_detail", args=[self.post.id])
+        self.assertEqual(
+            self.client.get(detail, HTTP_AUTHORIZATION=f"Bearer {friend_token}")[
+                "X-Cache"
+            ],
+            "MISS",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("me"))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {friend_token}")
+
+        response = self.client.get(detail)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(reverse("search"), {"query": "Something"})
+        self.assertEqual(response.data["posts"], [])
+        for name in ("like_post", "create_comment"):
+            response = self.client.post(reverse(name, args=[self.post.id]))
+            self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("post_likes", args=[self.post.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_deleted_account_edit_history_is_hidden(self):
+        theirs = Post.objects.create(body="Theirs", created_by=self.friend)
+        mine = Comment.objects.create(body="Mine", post=theirs, created_by=self.user)
+        reply = Comment.objects.create(
+            body="Reply", post=self.post, created_by=self.friend
+        )
+        self.client.delete(reverse("me"))
+        self.client.force_authenticate(self.friend)
+
+        for url in (
+            reverse("post_revisions", args=[self.post.id]),
+            reverse("comment_revisions", args=[theirs.id, mine.id]),
+            reverse("comment_revisions", args=[self.post.id, reply.id]),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(reverse("post_revisions", args=[theirs.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_claim_requeues_job_of_dead_worker(self):
+        job = schedule_deletion(self.post)
+        self.assertEqual(claim_next(), job)
+        self.assertIsNone(claim_next())
+
+        stale = timezone.now() - timedelta(hours=1)
+        DeletionJob.objects.filter(id=job.id).update(updated_at=stale)
+        self.assertEqual(claim_next(), job)
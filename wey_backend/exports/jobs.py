@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils import timezone
+
+from accounts.models import User
+from archive.models import ArchivedRow
+from posts.models import Comment, Like, Post
+
+from .models import Export
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+
+
+def export_path(export):
+    return export.path
+
+
+def _sections(user):
+    yield "posts.ndjson", Post.objects.filter(created_by=user, is_deleted=False).values(
+        "id", "created_at", "body"
+    )
+    yield "comments.ndjson", Comment.objects.filter(
+        created_by=user, is_deleted=False
+    ).values("id", "created_at", "post_id", "body")
+    yield "likes.ndjson", Like.objects.filter(created_by=user).values(
+        "id", "created_at", "post_id"
+    )
+    # Archived posts, comments and likes with their original field values.
+    # Soft-deleted ones are left out, like in the sections above (likes have
+    # no is_deleted).
+    yield "archive.ndjson", ArchivedRow.objects.filter(
+        Q(data__is_deleted=False) | ~Q(data__has_key="is_deleted"),
+        owner=user,
+        model__in=["posts.post", "posts.comment", "posts.like"],
+    ).values("model", "object_id", "created_at", "data")
+    yield "friends.ndjson", User.friends.through.objects.filter(from_user=user).values(
+        friend_id=F("to_user_id"), name=F("to_user__name")
+    )
+
+
+def build_export(export):
+    """
+    Write the user's history to a zip of NDJSON files. Rows are read through
+    iterator() (a server-side cursor on Postgres) and written one line at a
+    time, so memory stays flat however much history there is.
+    """
+    user = export.user
+    path = export_path(export)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+
+    with zipfile.ZipFile(partial, "w", zipfile.ZIP_DEFLATED) as archive:
+        profile = {
+            "id": user.id,
+            "email": user.email,
+            "name": user.name,
+            "date_joined": user.date_joined,
+        }
+        archive.writestr("profile.json", json.dumps(profile, cls=DjangoJSONEncoder))
+        for name, rows in _sections(user):
+            with archive.open(name, "w", force_zip64=True) as f:
+                rows = rows.order_by().iterator(chunk_size=CHUNK_SIZE)
+                for i, row in enumerate(rows):
+                    if i % CHUNK_SIZE == 0:
+                        heartbeat(export)
+                    f.write(json.dumps(row, cls=DjangoJSONEncoder).encode())
+                    f.write(b"\n")
+
+    os.replace(partial, path)
+    return path.stat().st_size
+
+
+def heartbeat(export):
+    Export.objects.filter(id=export.id).update(heartbeat_at=timezone.now())
+
+
+def expire_stale(exports):
+    """
+    Requeue the RUNNING exports among `exports` whose worker stopped sending
+    heartbeats, or fail them once they used up EXPORT_MAX_ATTEMPTS.
+    """
+    stale = exports.filter(
+        status=Export.RUNNING,
+        heartbeat_at__lt=timezone.now()
+        - timedelta(seconds=settings.EXPORT_STALE_SECONDS),
+    )
+    stale.filter(attempts__lt=settings.EXPORT_MAX_ATTEMPTS).update(
+        status=Export.PENDING
+    )
+    stale.update(
+        status=Export.FAILED,
+        error="The export worker stopped.",
+        finished_at=timezone.now(),
+    )
+
+
+def claim_next():
+    """Atomically take the oldest pending export, or return None."""
+    expire_stale(Export.objects.all())
+    while True:
+        export = Export.objects.filter(status=Export.PENDING).order_by("created_at")
+        export = export.select_related("user").first()
+        if export is None:
+            return None
+        if Export.objects.filter(id=export.id, status=Export.PENDING).update(
+            status=Export.RUNNING,
+            heartbeat_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        ):
+            export.status = Export.RUNNING
+            return export
+
+
+def run_export(export):
+    try:
+        export.size = build_export(export)
+        export.status = Export.DONE
+    except Exception as e:
+        logger.exception("Export %s failed", export.id)
+        export.status = Export.FAILED
+        export.error = str(e)
+    export.finished_at = timezone.now()
+    export.save(update_fields=["status", "size", "error", "finished_at"])
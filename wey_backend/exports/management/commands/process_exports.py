@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from exports.jobs import claim_next, run_export
+
+
+class Command(BaseCommand):
+    help = "Background worker that builds pending account exports."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="exit when the queue is empty"
+        )
+        parser.add_argument("--poll-interval", type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            export = claim_next()
+            if export is not None:
+                run_export(export)
+                self.stdout.write(f"Export {export.id}: {export.status}")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
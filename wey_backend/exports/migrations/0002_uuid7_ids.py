@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:44
+
+from django.db import migrations, models
+import wey.ids
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("exports", "0001_initial"),
+    ]
+
+    # The default is applied in Python, so there is nothing to change in the
+    # database. Existing rows keep their uuid4 ids, which stay valid.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="export",
+                    name="id",
+                    field=models.UUIDField(
+                        default=wey.ids.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+            ],
+        ),
+    ]
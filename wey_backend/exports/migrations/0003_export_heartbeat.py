@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("exports", "0002_uuid7_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="export",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="export",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
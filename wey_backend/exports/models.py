@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from wey.ids import uuid7
+
+
+class Export(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    user = models.ForeignKey(User, related_name="exports", on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Touched by the worker while it builds the export. A RUNNING export whose
+    # heartbeat is older than EXPORT_STALE_SECONDS lost its worker.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    size = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="export_queue_idx")
+        ]
+
+    @property
+    def path(self):
+        return Path(settings.EXPORT_ROOT) / f"{self.id}.zip"
+
+
+@receiver(post_delete, sender=Export)
+def delete_export_file(sender, instance, **kwargs):
+    instance.path.unlink(missing_ok=True)
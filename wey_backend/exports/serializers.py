@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+from .models import Export
+
+
+class ExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Export
+        fields = ("id", "status", "created_at", "finished_at", "size", "error")
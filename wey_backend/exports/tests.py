@@ -0,0 +1,165 @@
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from archive.jobs import Archiver
+from archive.models import ArchivedRow
+from posts.models import Comment, Like, Post
+
+from .jobs import claim_next, export_path, run_export
+from .models import Export
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_root)
+        override = override_settings(EXPORT_ROOT=self.export_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = get_user_model().objects.create_user(
+            name="test", email="test@gmail.com", password="test"
+        )
+        self.friend = get_user_model().objects.create_user(
+            name="friend", email="friend@gmail.com", password="test"
+        )
+        self.user.friends.add(self.friend)
+        for i in range(3):
+            post = Post.objects.create(body=f"Post {i}", created_by=self.user)
+        Comment.objects.create(body="Nice", post=post, created_by=self.user)
+        Like.objects.create(post=post, created_by=self.user)
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def build(self):
+        response = self.client.post(reverse("exports"))
+        self.assertEqual(response.status_code, 202)
+        run_export(claim_next())
+        return Export.objects.get(id=response.data["id"])
+
+    def test_request_is_queued_once(self):
+        first = self.client.post(reverse("exports"))
+        second = self.client.post(reverse("exports"))
+
+        self.assertEqual(first.data["status"], Export.PENDING)
+        self.assertEqual(first.data["id"], second.data["id"])
+        self.assertEqual(Export.objects.count(), 1)
+
+    def test_dead_worker_is_retried_then_failed(self):
+        response = self.client.post(reverse("exports"))
+        stale = timezone.now() - timedelta(hours=1)
+        for _ in range(3):
+            export = claim_next()
+            self.assertEqual(str(export.id), response.data["id"])
+            Export.objects.filter(id=export.id).update(heartbeat_at=stale)
+        self.assertEqual(Export.objects.get(id=export.id).attempts, 3)
+        self.assertIsNone(claim_next())
+        export = Export.objects.get(id=export.id)
+        self.assertEqual(export.status, Export.FAILED)
+
+        # A new request isn't blocked by the failed one.
+        response = self.client.post(reverse("exports"))
+        self.assertNotEqual(response.data["id"], str(export.id))
+
+    def test_request_requeues_dead_export(self):
+        export = Export.objects.create(
+            user=self.user,
+            status=Export.RUNNING,
+            attempts=1,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        response = self.client.post(reverse("exports"))
+        self.assertEqual(response.data["id"], str(export.id))
+        self.assertEqual(response.data["status"], Export.PENDING)
+        run_export(claim_next())
+        self.assertEqual(Export.objects.get(id=export.id).status, Export.DONE)
+
+    def test_archive_contains_history(self):
+        post = Post.objects.create(body="Gone", created_by=self.user, is_deleted=True)
+        Comment.objects.create(
+            body="Gone", post=post, created_by=self.user, is_deleted=True
+        )
+        export = self.build()
+        self.assertEqual(export.status, Export.DONE)
+
+        with zipfile.ZipFile(export_path(export)) as archive:
+            read = lambda name: archive.read(name).decode().splitlines()
+            self.assertEqual(len(read("posts.ndjson")), 3)
+            self.assertEqual(json.loads(read("comments.ndjson")[0])["body"], "Nice")
+            self.assertEqual(len(read("likes.ndjson")), 1)
+            self.assertEqual(json.loads(read("friends.ndjson")[0])["name"], "friend")
+            self.assertEqual(read("archive.ndjson"), [])
+
+    def test_archived_posts_are_exported(self):
+        Post.objects.update(created_at=timezone.now() - timedelta(days=400))
+        Comment.objects.update(created_at=timezone.now() - timedelta(days=400))
+        Like.objects.update(created_at=timezone.now() - timedelta(days=400))
+        Archiver().run(cutoff=timezone.now())
+        deleted = ArchivedRow.objects.filter(model="posts.post").first()
+        deleted.data["is_deleted"] = True
+        deleted.save()
+        export = self.build()
+
+        with zipfile.ZipFile(export_path(export)) as archive:
+            read = lambda name: archive.read(name).decode().splitlines()
+            self.assertEqual(read("posts.ndjson"), [])
+            rows = [json.loads(line) for line in read("archive.ndjson")]
+            self.assertEqual(
+                sorted(row["model"] for row in rows),
+                ["posts.comment", "posts.like"] + ["posts.post"] * 2,
+            )
+
+    def test_download_not_ready(self):
+        response = self.client.post(reverse("exports"))
+        response = self.client.get(
+            reverse("export_download", args=[response.data["id"]])
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_download_resumes_with_range(self):
+        export = self.build()
+        url = reverse("export_download", args=[export.id])
+        content = export_path(export).read_bytes()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.streaming_content), content)
+
+        response = self.client.get(url, HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(
+            response["Content-Range"], f"bytes 10-{len(content) - 1}/{len(content)}"
+        )
+        self.assertEqual(b"".join(response.streaming_content), content[10:])
+
+        response = self.client.get(url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(b"".join(response.streaming_content), content[-4:])
+
+        response = self.client.get(url, HTTP_RANGE=f"bytes={len(content)}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_stale_if_range_sends_whole_file(self):
+        export = self.build()
+        response = self.client.get(
+            reverse("export_download", args=[export.id]),
+            HTTP_RANGE="bytes=10-",
+            HTTP_IF_RANGE='"stale"',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_users_export_is_hidden(self):
+        export = Export.objects.create(user=self.friend)
+        response = self.client.get(reverse("export_detail", args=[export.id]))
+        self.assertEqual(response.status_code, 404)
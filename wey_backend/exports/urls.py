@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import ExportListCreateView, ExportDetailView, ExportDownloadView
+
+urlpatterns = [
+    path("", ExportListCreateView.as_view(), name="exports"),
+    path("<uuid:id>", ExportDetailView.as_view(), name="export_detail"),
+    path("<uuid:id>/download", ExportDownloadView.as_view(), name="export_download"),
+]
@@ -0,0 +1,47 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from wey.http import ranged_file_response
+
+from .jobs import expire_stale, export_path
+from .models import Export
+from .serializers import ExportSerializer
+
+
+class ExportListCreateView(APIView):
+    def get(self, request):
+        exports = Export.objects.filter(user=request.user)[:10]
+        return Response(ExportSerializer(exports, many=True).data)
+
+    def post(self, request):
+        # One export in flight per user; asking again returns the queued one.
+        # One whose worker died is requeued (or failed) first.
+        exports = Export.objects.filter(user=request.user)
+        expire_stale(exports)
+        export = exports.filter(status__in=(Export.PENDING, Export.RUNNING)).first()
+        if export is None:
+            export = Export.objects.create(user=request.user)
+        return Response(ExportSerializer(export).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportDetailView(APIView):
+    def get(self, request, id):
+        export = get_object_or_404(Export, id=id, user=request.user)
+        return Response(ExportSerializer(export).data)
+
+
+class ExportDownloadView(APIView):
+    def get(self, request, id):
+        export = get_object_or_404(Export, id=id, user=request.user)
+        if export.status != Export.DONE:
+            return Response(
+                {"message": "Export is not ready yet"}, status=status.HTTP_409_CONFLICT
+            )
+        return ranged_file_response(
+            request,
+            export_path(export),
+            content_type="application/zip",
+            filename=f"wey-export-{export.created_at:%Y-%m-%d}.zip",
+        )
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:06
+
+from django.db import migrations, models
+
+from posts.hll import HyperLogLog
+
+
+def backfill_sketches(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    NotificationActor = apps.get_model("notifications", "NotificationActor")
+
+    def save(notification_id, sketch):
+        Notification.objects.filter(pk=notification_id).update(
+            actors_sketch=sketch.to_bytes()
+        )
+
+    # Ordered by notification, so only one sketch is held at a time.
+    current, sketch = None, None
+    actors = NotificationActor.objects.order_by("notification_id").values_list(
+        "notification_id", "actor_id"
+    )
+    for notification_id, actor_id in actors.iterator(chunk_size=2000):
+        if notification_id != current:
+            if current is not None:
+                save(current, sketch)
+            current, sketch = notification_id, HyperLogLog()
+        sketch.add(actor_id.bytes)
+    if current is not None:
+        save(current, sketch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0003_notification_actors"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="actors_sketch",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.RunPython(backfill_sketches, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name="NotificationActor",
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import models
+from django.utils import timezone
+
+from accounts.models import User
+from wey.ids import uuid7
+
+
+class Notification(models.Model):
+    LIKE = "like"
+    COMMENT = "comment"
+    FRIEND_REQUEST = "friend_request"
+
+    TYPE_CHOICES = (
+        (LIKE, "Like"),
+        (COMMENT, "Comment"),
+        (FRIEND_REQUEST, "Friend request"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    recipient = models.ForeignKey(
+        User, related_name="notifications", on_delete=models.CASCADE
+    )
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    # The post for likes and comments, the recipient for friend requests.
+    target_id = models.UUIDField()
+    # All events for the same recipient, type and target within one
+    # NOTIFICATION_WINDOW_SECONDS window are folded into a single row.
+    window_start = models.DateTimeField()
+    last_actor = models.ForeignKey(
+        User, related_name="+", null=True, on_delete=models.SET_NULL
+    )
+    # Distinct actors, so someone commenting three times in one window is one
+    # actor: actors_count is the estimate of the actors_sketch HyperLogLog
+    # (posts/hll.py), which stays a few bytes for a handful of actors and at
+    # most 4 KB however viral the post.
+    actors_count = models.PositiveIntegerField(default=1)
+    actors_sketch = models.BinaryField(default=b"")
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient", "type", "target_id", "window_start"],
+                name="unique_notification_window",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipient", "-updated_at"], name="notification_list_idx"
+            )
+        ]
+
+
+class NotificationCounter(models.Model):
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name="notification_counter",
+        on_delete=models.CASCADE,
+    )
+    unread_count = models.PositiveIntegerField(default=0)
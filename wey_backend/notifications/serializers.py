@@ -0,0 +1,44 @@
+from rest_framework import serializers
+
+from accounts.models import User
+
+from .models import Notification
+
+
+class ActorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ("id", "name")
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    VERBS = {
+        Notification.LIKE: "liked your post",
+        Notification.COMMENT: "commented on your post",
+        Notification.FRIEND_REQUEST: "sent you a friend request",
+    }
+
+    last_actor = ActorSerializer(read_only=True)
+    message = serializers.SerializerMethodField("get_message")
+
+    def get_message(self, notification):
+        name = notification.last_actor.name if notification.last_actor else "Someone"
+        others = notification.actors_count - 1
+        if others == 1:
+            name = f"{name} and 1 other"
+        elif others > 1:
+            name = f"{name} and {others} others"
+        return f"{name} {self.VERBS[notification.type]}"
+
+    class Meta:
+        model = Notification
+        fields = (
+            "id",
+            "type",
+            "target_id",
+            "last_actor",
+            "actors_count",
+            "message",
+            "is_read",
+            "updated_at",
+        )
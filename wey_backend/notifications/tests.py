@@ -0,0 +1,178 @@
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from posts.models import Post
+
+from .models import Notification, NotificationCounter
+from .utils import _apply, _window_start, buffer, notify
+
+
+class NotifyTests(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(
+            name="author", email="author@gmail.com", password="test"
+        )
+        self.fans = [
+            get_user_model().objects.create_user(
+                name=f"fan{i}", email=f"fan{i}@gmail.com", password="test"
+            )
+            for i in range(3)
+        ]
+        self.post = Post.objects.create(body="Something", created_by=self.author)
+
+    def like(self, fan, now=None):
+        notify(self.author.id, fan.id, Notification.LIKE, self.post.id, now=now)
+
+    def unread(self):
+        return NotificationCounter.objects.get(user=self.author).unread_count
+
+    def test_events_in_one_window_are_coalesced(self):
+        for fan in self.fans:
+            self.like(fan)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actors_count, 3)
+        self.assertEqual(notification.last_actor, self.fans[-1])
+        self.assertEqual(self.unread(), 1)
+
+    def test_repeat_actor_is_counted_once(self):
+        for fan in (self.fans[0], self.fans[0], self.fans[1], self.fans[0]):
+            self.like(fan)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actors_count, 2)
+        self.assertEqual(notification.last_actor, self.fans[0])
+
+    def test_new_window_gets_a_new_row(self):
+        self.like(self.fans[0])
+        self.like(self.fans[1], now=timezone.now() + timedelta(days=1))
+
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(self.unread(), 2)
+
+    def test_read_notification_becomes_unread_again(self):
+        self.like(self.fans[0])
+        Notification.objects.update(is_read=True)
+        NotificationCounter.objects.update(unread_count=0)
+
+        self.like(self.fans[1])
+        self.assertFalse(Notification.objects.get().is_read)
+        self.assertEqual(self.unread(), 1)
+
+    def test_many_actors_are_counted_in_one_row(self):
+        now = timezone.now()
+        key = (self.author.id, Notification.LIKE, self.post.id, _window_start(now))
+        actors = {uuid.uuid4() for _ in range(1000)}
+        with self.assertNumQueries(11):
+            _apply({key: (actors, self.fans[0].id, now)})
+        # Actors seen before aren't counted twice.
+        _apply({key: (set(list(actors)[:500]), self.fans[0].id, now)})
+
+        notification = Notification.objects.get()
+        self.assertAlmostEqual(notification.actors_count, 1000, delta=50)
+        self.assertLessEqual(len(notification.actors_sketch), 4097)
+
+    def test_own_actions_are_ignored(self):
+        notify(self.author.id, self.author.id, Notification.LIKE, self.post.id)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    @override_settings(WRITE_BUFFER_FLUSH_MS=60000)
+    def test_buffered_events_are_merged_before_writing(self):
+        buffer._thread = object()  # don't start the background flusher
+        try:
+            for fan in self.fans + self.fans:
+                self.like(fan)
+            self.assertEqual(Notification.objects.count(), 0)
+            with self.assertNumQueries(11):
+                buffer.flush()
+        finally:
+            buffer._thread = None
+
+        self.assertEqual(Notification.objects.get().actors_count, 3)
+        self.assertEqual(self.unread(), 1)
+
+
+class NotificationViewsTests(APITestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(
+            name="author", email="author@gmail.com", password="test"
+        )
+        self.fan = get_user_model().objects.create_user(
+            name="fan", email="fan@gmail.com", password="test"
+        )
+        self.post = Post.objects.create(body="Something", created_by=self.author)
+
+    def login(self, user):
+        refresh_token = RefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {refresh_token.access_token}"
+        )
+
+    def test_like_comment_and_friend_request_notify(self):
+        self.login(self.fan)
+        self.client.post(reverse("like_post", kwargs={"id": self.post.id}))
+        self.client.post(
+            reverse("create_comment", kwargs={"id": self.post.id}), {"body": "hi"}
+        )
+        self.client.post(reverse("add_friend", kwargs={"id": self.author.id}))
+
+        self.login(self.author)
+        response = self.client.get(reverse("unread_notifications"))
+        self.assertEqual(response.data["unread_count"], 3)
+
+        response = self.client.get(reverse("notifications"))
+        self.assertEqual(
+            {n["message"] for n in response.data["notifications"]},
+            {
+                "fan liked your post",
+                "fan commented on your post",
+                "fan sent you a friend request",
+            },
+        )
+
+        self.client.post(reverse("read_notifications"))
+        response = self.client.get(reverse("unread_notifications"))
+        self.assertEqual(response.data["unread_count"], 0)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+    def test_message_mentions_others(self):
+        for i in range(3):
+            fan = get_user_model().objects.create_user(
+                name=f"fan{i}", email=f"fan{i}@gmail.com", password="test"
+            )
+            notify(self.author.id, fan.id, Notification.LIKE, self.post.id)
+
+        self.login(self.author)
+        response = self.client.get(reverse("notifications"))
+        self.assertEqual(
+            response.data["notifications"][0]["message"],
+            "fan2 and 2 others liked your post",
+        )
+
+    def test_pages_cover_notifications_sharing_a_timestamp(self):
+        for i in range(25):
+            fan = get_user_model().objects.create_user(
+                name=f"fan{i}", email=f"fan{i}@gmail.com", password="test"
+            )
+            notify(self.author.id, fan.id, Notification.FRIEND_REQUEST, fan.id)
+        Notification.objects.update(updated_at=timezone.now())
+
+        self.login(self.author)
+        response = self.client.get(reverse("notifications"))
+        seen = [n["id"] for n in response.data["notifications"]]
+        response = self.client.get(
+            reverse("notifications"), {"before": response.data["next"]}
+        )
+        seen += [n["id"] for n in response.data["notifications"]]
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(len(set(seen)), 25)
+
+        response = self.client.get(reverse("notifications"), {"before": "junk"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from .views import (
+    NotificationListView,
+    UnreadNotificationCountView,
+    MarkNotificationsReadView,
+)
+
+urlpatterns = [
+    path("", NotificationListView.as_view(), name="notifications"),
+    path("unread", UnreadNotificationCountView.as_view(), name="unread_notifications"),
+    path("read", MarkNotificationsReadView.as_view(), name="read_notifications"),
+]
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from posts.hll import HyperLogLog
+from wey.buffers import WriteBuffer
+
+from .models import Notification, NotificationCounter
+
+
+def _window_start(now):
+    window = settings.NOTIFICATION_WINDOW_SECONDS
+    return datetime.fromtimestamp(
+        now.timestamp() // window * window, tz=dt_timezone.utc
+    )
+
+
+def _increment_unread(user_id):
+    if NotificationCounter.objects.filter(user_id=user_id).update(
+        unread_count=F("unread_count") + 1
+    ):
+        return
+    try:
+        with transaction.atomic():
+            NotificationCounter.objects.create(user_id=user_id, unread_count=1)
+    except IntegrityError:
+        NotificationCounter.objects.filter(user_id=user_id).update(
+            unread_count=F("unread_count") + 1
+        )
+
+
+def _upsert(key, actor_ids, last_actor_id, updated_at):
+    recipient_id, type, target_id, window_start = key
+    lookup = {
+        "recipient_id": recipient_id,
+        "type": type,
+        "target_id": target_id,
+        "window_start": window_start,
+    }
+    notifications = Notification.objects.select_for_update().filter(**lookup)
+
+    with transaction.atomic():
+        # The row lock serializes flushes of the same notification, so no
+        # other flush's actors are lost from the sketch.
+        notification = notifications.first()
+        if notification is None:
+            try:
+                with transaction.atomic():
+                    notification = Notification.objects.create(
+                        **lookup,
+                        actors_count=0,
+                        last_actor_id=last_actor_id,
+                        updated_at=updated_at,
+                    )
+            except IntegrityError:
+                # Someone else created it (and counted it) in the meantime.
+                notification = notifications.get()
+            else:
+                _increment_unread(recipient_id)
+        elif notification.is_read:
+            _increment_unread(recipient_id)
+
+        sketch = HyperLogLog.from_bytes(notification.actors_sketch)
+        for actor_id in actor_ids:
+            sketch.add(actor_id.bytes)
+        Notification.objects.filter(pk=notification.pk).update(
+            actors_count=sketch.count(),
+            actors_sketch=sketch.to_bytes(),
+            last_actor_id=last_actor_id,
+            updated_at=updated_at,
+            is_read=False,
+        )
+
+
+def _apply(batch):
+    for key, (actor_ids, last_actor_id, updated_at) in batch.items():
+        _upsert(key, actor_ids, last_actor_id, updated_at)
+
+
+def _merge(pending, new):
+    return (pending[0] | new[0], new[1], new[2])
+
+
+buffer = WriteBuffer(apply=_apply, merge=_merge)
+
+
+def notify(recipient_id, actor_id, type, target_id, now=None):
+    """
+    Record that actor_id did something the recipient should hear about. Events
+    are merged in memory first and then upserted into one row per window, so a
+    viral post costs one write per flush rather than one per like.
+    """
+    if recipient_id == actor_id:
+        return
+    now = now or timezone.now()
+    buffer.add(
+        (recipient_id, type, target_id, _window_start(now)), ({actor_id}, actor_id, now)
+    )
@@ -0,0 +1,57 @@
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from wey.pagination import before_cursor, encode_cursor, get_cursor
+
+from .models import Notification, NotificationCounter
+from .serializers import NotificationSerializer
+
+
+class NotificationListView(APIView):
+    """Newest activity first, paginated with ?before=<next>."""
+
+    PAGE_SIZE = 20
+
+    def get(self, request):
+        notifications = before_cursor(
+            Notification.objects.filter(recipient=request.user).select_related(
+                "last_actor"
+            ),
+            "updated_at",
+            get_cursor(request),
+        )
+
+        notifications = list(notifications[: self.PAGE_SIZE + 1])
+        page = notifications[: self.PAGE_SIZE]
+        return Response(
+            {
+                "notifications": NotificationSerializer(page, many=True).data,
+                "next": (
+                    encode_cursor(page[-1].updated_at, page[-1].id)
+                    if len(notifications) > self.PAGE_SIZE
+                    else None
+                ),
+            }
+        )
+
+
+class UnreadNotificationCountView(APIView):
+    def get(self, request):
+        unread_count = (
+            NotificationCounter.objects.filter(user=request.user)
+            .values_list("unread_count", flat=True)
+            .first()
+        )
+        return Response({"unread_count": unread_count or 0})
+
+
+class MarkNotificationsReadView(APIView):
+    def post(self, request):
+        with transaction.atomic():
+            Notification.objects.filter(recipient=request.user, is_read=False).update(
+                is_read=True
+            )
+            NotificationCounter.objects.filter(user=request.user).update(unread_count=0)
+        return Response({"unread_count": 0}, status=status.HTTP_200_OK)
@@ -1,6 +1,55 @@
 from django.contrib import admin
 
-from .models import Post, Attachment
+from wey.admin import ScalableModelAdmin
 
-admin.site.register(Post)
-admin.site.register(Attachment)
+from .models import Post, Attachment, Like, Comment, PostRevision, CommentRevision
+
+
+class PostChildAdmin(ScalableModelAdmin):
+    list_display = ("id", "post", "created_by", "created_at")
+    list_select_related = ("post", "created_by")
+    autocomplete_fields = ("created_by",)
+    raw_id_fields = ("post",)
+    search_fields = ("created_by__email__startswith",)
+
+
+@admin.register(Post)
+class PostAdmin(ScalableModelAdmin):
+    list_display = (
+        "id",
+        "created_by",
+        "likes_count",
+        "comments_count",
+        "is_deleted",
+        "created_at",
+    )
+    list_select_related = ("created_by",)
+    autocomplete_fields = ("created_by",)
+    search_fields = ("created_by__email__startswith",)
+
+
+@admin.register(Like)
+class LikeAdmin(PostChildAdmin):
+    pass
+
+
+@admin.register(Comment)
+class CommentAdmin(PostChildAdmin):
+    list_display = ("id", "post", "created_by", "is_deleted", "created_at")
+
+
+@admin.register(Attachment)
+class AttachmentAdmin(PostChildAdmin):
+    pass
+
+
+@admin.register(PostRevision)
+class PostRevisionAdmin(ScalableModelAdmin):
+    list_display = ("id", "post", "created_at")
+    raw_id_fields = ("post",)
+
+
+@admin.register(CommentRevision)
+class CommentRevisionAdmin(ScalableModelAdmin):
+    list_display = ("id", "comment", "created_at")
+    raw_id_fields = ("comment",)
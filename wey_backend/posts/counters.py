@@ -0,0 +1,110 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from wey.buffers import WriteBuffer
+from wey.cache import bump_version
+
+from .models import Comment, Like, Post
+from .ranking import decay
+
+NO_CHANGE = (0, 0, 0.0)
+
+
+def _apply(batch):
+    for post_id, (likes, comments, score) in batch.items():
+        Post.objects.filter(pk=post_id).update(
+            likes_count=F("likes_count") + likes,
+            comments_count=F("comments_count") + comments,
+            score=F("score") + score,
+        )
+    # Responses cached by other processes show the counts they had pending
+    # (or not), so they go stale once the deltas land. Cached searches are
+    # left to expire: a like anywhere would otherwise clear all of them.
+    bump_version(*(f"post:{post_id}" for post_id in batch))
+
+
+def _merge(pending, new):
+    return tuple(a + b for a, b in zip(pending, new))
+
+
+buffer = WriteBuffer(apply=_apply, merge=_merge)
+
+
+def record(post, kind, sign=1):
+    """
+    Count one like or comment (sign=-1 to take it back) on the post's counters
+    and ranking score. Deltas are merged in memory per post and written as a
+    single UPDATE per flush, so a viral post doesn't serialize every like on
+    its row. The score increment is decayed to the post's current age, which
+    keeps it consistent with compute_score until the next batch re-decay.
+    """
+    weight = settings.FEED_RANKING[f"{kind}_weight"] * sign
+    buffer.add(
+        post.pk,
+        (
+            sign if kind == "like" else 0,
+            sign if kind == "comment" else 0,
+            weight * decay(post.created_at),
+        ),
+    )
+
+
+def forget(queryset):
+    """
+    Take the likes and live comments in `queryset` back off their posts'
+    counters, for rows deleted without going through the views (the deletion
+    worker). Other models are ignored.
+    """
+    kind = {Like: "like", Comment: "comment"}.get(queryset.model)
+    if kind is None:
+        return
+    if kind == "comment":
+        # Soft-deleted comments were taken off when they were deleted.
+        queryset = queryset.filter(is_deleted=False)
+    totals = Counter(queryset.values_list("post_id", flat=True))
+    for post in Post.objects.filter(pk__in=totals).only("pk", "created_at"):
+        record(post, kind, sign=-totals[post.pk])
+
+
+def current_counts(post):
+    """(likes, comments) of a loaded post, including writes not yet flushed."""
+    likes, comments, _ = buffer.pending(post.pk, NO_CHANGE)
+    return post.likes_count + likes, post.comments_count + comments
+
+
+def recount(batch_size=1000):
+    """
+    Recount likes_count and comments_count from the rows, in pk-ordered
+    batches. Corrects drift, e.g. from deltas lost when a process died before
+    flushing.
+    """
+
+    def total(model, **filters):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(post=OuterRef("pk"), **filters)
+                .order_by()
+                .values("post")
+                .annotate(total=Count("*"))
+                .values("total")
+            ),
+            Value(0),
+        )
+
+    updated = 0
+    last_pk = None
+    while True:
+        posts = Post.objects.order_by("pk")
+        if last_pk is not None:
+            posts = posts.filter(pk__gt=last_pk)
+        pks = list(posts.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return updated
+        updated += Post.objects.filter(pk__in=pks).update(
+            likes_count=total(Like),
+            comments_count=total(Comment, is_deleted=False),
+        )
+        last_pk = pks[-1]
@@ -0,0 +1,84 @@
+import functools
+
+from django.db import transaction
+
+from wey.buffers import WriteBuffer
+
+from .hll import HyperLogLog
+from .models import Post, PostReach
+
+
+def _apply(batch):
+    with transaction.atomic():
+        # Skip posts purged since they were viewed.
+        ids = set(
+            Post.objects.filter(pk__in=batch).order_by().values_list("pk", flat=True)
+        )
+        PostReach.objects.bulk_create(
+            [PostReach(post_id=id) for id in ids], ignore_conflicts=True
+        )
+        rows = list(PostReach.objects.select_for_update().filter(post_id__in=ids))
+        for row in rows:
+            views, viewers = batch[row.post_id]
+            sketch = HyperLogLog.from_bytes(row.sketch)
+            for viewer in viewers:
+                sketch.add(viewer)
+            row.views += views
+            row.unique_viewers = sketch.count()
+            row.sketch = sketch.to_bytes()
+        PostReach.objects.bulk_update(
+            rows, ["views", "unique_viewers", "sketch"], batch_size=500
+        )
+
+
+def _merge(pending, new):
+    views, viewers = pending
+    viewers.update(new[1])
+    return views + new[0], viewers
+
+
+buffer = WriteBuffer(apply=_apply, merge=_merge, setting="IMPRESSIONS_FLUSH_MS")
+
+
+def record(post_ids, viewer):
+    """
+    Count one view of each post by `viewer`. Views are merged in memory per
+    post (a viewer seen several times between flushes is kept once) and each
+    flush folds the whole batch into the sketches with a handful of queries.
+    Does nothing with IMPRESSIONS_FLUSH_MS = 0.
+    """
+    if not buffer.interval:
+        return
+    buffer.add_many((post_id, (1, {viewer.pk.bytes})) for post_id in post_ids)
+
+
+def tracks_views(method):
+    """
+    Record a view of the `id` post whenever the wrapped handler returns 200.
+    Goes outside cache_response() so cache hits are counted too.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, request, id, *args, **kwargs):
+        response = method(self, request, id, *args, **kwargs)
+        if response.status_code == 200:
+            record([id], request.user)
+        return response
+
+    return wrapper
+
+
+def current_reach(post_id):
+    """
+    (views, unique viewers) of a post, in constant time. Views include those
+    not flushed yet. Unique viewers are as of the last flush.
+    """
+    views, unique_viewers = (
+        PostReach.objects.filter(post_id=post_id)
+        .values_list("views", "unique_viewers")
+        .first()
+    ) or (0, 0)
+    pending = buffer.pending(post_id)
+    if pending:
+        views += pending[0]
+    return views, unique_viewers
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount
+from posts.ranking import recompute_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute decayed feed scores for recent posts. Run it periodically."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="recount likes_count and comments_count from the rows first",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            recounted = recount(batch_size=options["batch_size"])
+            self.stdout.write(f"Recounted {recounted} posts.")
+        updated = recompute_scores(batch_size=options["batch_size"])
+        self.stdout.write(f"Recomputed {updated} post scores.")
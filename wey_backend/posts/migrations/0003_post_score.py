@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0002_comment"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="comment",
+            options={"ordering": ("created_at",)},
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="score",
+            field=models.FloatField(default=1.0),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-score"], name="post_score_idx"),
+        ),
+    ]
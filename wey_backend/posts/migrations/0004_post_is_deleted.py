@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0003_post_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0004_post_is_deleted"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommentRevision",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("body", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ("-created_at",),
+            },
+        ),
+        migrations.CreateModel(
+            name="PostRevision",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("body", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ("-created_at",),
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_score_idx",
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="edited_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="edited_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["post", "created_at"],
+                name="comment_thread_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-score"],
+                name="post_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_by", "-created_at"],
+                name="post_feed_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="postrevision",
+            name="post",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="revisions",
+                to="posts.post",
+            ),
+        ),
+        migrations.AddField(
+            model_name="commentrevision",
+            name="comment",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="revisions",
+                to="posts.comment",
+            ),
+        ),
+    ]
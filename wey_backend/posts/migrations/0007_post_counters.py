@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:57
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model("posts", "Post")
+    Like = apps.get_model("posts", "Like")
+    Comment = apps.get_model("posts", "Comment")
+
+    def total(model, **filters):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(post=OuterRef("pk"), **filters)
+                .order_by()
+                .values("post")
+                .annotate(total=Count("*"))
+                .values("total")
+            ),
+            Value(0),
+        )
+
+    last_pk = None
+    while True:
+        posts = Post.objects.order_by("pk")
+        if last_pk is not None:
+            posts = posts.filter(pk__gt=last_pk)
+        pks = list(posts.values_list("pk", flat=True)[:1000])
+        if not pks:
+            return
+        Post.objects.filter(pk__in=pks).update(
+            likes_count=total(Like),
+            comments_count=total(Comment, is_deleted=False),
+        )
+        last_pk = pks[-1]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0006_uuid7_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comments_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0007_post_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostReach",
+            fields=[
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="reach",
+                        serialize=False,
+                        to="posts.post",
+                    ),
+                ),
+                ("views", models.BigIntegerField(default=0)),
+                ("unique_viewers", models.IntegerField(default=0)),
+                ("sketch", models.BinaryField(default=b"")),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0008_post_reach"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["post", "created_at"], name="like_post_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["post", "created_by"], name="like_post_user_idx"
+            ),
+        ),
+    ]
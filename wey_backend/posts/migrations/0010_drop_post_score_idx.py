@@ -0,0 +1,16 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0009_like_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_score_idx",
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0010_drop_post_score_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["created_at", "id"], name="post_created_idx"),
+        ),
+    ]
@@ -1,11 +1,12 @@
-import uuid
 from django.db import models
+from django.db.models import Q
 
 from accounts.models import User
+from wey.ids import uuid7
 
 
 class BaseModel(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
 
@@ -15,9 +16,48 @@ class BaseModel(models.Model):
 
 class Post(BaseModel):
     body = models.TextField(blank=True, null=True)
+    # Decayed engagement used by the ranked feed, see posts/ranking.py.
+    score = models.FloatField(default=1.0)
+    # Maintained by posts/counters.py, never counted on read.
+    likes_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+    # Hidden until the deletion worker purges it, see deletions/purge.py.
+    is_deleted = models.BooleanField(default=False)
+    edited_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ("-created_at",)
+        # Partial index: deleted posts are left out, so the feed index only
+        # ever holds live rows. Queries must filter on is_deleted=False to use
+        # it. There is no score index, the ranked feed picks candidates through
+        # this one (see posts/ranking.py) and every counter flush rewrites score.
+        indexes = [
+            models.Index(
+                fields=["created_by", "-created_at"],
+                name="post_feed_idx",
+                condition=Q(is_deleted=False),
+            ),
+            # Newest first in the admin. Posts keep their pre-uuid7 ids, so
+            # the primary key isn't in creation order.
+            models.Index(fields=["created_at", "id"], name="post_created_idx"),
+        ]
+
+
+class PostReach(models.Model):
+    """
+    How often a post was shown and to roughly how many people. Kept out of the
+    Post row so that flushing impressions doesn't rewrite it. Updated in
+    batches by posts/impressions.py.
+    """
+
+    post = models.OneToOneField(
+        Post, primary_key=True, related_name="reach", on_delete=models.CASCADE
+    )
+    views = models.BigIntegerField(default=0)
+    # sketch.count() as of the last flush, so reads don't decode the sketch.
+    unique_viewers = models.IntegerField(default=0)
+    # HyperLogLog.to_bytes(), see posts/hll.py.
+    sketch = models.BinaryField(default=b"")
 
 
 class Attachment(BaseModel):
@@ -28,10 +68,57 @@ class Attachment(BaseModel):
 class Like(BaseModel):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # Likers newest first, see PostLikersView.
+            models.Index(fields=["post", "created_at"], name="like_post_time_idx"),
+            # Whether given users liked a post (friends of the viewer, the
+            # viewer themselves) without reading all of its likes.
+            models.Index(fields=["post", "created_by"], name="like_post_user_idx"),
+        ]
+
 
 class Comment(BaseModel):
     body = models.TextField(blank=True, null=True)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    is_deleted = models.BooleanField(default=False)
+    edited_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            models.Index(
+                fields=["post", "created_at"],
+                name="comment_thread_idx",
+                condition=Q(is_deleted=False),
+            )
+        ]
+
+
+class PostRevision(models.Model):
+    """
+    The body a post had before an edit. Only ever appended to and only read by
+    the history endpoint, never on the feed path.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    post = models.ForeignKey(Post, related_name="revisions", on_delete=models.CASCADE)
+    body = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+
+class CommentRevision(models.Model):
+    """The body a comment had before an edit, see PostRevision."""
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    comment = models.ForeignKey(
+        Comment, related_name="revisions", on_delete=models.CASCADE
+    )
+    body = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created_at",)
@@ -0,0 +1,99 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Comment, Like, Post
+
+
+def decay(created_at, now=None):
+    age = (now or timezone.now()) - created_at
+    half_life = settings.FEED_RANKING["half_life_hours"] * 3600
+    return 0.5 ** (age.total_seconds() / half_life)
+
+
+def compute_score(post, now=None):
+    ranking = settings.FEED_RANKING
+    engagement = (
+        1
+        + post.likes_count * ranking["like_weight"]
+        + post.comments_count * ranking["comment_weight"]
+    )
+    return engagement * decay(post.created_at, now)
+
+
+def recompute_scores(batch_size=1000, now=None):
+    """Re-decay every post in the ranking window and zero the ones that left it."""
+    now = now or timezone.now()
+    since = now - timedelta(days=settings.FEED_RANKING["max_age_days"])
+    Post.objects.filter(created_at__lt=since, score__gt=0).update(score=0)
+
+    updated = 0
+    last_pk = None
+    while True:
+        posts = Post.objects.filter(created_at__gte=since).order_by("pk")
+        if last_pk is not None:
+            posts = posts.filter(pk__gt=last_pk)
+        batch = list(
+            posts.only("pk", "created_at", "likes_count", "comments_count")[:batch_size]
+        )
+        if not batch:
+            return updated
+        for post in batch:
+            post.score = compute_score(post, now)
+        Post.objects.bulk_update(batch, ["score"])
+        updated += len(batch)
+        last_pk = batch[-1].pk
+
+
+def author_affinity(viewer):
+    """
+    How much the viewer interacts with each author lately, as a multiplier >= 1.
+    Bounded by the viewer's own recent likes and comments.
+    """
+    since = timezone.now() - timedelta(days=settings.FEED_RANKING["affinity_days"])
+    interactions = {}
+    for queryset, weight in (
+        (Like.objects.all(), 1),
+        (Comment.objects.filter(is_deleted=False), 2),
+    ):
+        counts = (
+            queryset.filter(created_by=viewer, created_at__gte=since)
+            .exclude(post__created_by=viewer)
+            .order_by()
+            .values_list("post__created_by")
+            .annotate(total=Count("*"))
+        )
+        for author_id, total in counts:
+            interactions[author_id] = interactions.get(author_id, 0) + weight * total
+    return {author_id: 1 + math.log1p(n) for author_id, n in interactions.items()}
+
+
+def ranked_feed(viewer, author_ids):
+    """
+    Take the best candidates from the given authors' posts in the ranking
+    window, then rerank that small set with the viewer's author affinity.
+
+    The window bounds the scan: each author's recent posts are a range of
+    post_feed_idx, then only that small set is sorted by score.
+    """
+    ranking = settings.FEED_RANKING
+    since = timezone.now() - timedelta(days=ranking["max_age_days"])
+    candidates = list(
+        Post.objects.filter(
+            created_by_id__in=author_ids,
+            created_at__gte=since,
+            score__gt=0,
+            is_deleted=False,
+        )
+        .select_related("created_by")
+        .order_by("-score")[: ranking["candidates"]]
+    )
+    affinity = author_affinity(viewer)
+    candidates.sort(
+        key=lambda post: post.score * affinity.get(post.created_by_id, 1),
+        reverse=True,
+    )
+    return candidates[: ranking["page_size"]]
@@ -1,24 +1,38 @@
 from rest_framework import serializers
-from accounts.serializers import UserSerializer
+from accounts.serializers import UserSerializer, UserSummarySerializer
+from wey.serializers import SparseFieldsMixin
 from django.utils.timesince import timesince
 
-from .models import Post, Comment
+from .counters import current_counts
+from .models import Post, Comment, Like
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     created_at = serializers.SerializerMethodField("format_created_at")
     likes_count = serializers.SerializerMethodField("get_likes_count")
     comments_count = serializers.SerializerMethodField("get_comments_count")
+    liked = serializers.SerializerMethodField("get_liked")
+    # liked comes from attach_liked_by_viewer().
+    method_sources = {
+        "created_at": ["created_at"],
+        "likes_count": ["likes_count"],
+        "comments_count": ["comments_count"],
+        "liked": [],
+    }
 
     def format_created_at(self, post):
         return timesince(post.created_at)
 
     def get_likes_count(self, post):
-        return post.like_set.count()
+        return current_counts(post)[0]
 
     def get_comments_count(self, post):
-        return post.comment_set.count()
+        return current_counts(post)[1]
+
+    def get_liked(self, post):
+        # None where it wasn't looked up, e.g. in responses shared by all users.
+        return getattr(post, "liked_by_viewer", None)
 
     class Meta:
         model = Post
@@ -27,27 +41,47 @@ class PostSerializer(serializers.ModelSerializer):
             "created_by",
             "body",
             "created_at",
+            "edited_at",
             "likes_count",
             "comments_count",
+            "liked",
         )
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    created_by = UserSerializer(read_only=True)
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    created_by = UserSummarySerializer(read_only=True)
     created_at = serializers.SerializerMethodField("format_created_at")
+    method_sources = {"created_at": ["created_at"]}
 
     def format_created_at(self, post):
         return timesince(post.created_at)
 
     class Meta:
         model = Comment
-        fields = ("id", "body", "created_by", "created_at")
+        fields = ("id", "body", "created_by", "created_at", "edited_at")
 
 
-class PostDetailSerializer(serializers.Serializer):
-    id = serializers.UUIDField()
+class LikeSerializer(serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     created_at = serializers.SerializerMethodField("format_created_at")
+    is_friend = serializers.SerializerMethodField("get_is_friend")
+
+    def format_created_at(self, like):
+        return timesince(like.created_at)
+
+    def get_is_friend(self, like):
+        return like.created_by_id in self.context["friend_ids"]
+
+    class Meta:
+        model = Like
+        fields = ("id", "created_by", "created_at", "is_friend")
+
+
+class PostDetailSerializer(SparseFieldsMixin, serializers.Serializer):
+    id = serializers.UUIDField()
+    created_by = UserSummarySerializer(read_only=True)
+    created_at = serializers.SerializerMethodField("format_created_at")
+    edited_at = serializers.DateTimeField()
     likes_count = serializers.SerializerMethodField("get_likes_count")
     comment_set = CommentSerializer(read_only=True, many=True)
     comments_count = serializers.SerializerMethodField("get_comments_count")
@@ -56,10 +90,10 @@ class PostDetailSerializer(serializers.Serializer):
         return timesince(post.created_at)
 
     def get_likes_count(self, post):
-        return post.like_set.count()
+        return current_counts(post)[0]
 
     def get_comments_count(self, post):
-        return post.comment_set.count()
+        return current_counts(post)[1]
 
     class Meta:
         model = Post
@@ -68,7 +102,22 @@ class PostDetailSerializer(serializers.Serializer):
             "created_by",
             "body",
             "created_at",
+            "edited_at",
             "comment_set",
             "likes_count",
             "comments_count",
         )
+
+
+class RevisionSerializer(serializers.Serializer):
+    body = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+
+class BulkPostSerializer(serializers.Serializer):
+    MAX_ATTACHMENTS = 10
+
+    body = serializers.CharField(allow_blank=True, required=False, default="")
+    attachments = serializers.ListField(
+        child=serializers.ImageField(), required=False, max_length=MAX_ATTACHMENTS
+    )
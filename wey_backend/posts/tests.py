@@ -1,10 +1,30 @@
+import base64
+import io
+import json
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import status
+from PIL import Image
 
-from .models import Post, Like
+from accounts.models import FriendshipRequest
+from .models import Post, Like, Comment, Attachment, PostRevision
+from . import impressions
+from .counters import buffer, record, recount
+from .hll import HyperLogLog
+from .ranking import recompute_scores
+from .serializers import PostSerializer
+from .views import ProfileSummaryView, BulkPostCreateView
 
 
 class PostListViewTests(APITestCase):
@@ -60,6 +80,81 @@ class PostListViewTests(APITestCase):
         )
 
 
+class SparseFieldsTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="testuser", email="testuser@gmail.com", password="test"
+        )
+        self.friend = get_user_model().objects.create_user(
+            name="friend", email="friend@gmail.com", password="test"
+        )
+        self.user.friends.add(self.friend)
+        for i in range(3):
+            Post.objects.create(body=f"mine {i}", created_by=self.user)
+            Post.objects.create(body=f"theirs {i}", created_by=self.friend)
+        self.client.force_authenticate(self.user)
+
+    def get_posts(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("posts"), params)
+        post_queries = [q["sql"] for q in queries if 'FROM "posts_post"' in q["sql"]]
+        return response.data, queries, post_queries[0]
+
+    def test_default_representation_is_unchanged(self):
+        posts, queries, _ = self.get_posts()
+        self.assertEqual(
+            set(posts[0]),
+            {
+                "id",
+                "created_by",
+                "body",
+                "created_at",
+                "edited_at",
+                "likes_count",
+                "comments_count",
+                "liked",
+            },
+        )
+        self.assertEqual(
+            set(posts[0]["created_by"]),
+            {"id", "name", "email", "avatar", "friends_count"},
+        )
+        self.assertEqual(posts[0]["created_by"]["friends_count"], 1)
+        # The friends lookup, the posts with their authors, the friend counts
+        # and the viewer's likes.
+        self.assertEqual(len(queries), 4)
+
+    def test_fields_prune_output_and_columns(self):
+        posts, queries, sql = self.get_posts(fields="id,body")
+        self.assertEqual(set(posts[0]), {"id", "body"})
+        self.assertNotIn("score", sql)
+        self.assertNotIn("accounts_user", sql)
+        self.assertEqual(len(queries), 2)
+
+    def test_nested_fields(self):
+        posts, queries, sql = self.get_posts(fields="body,created_by.name")
+        self.assertEqual(set(posts[0]), {"body", "created_by"})
+        self.assertEqual(set(posts[0]["created_by"]), {"name"})
+        self.assertNotIn('"accounts_user"."email"', sql)
+        self.assertEqual(len(queries), 2)
+
+    def test_unexpanded_relations_are_ids(self):
+        posts, queries, sql = self.get_posts(expand="")
+        self.assertIn(posts[0]["created_by"], {self.user.id, self.friend.id})
+        self.assertNotIn("accounts_user", sql)
+
+    def test_post_detail(self):
+        post = Post.objects.filter(created_by=self.user).first()
+        Comment.objects.create(body="hi", post=post, created_by=self.friend)
+        response = self.client.get(
+            reverse("post_detail", args=[post.id]),
+            {"fields": "id,comment_set.body", "expand": "comment_set"},
+        )
+        self.assertEqual(
+            response.data["post"], {"id": str(post.id), "comment_set": [{"body": "hi"}]}
+        )
+
+
 class ProfilePostListViewTests(APITestCase):
     def setUp(self):
         self.user1 = get_user_model().objects.create_user(
@@ -98,6 +193,95 @@ class ProfilePostListViewTests(APITestCase):
         self.assertEqual(response.data["user"]["id"], str(another_user.id))
 
 
+class ProfileSummaryViewTests(APITestCase):
+    def setUp(self):
+        self.viewer = get_user_model().objects.create_user(
+            name="viewer", email="viewer@gmail.com", password="test"
+        )
+        self.profile = get_user_model().objects.create_user(
+            name="profile", email="profile@gmail.com", password="test"
+        )
+        viewer_refresh_token = RefreshToken.for_user(self.viewer)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {viewer_refresh_token.access_token}"
+        )
+
+    def add_activity(self, posts, friends):
+        for i in range(posts):
+            post = Post.objects.create(
+                body=f"post {i}",
+                created_by=self.profile,
+                likes_count=1,
+                comments_count=1,
+            )
+            Like.objects.create(post=post, created_by=self.viewer)
+            Comment.objects.create(body="hi", post=post, created_by=self.viewer)
+        for i in range(friends):
+            friend = get_user_model().objects.create_user(
+                name=f"friend{i}", email=f"friend{i}@gmail.com", password="test"
+            )
+            self.profile.friends.add(friend)
+
+    def test_summary(self):
+        self.add_activity(posts=3, friends=2)
+        url = reverse("profile_summary", kwargs={"id": self.profile.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["user"]["id"], str(self.profile.id))
+        self.assertEqual(response.data["user"]["friends_count"], 2)
+        self.assertEqual(len(response.data["posts"]), 3)
+        self.assertEqual(response.data["posts"][0]["likes_count"], 1)
+        self.assertEqual(response.data["posts"][0]["comments_count"], 1)
+        self.assertEqual(len(response.data["friends"]), 2)
+        self.assertEqual(response.data["friends"][0]["friends_count"], 1)
+        self.assertEqual(response.data["counts"], {"friends": 2, "posts": 3})
+        self.assertEqual(response.data["friendship_status"], "none")
+        self.assertIsNone(response.data["next"])
+
+    def test_query_count_and_page_do_not_grow_with_profile(self):
+        url = reverse("profile_summary", kwargs={"id": self.profile.id})
+        self.add_activity(posts=2, friends=2)
+        # The page isn't full, so the archive is checked for older posts.
+        with self.assertNumQueries(10):
+            self.client.get(url)
+
+        self.add_activity(posts=30, friends=0)
+        for i in range(20):
+            friend = get_user_model().objects.create_user(
+                name=f"more{i}", email=f"more{i}@gmail.com", password="test"
+            )
+            self.profile.friends.add(friend)
+        with self.assertNumQueries(9):
+            response = self.client.get(url)
+
+        self.assertEqual(
+            len(response.data["posts"]), ProfileSummaryView.POSTS_PAGE_SIZE
+        )
+        self.assertEqual(
+            len(response.data["friends"]), ProfileSummaryView.FRIENDS_PREVIEW_SIZE
+        )
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(url, {"before": response.data["next"]})
+        self.assertEqual(
+            len(response.data["posts"]), ProfileSummaryView.POSTS_PAGE_SIZE
+        )
+
+    def test_friendship_status(self):
+        url = reverse("profile_summary", kwargs={"id": self.profile.id})
+        FriendshipRequest.objects.create(
+            created_by=self.viewer, created_for=self.profile
+        )
+        self.assertEqual(self.client.get(url).data["friendship_status"], "request_sent")
+
+        self.profile.friends.add(self.viewer)
+        self.assertEqual(self.client.get(url).data["friendship_status"], "friends")
+
+        url = reverse("profile_summary", kwargs={"id": self.viewer.id})
+        self.assertEqual(self.client.get(url).data["friendship_status"], "self")
+
+
 class PostCreateViewTests(APITestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(
@@ -150,6 +334,7 @@ class LikePostViewTests(APITestCase):
 
     def test_like_already_liked_post_will_unlike(self):
         Like.objects.create(post=self.post, created_by=self.user)
+        Post.objects.filter(id=self.post.id).update(likes_count=1)
         url = reverse("like_post", kwargs={"id": str(self.post.id)})
         response = self.client.post(url)
         self.assertEqual(response.data["likes"], str(0))
@@ -174,3 +359,474 @@ class CreateCommentViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data["body"], "Hello")
         self.assertEqual(response.data["created_by"]["id"], str(self.user.id))
+
+
+class EditAndDeleteTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="testuser", email="testuser@gmail.com", password="test"
+        )
+        self.other = get_user_model().objects.create_user(
+            name="other", email="other@gmail.com", password="test"
+        )
+        self.post = Post.objects.create(
+            body="First", created_by=self.user, comments_count=1
+        )
+        self.comment = Comment.objects.create(
+            body="Hi", post=self.post, created_by=self.other
+        )
+        user_refresh_token = RefreshToken.for_user(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {user_refresh_token.access_token}"
+        )
+
+    def test_edit_post_keeps_history(self):
+        url = reverse("post_detail", args=[self.post.id])
+        self.client.patch(url, {"body": "Second"})
+        response = self.client.patch(url, {"body": "Third"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["body"], "Third")
+        self.assertIsNotNone(response.data["edited_at"])
+
+        response = self.client.get(reverse("post_revisions", args=[self.post.id]))
+        self.assertEqual(
+            [revision["body"] for revision in response.data], ["Second", "First"]
+        )
+
+    def test_cannot_edit_others_post(self):
+        post = Post.objects.create(body="Theirs", created_by=self.other)
+        response = self.client.patch(
+            reverse("post_detail", args=[post.id]), {"body": "Mine"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(PostRevision.objects.exists())
+
+    def test_edit_comment(self):
+        url = reverse("comment_detail", args=[self.post.id, self.comment.id])
+        response = self.client.patch(url, {"body": "Hello"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(self.other)
+        response = self.client.patch(url, {"body": "Hello"})
+        self.assertEqual(response.data["body"], "Hello")
+        response = self.client.get(
+            reverse("comment_revisions", args=[self.post.id, self.comment.id])
+        )
+        self.assertEqual([revision["body"] for revision in response.data], ["Hi"])
+
+    def test_post_author_can_delete_comment(self):
+        response = self.client.delete(
+            reverse("comment_detail", args=[self.post.id, self.comment.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(reverse("post_detail", args=[self.post.id]))
+        self.assertEqual(response.data["post"]["comment_set"], [])
+        self.assertEqual(response.data["post"]["comments_count"], 0)
+        response = self.client.get(reverse("posts"))
+        self.assertEqual(response.data[0]["comments_count"], 0)
+
+
+class CounterTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="testuser", email="testuser@gmail.com", password="test"
+        )
+        self.post = Post.objects.create(body="Viral", created_by=self.user)
+
+    @override_settings(WRITE_BUFFER_FLUSH_MS=60000)
+    def test_buffered_deltas_are_merged_into_one_update(self):
+        buffer._thread = object()  # don't start the background flusher
+        try:
+            for _ in range(3):
+                record(self.post, "like")
+            record(self.post, "like", -1)
+            record(self.post, "comment")
+
+            self.post.refresh_from_db()
+            self.assertEqual(self.post.likes_count, 0)
+            data = PostSerializer(self.post).data
+            self.assertEqual((data["likes_count"], data["comments_count"]), (2, 1))
+            with self.assertNumQueries(1):
+                buffer.flush()
+        finally:
+            buffer._thread = None
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.comments_count), (2, 1))
+        self.assertAlmostEqual(self.post.score, 5.0, places=3)
+
+    def test_recount(self):
+        Like.objects.create(post=self.post, created_by=self.user)
+        Comment.objects.create(body="hi", post=self.post, created_by=self.user)
+        Comment.objects.create(
+            body="gone", post=self.post, created_by=self.user, is_deleted=True
+        )
+        recount()
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.comments_count), (1, 1))
+
+
+class RankedFeedTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="testuser", email="testuser@gmail.com", password="test"
+        )
+        self.close_friend = get_user_model().objects.create_user(
+            name="close friend", email="close@gmail.com", password="test"
+        )
+        self.friend = get_user_model().objects.create_user(
+            name="friend", email="friend@gmail.com", password="test"
+        )
+        self.user.friends.add(self.close_friend, self.friend)
+        user_refresh_token = RefreshToken.for_user(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {user_refresh_token.access_token}"
+        )
+
+    def test_likes_and_comments_update_score(self):
+        post = Post.objects.create(body="Popular", created_by=self.friend)
+        self.client.post(reverse("like_post", kwargs={"id": post.id}))
+        self.client.post(
+            reverse("create_comment", kwargs={"id": post.id}), {"body": "!"}
+        )
+        post.refresh_from_db()
+        self.assertAlmostEqual(post.score, 4.0, places=3)
+
+        self.client.post(reverse("like_post", kwargs={"id": post.id}))
+        post.refresh_from_db()
+        self.assertAlmostEqual(post.score, 3.0, places=3)
+
+    def test_ranked_mode_orders_by_score_and_affinity(self):
+        old = Post.objects.create(body="Old", created_by=self.friend)
+        Post.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+        popular = Post.objects.create(body="Popular", created_by=self.friend)
+        from_close_friend = Post.objects.create(
+            body="Close", created_by=self.close_friend
+        )
+        for i in range(2):
+            fan = get_user_model().objects.create_user(
+                name=f"fan{i}", email=f"fan{i}@gmail.com", password="test"
+            )
+            Like.objects.create(post=popular, created_by=fan)
+        earlier = Post.objects.create(body="Earlier", created_by=self.close_friend)
+        for _ in range(5):
+            Comment.objects.create(body="hi", post=earlier, created_by=self.user)
+        recount()
+        recompute_scores()
+
+        response = self.client.get(reverse("posts"), {"mode": "ranked"})
+        self.assertEqual(
+            [post["body"] for post in response.data],
+            ["Earlier", "Close", "Popular", "Old"],
+        )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BulkPostCreateViewTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="testuser", email="testuser@gmail.com", password="test"
+        )
+        user_refresh_token = RefreshToken.for_user(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {user_refresh_token.access_token}"
+        )
+
+    def image(self, name, color="black"):
+        content = io.BytesIO()
+        Image.new("RGB", (4, 4), color).save(content, "PNG")
+        return SimpleUploadedFile(name, content.getvalue(), content_type="image/png")
+
+    def test_create_posts_with_attachments(self):
+        posts = [
+            {"body": "first", "attachments": ["a", "b"]},
+            {"body": "second"},
+            {"body": "third", "attachments": ["c"]},
+        ]
+        data = {
+            "posts": json.dumps(posts),
+            "a": self.image("a.png"),
+            "b": self.image("b.png"),
+            "c": self.image("c.png"),
+        }
+        response = self.client.post(reverse("bulk_create_posts"), data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [p["body"] for p in response.data], ["first", "second", "third"]
+        )
+        self.assertEqual([len(p["attachments"]) for p in response.data], [2, 0, 1])
+        self.assertEqual(Post.objects.filter(created_by=self.user).count(), 3)
+        self.assertEqual(Attachment.objects.count(), 3)
+        for attachment in Attachment.objects.all():
+            self.assertTrue(attachment.image.storage.exists(attachment.image.name))
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        data = {"posts": json.dumps([{"body": str(i)} for i in range(50)])}
+        with self.assertNumQueries(5):
+            response = self.client.post(reverse("bulk_create_posts"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_invalid_attachment_rejects_whole_batch(self):
+        posts = [{"body": "ok"}, {"body": "broken", "attachments": ["bad"]}]
+        data = {
+            "posts": json.dumps(posts),
+            "bad": SimpleUploadedFile("bad.png", b"not an image"),
+        }
+        response = self.client.post(reverse("bulk_create_posts"), data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("attachments", response.data["posts"][1])
+        self.assertEqual(Post.objects.count(), 0)
+
+    def test_failed_batch_keeps_files_other_attachments_use(self):
+        posts = json.dumps([{"body": "first", "attachments": ["a"]}])
+        data = {"posts": posts, "a": self.image("a.png")}
+        self.client.post(reverse("bulk_create_posts"), data)
+        existing = Attachment.objects.get().image
+
+        posts = json.dumps([{"body": "again", "attachments": ["a", "b"]}])
+        data = {
+            "posts": posts,
+            "a": self.image("a.png"),
+            "b": self.image("b.png", "red"),
+        }
+        with mock.patch.object(
+            Attachment.objects, "bulk_create", side_effect=RuntimeError
+        ), mock.patch.object(existing.storage, "delete") as delete:
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse("bulk_create_posts"), data)
+
+        self.assertTrue(existing.storage.exists(existing.name))
+        # Only the new red image is cleaned up.
+        self.assertEqual(len(delete.call_args_list), 1)
+        self.assertNotEqual(delete.call_args.args[0], existing.name)
+
+    def test_too_many_posts(self):
+        data = {"posts": [{"body": "x"}] * (BulkPostCreateView.MAX_POSTS + 1)}
+        response = self.client.post(reverse("bulk_create_posts"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            name="admin", email="admin@gmail.com", password="test"
+        )
+        self.author = get_user_model().objects.create_user(
+            name="author", email="author@gmail.com", password="test"
+        )
+        self.posts = [
+            Post.objects.create(body=str(i), created_by=self.author) for i in range(3)
+        ]
+        for post in self.posts:
+            Like.objects.create(post=post, created_by=self.admin)
+            Comment.objects.create(body="Nice", post=post, created_by=self.admin)
+        self.client.force_login(self.admin)
+
+    def changelist(self, model, **params):
+        url = reverse(f"admin:posts_{model}_changelist")
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_changelists_do_not_grow_with_rows(self):
+        for model in ("post", "like", "comment"):
+            with CaptureQueriesContext(connection) as before:
+                self.changelist(model)
+            for post in self.posts:
+                Like.objects.create(post=post, created_by=self.author)
+                Comment.objects.create(body="Nice", post=post, created_by=self.author)
+            with CaptureQueriesContext(connection) as after:
+                self.changelist(model)
+            self.assertEqual(len(after), len(before), model)
+
+    def test_newest_first_by_primary_key(self):
+        response = self.changelist("post")
+        ids = [post.id for post in response.context["cl"].result_list]
+        self.assertEqual(ids, [post.id for post in reversed(self.posts)])
+
+    def test_search(self):
+        post = self.posts[1]
+        response = self.changelist("post", q=str(post.id))
+        self.assertEqual(list(response.context["cl"].result_list), [post])
+
+        response = self.changelist("like", q="auth")
+        self.assertEqual(response.context["cl"].result_count, 0)
+        response = self.changelist("like", q="adm")
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+    def test_change_form_uses_raw_id_widget(self):
+        like = Like.objects.first()
+        response = self.client.get(reverse("admin:posts_like_change", args=[like.id]))
+        self.assertContains(response, "vForeignKeyRawIdAdminField")
+
+
+class HyperLogLogTests(SimpleTestCase):
+    def test_estimate_is_close(self):
+        sketch = HyperLogLog()
+        for i in range(20000):
+            sketch.add(str(i).encode())
+            sketch.add(str(i).encode())
+        self.assertAlmostEqual(sketch.count(), 20000, delta=20000 * 0.05)
+
+    def test_merge_and_round_trip(self):
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(100):
+            a.add(b"a%d" % i)
+            b.add(b"b%d" % i)
+        data = a.to_bytes()
+        self.assertLess(len(data), 400)  # Sparse while nearly empty.
+
+        a.update(b)
+        self.assertAlmostEqual(a.count(), 200, delta=10)
+        copy = HyperLogLog.from_bytes(a.to_bytes())
+        self.assertEqual(copy.registers, a.registers)
+        self.assertEqual(HyperLogLog.from_bytes(b"").count(), 0)
+
+
+class ImpressionTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="author", email="author@gmail.com", password="test"
+        )
+        self.viewers = [
+            get_user_model().objects.create_user(
+                name=f"viewer{i}", email=f"viewer{i}@gmail.com", password="test"
+            )
+            for i in range(3)
+        ]
+        for viewer in self.viewers:
+            self.user.friends.add(viewer)
+        self.post = Post.objects.create(body="Look", created_by=self.user)
+
+        # Views are only counted with buffering on. Flush by hand instead of
+        # starting the background flusher.
+        override = override_settings(IMPRESSIONS_FLUSH_MS=60000)
+        override.enable()
+        self.addCleanup(override.disable)
+        impressions.buffer._thread = object()
+        self.addCleanup(setattr, impressions.buffer, "_thread", None)
+        self.addCleanup(impressions.buffer.flush)
+
+    def view(self, viewer, detail=False):
+        self.client.force_authenticate(viewer)
+        url = reverse("post_detail", args=[self.post.id]) if detail else "/posts/"
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def reach(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("post_reach", args=[self.post.id]))
+        return response.data
+
+    def test_feed_and_detail_views_are_counted(self):
+        for viewer in self.viewers:
+            self.view(viewer)
+        self.view(self.viewers[0], detail=True)
+        self.view(self.viewers[0], detail=True)  # Response cache hit.
+        impressions.buffer.flush()
+        self.assertEqual(self.reach(), {"views": 5, "unique_viewers": 3})
+
+    def test_views_are_buffered(self):
+        for viewer in self.viewers * 3:
+            self.view(viewer)
+        self.assertEqual(self.reach(), {"views": 9, "unique_viewers": 0})
+        with self.assertNumQueries(6):
+            impressions.buffer.flush()
+        self.assertEqual(self.reach(), {"views": 9, "unique_viewers": 3})
+
+    @override_settings(IMPRESSIONS_FLUSH_MS=0)
+    def test_views_are_not_counted_without_buffering(self):
+        self.view(self.viewers[0])
+        self.view(self.viewers[0], detail=True)
+        self.assertEqual(self.reach(), {"views": 0, "unique_viewers": 0})
+
+    def test_reach_is_for_the_author_only(self):
+        self.client.force_authenticate(self.viewers[0])
+        response = self.client.get(reverse("post_reach", args=[self.post.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class PostLikersViewTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.viewer = User.objects.create_user(
+            name="viewer", email="viewer@gmail.com", password="test"
+        )
+        self.post = Post.objects.create(body="Viral", created_by=self.viewer)
+        self.friends = []
+        self.strangers = []
+        for i in range(6):
+            user = User.objects.create_user(
+                name=f"user{i}", email=f"user{i}@gmail.com", password="test"
+            )
+            if i % 3 == 0:
+                self.viewer.friends.add(user)
+                self.friends.append(user)
+            else:
+                self.strangers.append(user)
+            Like.objects.create(post=self.post, created_by=user)
+        Like.objects.create(post=self.post, created_by=self.viewer)
+        self.client.force_authenticate(self.viewer)
+        self.url = reverse("post_likes", args=[self.post.id])
+
+    def likers(self, limit):
+        names, friends, cursor = [], [], None
+        while True:
+            params = {"limit": limit}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            names += [like["created_by"]["name"] for like in response.data["likes"]]
+            friends += [like["is_friend"] for like in response.data["likes"]]
+            cursor = response.data["next"]
+            if cursor is None:
+                return names, friends
+
+    def test_viewer_and_friends_first_then_newest_first(self):
+        expected = (
+            ["viewer", "user3", "user0"],
+            ["user5", "user4", "user2", "user1"],
+        )
+        for limit in (2, 3, 4, 100):
+            names, friends = self.likers(limit)
+            self.assertEqual(names, expected[0] + expected[1], limit)
+        self.assertEqual(friends, [False, True, True] + [False] * 4)
+
+    def test_page_cost_does_not_grow(self):
+        self.client.get(self.url, {"limit": 2})  # Caches the friend ids.
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(self.url, {"limit": 2})
+        for user in self.strangers:
+            Like.objects.create(post=self.post, created_by=user)
+        with CaptureQueriesContext(connection) as after:
+            self.client.get(self.url, {"limit": 2})
+        self.assertEqual(len(after), len(before))
+
+    def test_new_friends_move_up(self):
+        stranger = self.strangers[-1]
+        FriendshipRequest.objects.create(created_by=stranger, created_for=self.viewer)
+        self.likers(10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("handle_request", args=[stranger.id, "accepted"]))
+        names, _ = self.likers(10)
+        self.assertEqual(names[:4], ["viewer", "user5", "user3", "user0"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "nonsense"})
+        self.assertEqual(response.status_code, 400)
+        for parts in (["2024-01-01T00:00:00", 1], {"a": 1, "b": 2}, ["a", "b"]):
+            cursor = base64.urlsafe_b64encode(json.dumps(parts).encode()).decode()
+            response = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_feed_flags_liked_posts(self):
+        other = Post.objects.create(body="Meh", created_by=self.viewer)
+        response = self.client.get(reverse("posts"))
+        liked = {post["id"]: post["liked"] for post in response.data}
+        self.assertEqual(liked, {str(self.post.id): True, str(other.id): False})
@@ -3,17 +3,43 @@ from django.urls import path
 from .views import (
     PostListView,
     PostCreateView,
+    BulkPostCreateView,
     ProfilePostListView,
+    ProfileSummaryView,
     LikePostView,
     PostDetailView,
     CreateCommentView,
+    CommentDetailView,
+    PostRevisionListView,
+    CommentRevisionListView,
+    PostReachView,
+    PostLikersView,
 )
 
 urlpatterns = [
     path("", PostListView.as_view(), name="posts"),
     path("profile/<uuid:id>", ProfilePostListView.as_view(), name="profile_posts"),
+    path(
+        "profile/<uuid:id>/summary",
+        ProfileSummaryView.as_view(),
+        name="profile_summary",
+    ),
     path("create", PostCreateView.as_view(), name="create_post"),
+    path("bulk", BulkPostCreateView.as_view(), name="bulk_create_posts"),
     path("<uuid:id>/like/", LikePostView.as_view(), name="like_post"),
     path("<uuid:id>/comment/", CreateCommentView.as_view(), name="create_comment"),
+    path(
+        "<uuid:post_id>/comment/<uuid:id>/",
+        CommentDetailView.as_view(),
+        name="comment_detail",
+    ),
+    path(
+        "<uuid:post_id>/comment/<uuid:id>/revisions/",
+        CommentRevisionListView.as_view(),
+        name="comment_revisions",
+    ),
+    path("<uuid:id>/revisions/", PostRevisionListView.as_view(), name="post_revisions"),
+    path("<uuid:id>/likes/", PostLikersView.as_view(), name="post_likes"),
+    path("<uuid:id>/reach/", PostReachView.as_view(), name="post_reach"),
     path("<uuid:id>/", PostDetailView.as_view(), name="post_detail"),
 ]
@@ -0,0 +1,25 @@
+from wey.serializers import is_requested
+
+from .models import Like
+
+
+def attach_liked_by_viewer(serializer, viewer):
+    """
+    Set liked_by_viewer on each post of a PostSerializer(many=True), with one
+    query for the page, if the serializer renders "liked".
+    """
+    if not is_requested(serializer, "liked"):
+        return
+    # Archived posts come with it already set.
+    posts = [
+        post for post in serializer.instance if not hasattr(post, "liked_by_viewer")
+    ]
+    if not posts:
+        return
+    liked = set(
+        Like.objects.filter(
+            created_by=viewer, post_id__in=[post.id for post in posts]
+        ).values_list("post_id", flat=True)
+    )
+    for post in posts:
+        post.liked_by_viewer = post.id in liked
@@ -1,12 +1,60 @@
+import json
+
+from django.core.cache import cache
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from .serializers import PostSerializer, PostDetailSerializer, CommentSerializer
-from .models import Post, Like, Comment
-from accounts.models import User
+from .serializers import (
+    PostSerializer,
+    PostDetailSerializer,
+    CommentSerializer,
+    LikeSerializer,
+    RevisionSerializer,
+    BulkPostSerializer,
+)
+from .models import (
+    Post,
+    Like,
+    Comment,
+    Attachment,
+    PostRevision,
+    CommentRevision,
+)
+from . import impressions
+from .counters import current_counts, record
+from .ranking import ranked_feed
+from .utils import attach_liked_by_viewer
+from accounts.models import FriendshipRequest, User
+from archive.jobs import restore
+from archive.models import ArchivedRow
+from archive.reads import (
+    POST,
+    archived_post,
+    archived_post_row,
+    page_with_archive,
+)
+from archive.serializers import ArchivedPostDetailSerializer
 from accounts.serializers import UserSerializer
+from accounts.utils import (
+    attach_friend_counts,
+    attach_requested_friend_counts,
+    get_friend_ids,
+)
+from deletions.purge import schedule_deletion
+from notifications.models import Notification
+from notifications.utils import notify
+from realtime.events import publish_to_network
+from wey.cache import bump_version, cache_response
+from wey.concurrency import gather
+from wey.pagination import before_cursor, encode_cursor, get_cursor
+from wey.serializers import sparse_queryset
 
 
 class PostListView(APIView):
@@ -15,24 +63,283 @@ class PostListView(APIView):
         for friend in request.user.friends.all():
             ids.append(friend.id)
 
-        posts = Post.objects.filter(created_by_id__in=ids)
-        serializer = PostSerializer(posts, many=True)
+        context = {"request": request}
+        if request.query_params.get("mode") == "ranked":
+            posts = ranked_feed(request.user, ids)
+        else:
+            posts = sparse_queryset(
+                Post.objects.filter(created_by_id__in=ids, is_deleted=False),
+                PostSerializer(many=True, context=context),
+            )
+        posts = list(posts)
+        impressions.record([post.id for post in posts], request.user)
+        serializer = PostSerializer(posts, many=True, context=context)
+        attach_requested_friend_counts(serializer, "created_by")
+        attach_liked_by_viewer(serializer, request.user)
         return Response(serializer.data)
 
 
+def edit_body(instance, revision_model, body):
+    """Append the current body to the revision table, then replace it."""
+    revision_model.objects.create(
+        **{instance._meta.model_name: instance}, body=instance.body
+    )
+    instance.body = body
+    instance.edited_at = timezone.now()
+    instance.save(update_fields=["body", "edited_at"])
+
+
+def post_author_id(id):
+    """
+    The author of post `id`, hot or archived, or None. Cached for good: a
+    post never changes hands.
+    """
+    key = f"post_author:{id}"
+    author_id = cache.get(key)
+    if author_id is None:
+        author_id = (
+            Post.objects.filter(id=id).values_list("created_by_id", flat=True).first()
+            or ArchivedRow.objects.filter(model=POST, object_id=id)
+            .values_list("owner_id", flat=True)
+            .first()
+        )
+        if author_id is not None:
+            cache.set(key, author_id, None)
+    return author_id
+
+
+def post_detail_versions(request, id):
+    # The author's version is bumped once when they delete their account,
+    # instead of one bump per post.
+    author_id = post_author_id(id)
+    if author_id is None:
+        return [f"post:{id}"]
+    return [f"post:{id}", f"user:{author_id}"]
+
+
 class PostDetailView(APIView):
+    @impressions.tracks_views
+    @cache_response(versions=post_detail_versions)
     def get(self, request, id):
-        post = Post.objects.get(id=id)
-        details = PostDetailSerializer(post).data
+        context = {"request": request}
+        post = (
+            Post.objects.prefetch_related(
+                Prefetch(
+                    "comment_set",
+                    queryset=Comment.objects.filter(is_deleted=False).select_related(
+                        "created_by"
+                    ),
+                )
+            )
+            .filter(id=id, is_deleted=False, created_by__is_active=True)
+            .first()
+        )
+        if post is None:
+            post = archived_post(id)
+            if post is None:
+                raise Http404
+            details = ArchivedPostDetailSerializer(post, context=context).data
+        else:
+            details = PostDetailSerializer(post, context=context).data
         return Response({"post": details})
 
+    def patch(self, request, id):
+        body = request.data.get("body")
+        if body is None:
+            return Response(
+                {"body": ["This field is required."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        with transaction.atomic():
+            post = get_object_or_404(
+                Post.objects.select_for_update(),
+                id=id,
+                created_by=request.user,
+                is_deleted=False,
+            )
+            edit_body(post, PostRevision, body)
+            bump_version(f"post:{post.id}", "search")
+        data = PostSerializer(post).data
+        publish_to_network(request.user.id, "post_updated", data)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def delete(self, request, id):
+        post = Post.objects.filter(
+            id=id, created_by=request.user, is_deleted=False
+        ).first()
+        if post is None:
+            return self.delete_archived(request, id)
+        # Hide it now, the likes, comments and attachments are purged in
+        # batches by the deletion worker.
+        with transaction.atomic():
+            Post.objects.filter(id=post.id).update(is_deleted=True)
+            schedule_deletion(post)
+            bump_version(f"post:{post.id}", "search")
+        publish_to_network(request.user.id, "post_deleted", {"post": post.id})
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def delete_archived(self, request, id):
+        with transaction.atomic():
+            row = archived_post_row(id, request.user)
+            if row is None:
+                raise Http404
+            row.data["is_deleted"] = True
+            row.save(update_fields=["data"])
+            schedule_deletion(row)
+            bump_version(f"post:{id}")
+        publish_to_network(request.user.id, "post_deleted", {"post": id})
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class ProfilePostListView(APIView):
+    """
+    The profile's posts in pages of ?limit=, newest first. Follow ?before=<next>
+    for older ones, falling through to the archive once the cursor goes past
+    the hot window (see archive.reads.page_with_archive).
+    """
+
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    def get(self, request, id):
+        user = get_object_or_404(User, id=id, is_active=True)
+        context = {"request": request, "sparse_root": "posts"}
+        posts = sparse_queryset(
+            Post.objects.filter(created_by_id=id, is_deleted=False),
+            PostSerializer(many=True, context=context),
+        )
+        try:
+            limit = max(
+                1,
+                min(
+                    int(request.query_params.get("limit", self.PAGE_SIZE)),
+                    self.MAX_PAGE_SIZE,
+                ),
+            )
+        except ValueError:
+            limit = self.PAGE_SIZE
+        posts, has_more = page_with_archive(
+            posts, user, get_cursor(request), limit, request.user
+        )
+        serializer = PostSerializer(posts, many=True, context=context)
+        attach_requested_friend_counts(serializer, "created_by")
+        attach_liked_by_viewer(serializer, request.user)
+        user_serializer = UserSerializer(
+            user, context={"request": request, "sparse_root": "user"}
+        )
+        return Response(
+            {
+                "posts": serializer.data,
+                "user": user_serializer.data,
+                "next": (
+                    encode_cursor(posts[-1].created_at, posts[-1].id)
+                    if has_more
+                    else None
+                ),
+            }
+        )
+
+
+class ProfileSummaryView(APIView):
+    """
+    Everything the profile page needs in one response. The profile user is
+    fetched once and shared by every section, and each section is bounded, so
+    the query count and payload size do not grow with the profile.
+    """
+
+    POSTS_PAGE_SIZE = 10
+    MAX_POSTS_PAGE_SIZE = 20
+    FRIENDS_PREVIEW_SIZE = 9
+
     def get(self, request, id):
-        posts = Post.objects.filter(created_by_id=id)
-        serializer = PostSerializer(posts, many=True)
-        user = User.objects.get(id=id)
-        return Response({"posts": serializer.data, "user": UserSerializer(user).data})
+        user = get_object_or_404(
+            User.objects.annotate(friends_total=Count("friends")),
+            id=id,
+            is_active=True,
+        )
+        viewer = request.user
+
+        try:
+            limit = max(
+                1,
+                min(
+                    int(request.query_params.get("limit", self.POSTS_PAGE_SIZE)),
+                    self.MAX_POSTS_PAGE_SIZE,
+                ),
+            )
+        except ValueError:
+            limit = self.POSTS_PAGE_SIZE
+        cursor = get_cursor(request)
+
+        def get_posts():
+            return page_with_archive(
+                Post.objects.filter(created_by_id=user.id, is_deleted=False),
+                user,
+                cursor,
+                limit,
+                viewer,
+            )
+
+        def get_friends_preview():
+            friends = list(user.friends.all()[: self.FRIENDS_PREVIEW_SIZE])
+            attach_friend_counts(friends)
+            return friends
+
+        def get_posts_count():
+            return Post.objects.filter(created_by_id=user.id, is_deleted=False).count()
+
+        def get_friendship_status():
+            if viewer.id == user.id:
+                return "self"
+            if User.friends.through.objects.filter(
+                from_user_id=viewer.id, to_user_id=user.id
+            ).exists():
+                return "friends"
+            created_by_id = (
+                FriendshipRequest.objects.filter(
+                    Q(created_by_id=viewer.id, created_for_id=user.id)
+                    | Q(created_by_id=user.id, created_for_id=viewer.id),
+                    status=FriendshipRequest.PENDING,
+                )
+                .values_list("created_by_id", flat=True)
+                .first()
+            )
+            if created_by_id is None:
+                return "none"
+            return "request_sent" if created_by_id == viewer.id else "request_received"
+
+        (posts, has_more), friends, posts_count, friendship_status = gather(
+            get_posts, get_friends_preview, get_posts_count, get_friendship_status
+        )
+        posts_serializer = PostSerializer(
+            posts, many=True, context={"request": request, "sparse_root": "posts"}
+        )
+        attach_liked_by_viewer(posts_serializer, viewer)
+
+        return Response(
+            {
+                "user": UserSerializer(
+                    user, context={"request": request, "sparse_root": "user"}
+                ).data,
+                "posts": posts_serializer.data,
+                "next": (
+                    encode_cursor(posts[-1].created_at, posts[-1].id)
+                    if has_more
+                    else None
+                ),
+                "friends": UserSerializer(
+                    friends,
+                    many=True,
+                    context={"request": request, "sparse_root": "friends"},
+                ).data,
+                "friendship_status": friendship_status,
+                "counts": {
+                    "friends": user.friends_total,
+                    "posts": posts_count,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class PostCreateView(APIView):
@@ -41,40 +348,312 @@ class PostCreateView(APIView):
         if serializer.is_valid():
             post = serializer.save(created_by=request.user)
             post.save()
+            publish_to_network(request.user.id, "post_created", serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.error_messages, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkPostCreateView(APIView):
+    """
+    Create up to MAX_POSTS posts with their attachments in one request. Send
+    multipart form data with a `posts` field holding a JSON list such as
+    [{"body": "...", "attachments": ["file0", "file1"]}], where the attachment
+    names refer to file fields of the same request.
+    """
+
+    MAX_POSTS = 100
+
+    def post(self, request):
+        # Spool every upload to a temporary file in chunks, however small, so
+        # a large batch never sits in memory.
+        request._request.upload_handlers = [
+            TemporaryFileUploadHandler(request._request)
+        ]
+
+        items = request.data.get("posts")
+        if isinstance(items, str):
+            try:
+                items = json.loads(items)
+            except ValueError:
+                items = None
+        if not isinstance(items, list) or not 0 < len(items) <= self.MAX_POSTS:
+            return Response(
+                {"posts": [f"Expected a list of 1 to {self.MAX_POSTS} posts."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = []
+        for item in items:
+            if not isinstance(item, dict):
+                data.append(item)
+                continue
+            item = dict(item)
+            if "attachments" in item:
+                item["attachments"] = [
+                    request.FILES.get(name) for name in item["attachments"]
+                ]
+            data.append(item)
+
+        serializer = BulkPostSerializer(data=data, many=True)
+        if not serializer.is_valid():
+            return Response(
+                {"posts": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        image_field = Attachment._meta.get_field("image")
+        posts, attachments, saved = [], [], []
+        try:
+            for item in serializer.validated_data:
+                post = Post(body=item["body"], created_by=request.user)
+                posts.append(post)
+                for upload in item.get("attachments", []):
+                    # Storage.save copies the upload chunk by chunk.
+                    name = image_field.storage.save(
+                        image_field.generate_filename(None, upload.name), upload
+                    )
+                    saved.append(name)
+                    attachments.append(
+                        Attachment(post=post, created_by=request.user, image=name)
+                    )
+
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+                Attachment.objects.bulk_create(attachments)
+        except Exception:
+            # Content-hashed storage hands back the existing file for bytes it
+            # already has, so only delete what no other attachment points at.
+            saved = set(saved) - set(
+                Attachment.objects.filter(image__in=saved).values_list(
+                    "image", flat=True
+                )
+            )
+            for name in saved:
+                image_field.storage.delete(name)
+            raise
+
+        attach_friend_counts([request.user])
+        data = PostSerializer(posts, many=True).data
+        images = {}
+        for attachment in attachments:
+            images.setdefault(str(attachment.post_id), []).append(attachment.image.url)
+        for post in data:
+            post["attachments"] = images.get(post["id"], [])
+
+        publish_to_network(request.user.id, "posts_created", data)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class CommentDetailView(APIView):
+    def patch(self, request, post_id, id):
+        body = request.data.get("body")
+        if body is None:
+            return Response(
+                {"body": ["This field is required."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        with transaction.atomic():
+            comment = get_object_or_404(
+                Comment.objects.select_for_update(),
+                id=id,
+                post_id=post_id,
+                created_by=request.user,
+                is_deleted=False,
+            )
+            edit_body(comment, CommentRevision, body)
+            bump_version(f"post:{post_id}")
+        return Response(CommentSerializer(comment).data, status=status.HTTP_200_OK)
+
+    def delete(self, request, post_id, id):
+        # The comment's author or the post's author can remove it.
+        comment = get_object_or_404(
+            Comment.objects.select_related("post").filter(
+                Q(created_by=request.user) | Q(post__created_by=request.user)
+            ),
+            id=id,
+            post_id=post_id,
+            is_deleted=False,
+        )
+        if Comment.objects.filter(id=comment.id, is_deleted=False).update(
+            is_deleted=True
+        ):
+            record(comment.post, "comment", -1)
+            bump_version(f"post:{post_id}")
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PostRevisionListView(APIView):
+    def get(self, request, id):
+        post = get_object_or_404(
+            Post, id=id, is_deleted=False, created_by__is_active=True
+        )
+        revisions = PostRevision.objects.filter(post=post)
+        return Response(RevisionSerializer(revisions, many=True).data)
+
+
+class PostReachView(APIView):
+    """Views and approximate unique viewers of one of your posts."""
+
+    def get(self, request, id):
+        post = get_object_or_404(Post, id=id, created_by=request.user, is_deleted=False)
+        views, unique_viewers = impressions.current_reach(post.id)
+        return Response({"views": views, "unique_viewers": unique_viewers})
+
+
+class PostLikersView(APIView):
+    """
+    Who liked a post, paginated with ?cursor=<next>. The viewer and their
+    friends come first, then everyone else, each newest first. Each segment
+    is a keyset scan of the like_post_* indexes joined with the users, so a
+    page costs the same on a post with millions of likes.
+    """
+
+    PAGE_SIZE = 30
+    MAX_PAGE_SIZE = 100
+    SEGMENTS = ("friends", "others")
+
+    def get(self, request, id):
+        post = get_object_or_404(
+            Post, id=id, is_deleted=False, created_by__is_active=True
+        )
+        try:
+            limit = max(
+                1,
+                min(
+                    int(request.query_params.get("limit", self.PAGE_SIZE)),
+                    self.MAX_PAGE_SIZE,
+                ),
+            )
+        except ValueError:
+            limit = self.PAGE_SIZE
+        after = get_cursor(request, "cursor")
+
+        friend_ids = get_friend_ids(request.user)
+        known = friend_ids | {request.user.id}
+        segment = self.SEGMENTS[0]
+        if after is not None:
+            # Carry on in the segment of the like the last page ended with. If
+            # it was unliked since, start over at the friends: that may repeat
+            # some of them but never skips anyone.
+            author_id = (
+                Like.objects.filter(id=after[1])
+                .values_list("created_by_id", flat=True)
+                .first()
+            )
+            if author_id is not None and author_id not in known:
+                segment = "others"
+        likes = Like.objects.filter(post=post).select_related("created_by")
+        segments = {
+            "friends": likes.filter(created_by_id__in=known),
+            "others": likes.exclude(created_by_id__in=known),
+        }
+
+        page = []
+        for name in self.SEGMENTS[self.SEGMENTS.index(segment) :]:
+            rows = before_cursor(segments[name], "created_at", after)
+            after = None
+            page.extend(rows[: limit + 1 - len(page)])
+            if len(page) > limit:
+                break
+
+        has_more = len(page) > limit
+        page = page[:limit]
+        attach_friend_counts([like.created_by for like in page])
+        serializer = LikeSerializer(page, many=True, context={"friend_ids": friend_ids})
+        return Response(
+            {
+                "likes": serializer.data,
+                "next": (
+                    encode_cursor(page[-1].created_at, page[-1].id)
+                    if has_more
+                    else None
+                ),
+            }
+        )
+
+
+class CommentRevisionListView(APIView):
+    def get(self, request, post_id, id):
+        comment = get_object_or_404(
+            Comment,
+            id=id,
+            post_id=post_id,
+            is_deleted=False,
+            created_by__is_active=True,
+            post__is_deleted=False,
+            post__created_by__is_active=True,
+        )
+        revisions = CommentRevision.objects.filter(comment=comment)
+        return Response(RevisionSerializer(revisions, many=True).data)
+
+
+def live_post_or_404(id):
+    """
+    A live post by an active account, to like or comment on. Archived posts
+    are moved back into the hot tables first, the new activity keeps them
+    there.
+    """
+    lookup = {"id": id, "is_deleted": False, "created_by__is_active": True}
+    post = Post.objects.filter(**lookup).first()
+    if post is None and restore(id):
+        bump_version(f"post:{id}")
+        post = Post.objects.filter(**lookup).first()
+    if post is None:
+        raise Http404
+    return post
+
+
 class LikePostView(APIView):
     def post(self, request, id):
-        post = get_object_or_404(Post, id=id)
+        post = live_post_or_404(id)
 
         try:
             like = Like.objects.get(created_by=request.user, post=post)
         except Like.DoesNotExist:
             like = Like.objects.create(created_by=request.user, post=post)
             like.save()
+            record(post, "like")
+            bump_version(f"post:{post.id}")
+            notify(post.created_by_id, request.user.id, Notification.LIKE, post.id)
 
+            post.refresh_from_db(fields=["likes_count"])
+            likes = current_counts(post)[0]
+            publish_to_network(
+                post.created_by_id, "post_liked", {"post": post.id, "likes": likes}
+            )
             return Response(
                 {
-                    "likes": str(post.like_set.count()),
+                    "likes": str(likes),
                     "message": "Successfully Liked.",
                 },
                 status=status.HTTP_200_OK,
             )
 
         like.delete()
+        record(post, "like", -1)
+        bump_version(f"post:{post.id}")
+        post.refresh_from_db(fields=["likes_count"])
+        likes = current_counts(post)[0]
+        publish_to_network(
+            post.created_by_id, "post_unliked", {"post": post.id, "likes": likes}
+        )
         return Response(
-            {"likes": str(post.like_set.count()), "message": "Successfully Unliked."},
+            {"likes": str(likes), "message": "Successfully Unliked."},
             status=status.HTTP_200_OK,
         )
 
 
 class CreateCommentView(APIView):
     def post(self, request, id):
-        post = Post.objects.get(id=id)
+        post = live_post_or_404(id)
         comment = Comment.objects.create(
             body=request.data.get("body"), created_by=request.user, post=post
         )
 
-        return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
+        record(post, "comment")
+        bump_version(f"post:{post.id}")
+        notify(post.created_by_id, request.user.id, Notification.COMMENT, post.id)
+        data = CommentSerializer(comment).data
+        publish_to_network(
+            post.created_by_id, "comment_created", {"post": post.id, "comment": data}
+        )
+        return Response(data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from wey.admin import ScalableModelAdmin
+
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(ScalableModelAdmin):
+    list_display = ("id", "view", "method", "status_code", "duration_ms", "created_at")
+    raw_id_fields = ("user",)
+    search_fields = ("view__startswith",)
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from profiling.models import RequestProfile
+from profiling.sampler import parse_collapsed, top_functions
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the hottest functions across the latest request profiles and "
+        "optionally write their merged collapsed stacks for flamegraph.pl."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--view", help="e.g. posts.views.PostListView")
+        parser.add_argument(
+            "--profiles", type=int, default=settings.PROFILING_AGGREGATE_PROFILES
+        )
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--output", help="write merged collapsed stacks here")
+
+    def handle(self, *args, **options):
+        profiles = RequestProfile.objects.all()
+        if options["view"]:
+            profiles = profiles.filter(view=options["view"])
+        stacks = list(profiles.values_list("stacks", flat=True)[: options["profiles"]])
+        self.stdout.write(f"{len(stacks)} profiles")
+
+        self.stdout.write(f"{'self %':>7} {'total %':>7}  function")
+        for row in top_functions(stacks, options["limit"]):
+            self.stdout.write(f"{row['self']:>7} {row['total']:>7}  {row['function']}")
+
+        if options["output"]:
+            merged = {}
+            for text in stacks:
+                for stack, count in parse_collapsed(text):
+                    merged[stack] = merged.get(stack, 0) + count
+            with open(options["output"], "w") as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in merged.items())
+            self.stdout.write(f"Wrote {options['output']}")
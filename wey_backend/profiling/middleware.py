@@ -0,0 +1,116 @@
+import random
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from wey.routers import get_authenticated_user
+
+from .models import RequestProfile
+from .sampler import Sampler
+
+
+def view_label(view_func):
+    view = getattr(view_func, "cls", view_func)
+    return f"{view.__module__}.{view.__name__}"
+
+
+def requested_by_staff(request):
+    """
+    Whether the request is from a staff user. Authenticates it the way DRF
+    will for the view, which hasn't happened yet when process_view() runs.
+    """
+    user = get_authenticated_user(request)
+    if user is None:
+        authenticators = [
+            auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ]
+        try:
+            user = Request(request, authenticators=authenticators).user
+        except APIException:
+            return False
+    return user.is_staff
+
+
+def prune(view):
+    """Delete all but the latest PROFILING_KEEP_PER_VIEW profiles of `view`."""
+    oldest_kept = (
+        RequestProfile.objects.filter(view=view)
+        .order_by("-created_at")
+        .values_list("created_at", flat=True)[settings.PROFILING_KEEP_PER_VIEW - 1 :]
+        .first()
+    )
+    if oldest_kept is not None:
+        RequestProfile.objects.filter(view=view, created_at__lt=oldest_kept).delete()
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request with the sampling profiler and store the result as a
+    RequestProfile. Requests are profiled when a staff user sends an X-Profile
+    header (the response then carries X-Profile-Id) or at random, at the rate
+    PROFILING_SAMPLE_RATES gives their view. Async views (the event stream)
+    are never profiled. Only the latest PROFILING_KEEP_PER_VIEW profiles of
+    each view are kept.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.get_response(request)
+        self.finish(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if "_profile" in request.__dict__:
+            await sync_to_async(self.finish)(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if iscoroutinefunction(view_func):
+            return None
+        view = view_label(view_func)
+        requested = "HTTP_X_PROFILE" in request.META and requested_by_staff(request)
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATES.get(view, 0)
+        if requested or sampled:
+            # The view runs on this thread, also under ASGI where sync views
+            # and this hook share the thread-sensitive executor.
+            sampler = Sampler(
+                threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000
+            )
+            sampler.start()
+            request._profile = (sampler, view, requested, sampled)
+        return None
+
+    def finish(self, request, response):
+        if "_profile" not in request.__dict__:
+            return
+        sampler, view, requested, sampled = request._profile
+        sampler.stop()
+
+        profile = RequestProfile.objects.create(
+            view=view,
+            method=request.method,
+            path=request.get_full_path(),
+            user=get_authenticated_user(request),
+            status_code=response.status_code,
+            duration_ms=sampler.duration * 1000,
+            samples=sum(sampler.stacks.values()),
+            stacks=sampler.collapsed(),
+        )
+        prune(view)
+        if requested:
+            response["X-Profile-Id"] = str(profile.id)
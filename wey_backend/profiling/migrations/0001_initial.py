@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import wey.ids
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=wey.ids.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("view", models.CharField(max_length=255)),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.TextField()),
+                ("status_code", models.PositiveSmallIntegerField()),
+                ("duration_ms", models.FloatField()),
+                ("samples", models.IntegerField()),
+                ("stacks", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created_at",),
+                "indexes": [
+                    models.Index(fields=["view", "created_at"], name="profile_view_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import models
+
+from accounts.models import User
+from wey.ids import uuid7
+
+
+class RequestProfile(models.Model):
+    """
+    Where one sampled request spent its time, as collapsed stacks: one
+    "outer;...;inner <samples>" line per distinct stack, the input format of
+    flamegraph.pl and speedscope.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    view = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.TextField()
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    samples = models.IntegerField()
+    stacks = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [models.Index(fields=["view", "created_at"], name="profile_view_idx")]
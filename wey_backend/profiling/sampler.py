@@ -0,0 +1,93 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_DEPTH = 128
+
+
+def frame_label(frame):
+    code = frame.f_code
+    # co_qualname is new in Python 3.11.
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{frame.f_globals.get('__name__', '?')}.{name}"
+
+
+def collapse(frame):
+    """The stack under `frame`, outermost call first, as "a;b;c"."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class Sampler:
+    """
+    Record the stack of one thread every `interval` seconds from a background
+    thread. The profiled code runs untouched: unlike cProfile there is no hook
+    on every call, so the overhead is the sampling thread waking up and
+    walking one stack, whatever the request does.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def collapsed(self):
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def parse_collapsed(text):
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack:
+            yield stack, int(count)
+
+
+def top_functions(profiles, limit=20):
+    """
+    Aggregate the collapsed stacks of several profiles into the hottest
+    functions: "self" counts samples where the function was running, "total"
+    samples where it was anywhere on the stack. Both are percentages of all
+    samples.
+    """
+    own, total, samples = Counter(), Counter(), 0
+    for text in profiles:
+        for stack, count in parse_collapsed(text):
+            labels = stack.split(";")
+            own[labels[-1]] += count
+            for label in set(labels):
+                total[label] += count
+            samples += count
+    if not samples:
+        return []
+    return [
+        {
+            "function": label,
+            "self": round(100 * count / samples, 1),
+            "total": round(100 * total[label] / samples, 1),
+        }
+        for label, count in own.most_common(limit)
+    ]
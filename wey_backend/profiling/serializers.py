@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from .models import RequestProfile
+
+
+class RequestProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RequestProfile
+        fields = (
+            "id",
+            "view",
+            "method",
+            "path",
+            "status_code",
+            "duration_ms",
+            "samples",
+            "created_at",
+        )
@@ -0,0 +1,129 @@
+import io
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .models import RequestProfile
+from .sampler import Sampler, top_functions
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class SamplerTests(SimpleTestCase):
+    def test_samples_the_running_thread(self):
+        sampler = Sampler(threading.get_ident(), 0.001)
+        sampler.start()
+        busy(0.1)
+        sampler.stop()
+
+        self.assertGreater(sum(sampler.stacks.values()), 10)
+        stack, _ = sampler.stacks.most_common(1)[0]
+        self.assertTrue(stack.endswith(";profiling.tests.busy"), stack)
+        self.assertRegex(sampler.collapsed().splitlines()[0], r"busy \d+$")
+
+    def test_top_functions(self):
+        profiles = ["main;a;b 3\nmain;a 1\n", "main;c 4\n"]
+        self.assertEqual(
+            top_functions(profiles, limit=2),
+            [
+                {"function": "c", "self": 50.0, "total": 50.0},
+                {"function": "b", "self": 37.5, "total": 37.5},
+            ],
+        )
+        self.assertEqual(top_functions([]), [])
+
+
+@override_settings(PROFILING_INTERVAL_MS=0.5)
+class ProfilingMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            name="staff", email="staff@gmail.com", password="test", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            name="user", email="user@gmail.com", password="test"
+        )
+
+    def test_staff_can_request_a_profile(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse("posts"), HTTP_X_PROFILE="1")
+        profile = RequestProfile.objects.get(id=response["X-Profile-Id"])
+        self.assertEqual(profile.view, "posts.views.PostListView")
+        self.assertEqual(profile.path, "/posts/")
+        self.assertEqual(profile.status_code, 200)
+        self.assertEqual(profile.user, self.staff)
+
+        response = self.client.get(reverse("profile_stacks", args=[profile.id]))
+        self.assertEqual(response.content.decode(), profile.stacks)
+
+    def test_header_is_ignored_for_other_users(self):
+        with mock.patch("profiling.middleware.Sampler") as sampler:
+            self.client.force_authenticate(self.user)
+            response = self.client.get(reverse("posts"), HTTP_X_PROFILE="1")
+            self.assertNotIn("X-Profile-Id", response)
+            self.client.force_authenticate(None)
+            self.client.get(reverse("posts"), HTTP_X_PROFILE="1")
+            self.client.get(
+                reverse("posts"), HTTP_X_PROFILE="1", HTTP_AUTHORIZATION="Bearer junk"
+            )
+        # Not even started: the profiler's overhead is staff-only too.
+        sampler.assert_not_called()
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(PROFILING_KEEP_PER_VIEW=2)
+    def test_old_profiles_are_pruned(self):
+        self.client.force_authenticate(self.staff)
+        ids = [
+            self.client.get(reverse("posts"), HTTP_X_PROFILE="1")["X-Profile-Id"]
+            for _ in range(3)
+        ]
+        self.client.get(reverse("me"), HTTP_X_PROFILE="1")
+        self.assertEqual(
+            set(RequestProfile.objects.filter(view="posts.views.PostListView")),
+            set(RequestProfile.objects.filter(id__in=ids[1:])),
+        )
+        self.assertEqual(RequestProfile.objects.count(), 3)
+
+    def test_views_are_sampled_at_their_rate(self):
+        self.client.force_authenticate(self.user)
+        rates = {"posts.views.PostListView": 1.0}
+        with override_settings(PROFILING_SAMPLE_RATES=rates):
+            self.client.get(reverse("posts"))
+            self.client.get(reverse("me"))
+        self.assertEqual(
+            list(RequestProfile.objects.values_list("view", flat=True)),
+            ["posts.views.PostListView"],
+        )
+
+    def test_reports_are_staff_only(self):
+        RequestProfile.objects.create(
+            view="posts.views.PostListView",
+            method="GET",
+            path="/posts/",
+            status_code=200,
+            duration_ms=12.5,
+            samples=4,
+            stacks="view;serialize 3\nview;query 1\n",
+        )
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse("profile_top")).status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(
+            reverse("profile_top"), {"view": "posts.views.PostListView"}
+        )
+        self.assertEqual(response.data[0]["function"], "serialize")
+        self.assertEqual(len(self.client.get(reverse("profiles")).data), 1)
+
+        out = io.StringIO()
+        call_command("profile_report", stdout=out)
+        self.assertIn("75.0    75.0  serialize", out.getvalue())
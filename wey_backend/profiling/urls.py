@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import HotFunctionsView, RequestProfileListView, RequestProfileStacksView
+
+urlpatterns = [
+    path("", RequestProfileListView.as_view(), name="profiles"),
+    path("top", HotFunctionsView.as_view(), name="profile_top"),
+    path("<uuid:id>", RequestProfileStacksView.as_view(), name="profile_stacks"),
+]
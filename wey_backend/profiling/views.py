@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import RequestProfile
+from .sampler import top_functions
+from .serializers import RequestProfileSerializer
+
+
+def _profiles(request):
+    profiles = RequestProfile.objects.all()
+    if "view" in request.query_params:
+        profiles = profiles.filter(view=request.query_params["view"])
+    return profiles
+
+
+class RequestProfileListView(APIView):
+    """The latest profiles, optionally for one ?view=posts.views.PostListView."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        profiles = _profiles(request)[:50]
+        return Response(RequestProfileSerializer(profiles, many=True).data)
+
+
+class HotFunctionsView(APIView):
+    """The hottest functions across the latest profiles, see top_functions()."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        stacks = _profiles(request).values_list("stacks", flat=True)
+        stacks = stacks[: settings.PROFILING_AGGREGATE_PROFILES]
+        return Response(top_functions(stacks))
+
+
+class RequestProfileStacksView(APIView):
+    """
+    One profile as collapsed stacks, e.g. for
+    `flamegraph.pl stacks.txt > flame.svg` or speedscope.app.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, id):
+        profile = get_object_or_404(RequestProfile, id=id)
+        return HttpResponse(profile.stacks, content_type="text/plain; charset=utf-8")
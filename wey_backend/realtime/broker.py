@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    def __init__(self, broker, channel, queue_size):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def put(self, event):
+        # Runs on the subscriber's event loop. A client that stops reading loses
+        # its oldest events instead of growing the queue without bound.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker(ABC):
+    """
+    Delivers events to the subscribers of a channel.
+
+    publish() is called from synchronous view code, while subscribe() is called
+    from the async event stream running on the ASGI event loop.
+    """
+
+    @abstractmethod
+    def publish(self, channels, event):
+        pass
+
+    @abstractmethod
+    def subscribe(self, channel):
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        pass
+
+
+class InProcessBroker(BaseBroker):
+    """Fan out events to subscribers connected to this process."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, channels, event):
+        with self._lock:
+            targets = [
+                subscription
+                for channel in channels
+                for subscription in self._subscriptions.get(channel, ())
+            ]
+        for subscription in targets:
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def subscription_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscriptions.values())
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Share events between processes through Redis pub/sub.
+
+    Each process keeps a single Redis subscription and hands incoming messages
+    to its local subscribers, so the Redis connection count does not grow with
+    the number of open event streams. Needs the `redis` package.
+    """
+
+    PREFIX = "wey:realtime:"
+
+    def __init__(self, url=None, queue_size=100):
+        import redis
+
+        super().__init__(queue_size=queue_size)
+        self.redis = redis.Redis.from_url(url or settings.REDIS_URL)
+        self._listener = None
+
+    def publish(self, channels, event):
+        payload = json.dumps(event, cls=DjangoJSONEncoder)
+        with self.redis.pipeline(transaction=False) as pipe:
+            for channel in channels:
+                pipe.publish(self.PREFIX + channel, payload)
+            pipe.execute()
+
+    def subscribe(self, channel):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+        return super().subscribe(channel)
+
+    def _listen(self):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.PREFIX + "*")
+        for message in pubsub.listen():
+            channel = message["channel"].decode()[len(self.PREFIX) :]
+            super().publish([channel], json.loads(message["data"]))
+
+
+@lru_cache(maxsize=None)
+def _load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return _load_broker(settings.REALTIME_BROKER)
@@ -0,0 +1,38 @@
+from django.db import transaction
+
+from accounts.models import User
+
+from .broker import get_broker
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def publish_to_users(user_ids, type, data):
+    """Send an event to the given users once the current transaction has committed."""
+    transaction.on_commit(
+        lambda: get_broker().publish(
+            [user_channel(id) for id in user_ids], {"type": type, "data": data}
+        )
+    )
+
+
+def publish_to_network(user_id, type, data):
+    """
+    Send an event to a user and their friends, i.e. everyone whose feed shows
+    that user's posts, once the current transaction has committed.
+    """
+
+    def send():
+        ids = [user_id]
+        ids.extend(
+            User.friends.through.objects.filter(from_user_id=user_id).values_list(
+                "to_user_id", flat=True
+            )
+        )
+        get_broker().publish(
+            [user_channel(id) for id in ids], {"type": type, "data": data}
+        )
+
+    transaction.on_commit(send)
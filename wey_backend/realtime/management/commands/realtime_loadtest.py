@@ -0,0 +1,70 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from realtime.broker import InProcessBroker
+from realtime.events import user_channel
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many in-process event stream subscriptions and measure memory per "
+        "connection and fan-out throughput of the broker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=10000)
+        parser.add_argument("--events", type=int, default=20)
+        parser.add_argument(
+            "--friends", type=int, default=200, help="channels each event goes to"
+        )
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(**options))
+
+    async def run(self, connections, events, friends, **options):
+        broker = InProcessBroker()
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        subscriptions = [broker.subscribe(user_channel(i)) for i in range(connections)]
+        readers = [
+            asyncio.create_task(self.read(subscription, events))
+            for subscription in subscriptions[:friends]
+        ]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        per_connection = sum(
+            stat.size_diff for stat in after.compare_to(before, "filename")
+        ) / max(connections, 1)
+
+        # Publish from a separate thread, as views do.
+        channels = [user_channel(i) for i in range(friends)]
+
+        def publish():
+            for i in range(events):
+                broker.publish(channels, {"type": "post_liked", "data": {"n": i}})
+
+        started = time.perf_counter()
+        await asyncio.to_thread(publish)
+        await asyncio.gather(*readers)
+        elapsed = time.perf_counter() - started
+
+        deliveries = events * friends
+        self.stdout.write(
+            f"{connections} open subscriptions, {per_connection:.0f} bytes each "
+            f"(broker state and queue only, excludes the socket and ASGI server)"
+        )
+        self.stdout.write(
+            f"{events} events x {friends} subscribers = {deliveries} deliveries in "
+            f"{elapsed * 1000:.1f}ms ({deliveries / elapsed:.0f} deliveries/s)"
+        )
+
+        for subscription in subscriptions:
+            subscription.close()
+
+    async def read(self, subscription, events):
+        for _ in range(events):
+            await subscription.get()
@@ -0,0 +1,180 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    AsyncRequestFactory,
+    RequestFactory,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from posts.models import Post
+
+from .broker import BaseBroker, InProcessBroker, get_broker
+from .events import user_channel
+from .views import event_stream
+
+
+class RecordingBroker(BaseBroker):
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channels, event):
+        self.published.append((set(channels), event))
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InProcessBrokerTests(TestCase):
+    def test_broker_must_implement_every_method(self):
+        with self.assertRaises(TypeError):
+            type("PublishOnly", (BaseBroker,), {"publish": lambda *args: None})()
+
+    async def test_publish_from_another_thread_reaches_subscriber(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("user:1")
+        other = broker.subscribe("user:2")
+
+        await sync_to_async(broker.publish, thread_sensitive=False)(
+            ["user:1"], {"type": "ping", "data": 1}
+        )
+
+        event = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(event, {"type": "ping", "data": 1})
+        self.assertTrue(other.queue.empty())
+
+        subscription.close()
+        other.close()
+        self.assertEqual(broker.subscription_count(), 0)
+
+    async def test_slow_subscriber_keeps_latest_events(self):
+        broker = InProcessBroker(queue_size=2)
+        subscription = broker.subscribe("user:1")
+        for i in range(3):
+            broker.publish(["user:1"], {"type": "ping", "data": i})
+        await asyncio.sleep(0)
+
+        self.assertEqual((await subscription.get())["data"], 1)
+        self.assertEqual((await subscription.get())["data"], 2)
+
+
+@override_settings(REALTIME_BROKER="realtime.tests.RecordingBroker")
+class PublishEventsTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="author", email="author@gmail.com", password="test"
+        )
+        self.friend = get_user_model().objects.create_user(
+            name="friend", email="friend@gmail.com", password="test"
+        )
+        self.stranger = get_user_model().objects.create_user(
+            name="stranger", email="stranger@gmail.com", password="test"
+        )
+        self.user.friends.add(self.friend)
+        self.post = Post.objects.create(body="Something", created_by=self.user)
+        user_refresh_token = RefreshToken.for_user(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {user_refresh_token.access_token}"
+        )
+        get_broker().published.clear()
+
+    def assertPublished(self, type):
+        channels, event = get_broker().published[-1]
+        self.assertEqual(event["type"], type)
+        self.assertEqual(
+            channels, {user_channel(self.user.id), user_channel(self.friend.id)}
+        )
+
+    def test_post_created(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("create_post"), {"body": "Hello"})
+        self.assertPublished("post_created")
+
+    def test_post_liked(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("like_post", kwargs={"id": self.post.id}))
+        self.assertPublished("post_liked")
+
+    def test_comment_created(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("create_comment", kwargs={"id": self.post.id}),
+                {"body": "Hello"},
+            )
+        self.assertPublished("comment_created")
+
+
+class EventStreamTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name="listener", email="listener@gmail.com", password="test"
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def ticket(self):
+        response = self.client.post(reverse("stream_ticket"))
+        self.assertEqual(response.status_code, 200)
+        return response.data["ticket"]
+
+    async def test_refused_under_wsgi(self):
+        ticket = await sync_to_async(self.ticket)()
+        request = RequestFactory().get(reverse("event_stream"), {"ticket": ticket})
+        response = await event_stream(request)
+        self.assertEqual(response.status_code, 503)
+
+    async def test_requires_credentials(self):
+        request = AsyncRequestFactory().get(reverse("event_stream"))
+        response = await event_stream(request)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_ticket_is_single_use(self):
+        ticket = await sync_to_async(self.ticket)()
+        request = AsyncRequestFactory().get(reverse("event_stream"), {"ticket": ticket})
+        response = await event_stream(request)
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.aclose()
+
+        response = await event_stream(request)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_ticket_deleted_by_a_concurrent_request_is_refused(self):
+        ticket = await sync_to_async(self.ticket)()
+        request = AsyncRequestFactory().get(reverse("event_stream"), {"ticket": ticket})
+        # The other request read the ticket too, and deleted it first.
+        with mock.patch.object(cache, "delete", return_value=False):
+            response = await event_stream(request)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_access_token_in_url_is_ignored(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        request = AsyncRequestFactory().get(reverse("event_stream"), {"token": token})
+        response = await event_stream(request)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_streams_published_events(self):
+        ticket = await sync_to_async(self.ticket)()
+        request = AsyncRequestFactory().get(reverse("event_stream"), {"ticket": ticket})
+        response = await event_stream(request)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+
+        get_broker().publish(
+            [user_channel(self.user.id)], {"type": "post_created", "data": {"id": 1}}
+        )
+        self.assertEqual(
+            await anext(stream), b'event: post_created\ndata: {"id": 1}\n\n'
+        )
+        await stream.aclose()
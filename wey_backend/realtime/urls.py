@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import StreamTicketView, event_stream
+
+urlpatterns = [
+    path("events/", event_stream, name="event_stream"),
+    path("ticket/", StreamTicketView.as_view(), name="stream_ticket"),
+]
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .broker import get_broker
+from .events import user_channel
+
+
+def _ticket_key(ticket):
+    return f"realtime:ticket:{ticket}"
+
+
+class StreamTicketView(APIView):
+    """
+    A single-use ticket for opening an event stream as ?ticket=. EventSource
+    cannot set headers, and an access token in the URL would end up in the
+    access logs for as long as it is valid.
+    """
+
+    def post(self, request):
+        ticket = secrets.token_urlsafe(32)
+        cache.set(
+            _ticket_key(ticket), request.user.id, settings.REALTIME_TICKET_SECONDS
+        )
+        return Response({"ticket": ticket})
+
+
+def _authenticate(request):
+    ticket = request.GET.get("ticket")
+    if ticket is not None:
+        key = _ticket_key(ticket)
+        user_id = cache.get(key)
+        # Two requests racing with the same ticket can both read it, but only
+        # one of them deletes it.
+        if user_id is None or not cache.delete(key):
+            return None
+        return get_user_model().objects.filter(id=user_id, is_active=True).first()
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError):
+        return None
+
+
+async def event_stream(request):
+    """
+    Server-sent events for the authenticated user. Needs an ASGI server, under
+    WSGI it answers 503 and clients should retry against the ASGI one.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI Django would drain the endless stream into a list before
+        # responding: the client hangs and the worker never comes back.
+        return JsonResponse(
+            {"detail": "Event streams need the ASGI server."}, status=503
+        )
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    subscription = get_broker().subscribe(user_channel(user.id))
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.REALTIME_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = json.dumps(event["data"], cls=DjangoJSONEncoder)
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
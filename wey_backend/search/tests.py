@@ -1,13 +1,16 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from posts import counters
 from posts.models import Post
 
 
 class SearchViewTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.user1 = get_user_model().objects.create(
             name="user1", email="user1@gmail.com", password="test"
         )
@@ -33,3 +36,23 @@ class SearchViewTest(APITestCase):
 
         self.assertEqual(len(response.data["posts"]), 1)
         self.assertTrue("user" in response.data["posts"][0]["body"])
+
+    def test_sparse_search_is_cached_apart_from_full_search(self):
+        url = reverse("search")
+        response = self.client.post(f"{url}?fields=posts.id", {"query": "contains"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data["posts"][0]), {"id"})
+
+        response = self.client.post(url, {"query": "contains"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn("body", response.data["posts"][0])
+
+    def test_likes_elsewhere_keep_the_cached_search(self):
+        url = reverse("search")
+        self.client.post(url, {"query": "contains"})
+        other = Post.objects.create(body="unrelated", created_by=self.user2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("like_post", args=[other.id]))
+            counters.buffer.flush()
+        response = self.client.post(url, {"query": "contains"})
+        self.assertEqual(response["X-Cache"], "HIT")
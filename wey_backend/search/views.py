@@ -4,18 +4,37 @@ from rest_framework import status
 
 from accounts.models import User
 from accounts.serializers import UserSerializer
+from accounts.utils import attach_requested_friend_counts
 from posts.models import Post
 from posts.serializers import PostSerializer
+from wey.cache import cache_response
+from wey.serializers import sparse_queryset
 
 
 class SearchView(APIView):
+    # New posts and users, counts and friend counts show up once the entry
+    # expires. Edits and deletions bump the "search" version so they disappear
+    # right away.
+    @cache_response(
+        timeout=60,
+        key=lambda request: f'{request.data.get("query")}|{request.GET.urlencode()}',
+        versions=lambda request: ["search"],
+    )
     def post(self, request):
         query = request.data["query"]
-        users = User.objects.filter(name__icontains=query)
-        users_seralizer = UserSerializer(users, many=True)
+        users = User.objects.filter(name__icontains=query, is_active=True)
+        context = {"request": request, "sparse_root": "users"}
+        users = sparse_queryset(users, UserSerializer(many=True, context=context))
+        users_seralizer = UserSerializer(list(users), many=True, context=context)
+        attach_requested_friend_counts(users_seralizer)
 
-        posts = Post.objects.filter(body__icontains=query)
-        posts_serializer = PostSerializer(posts, many=True)
+        posts = Post.objects.filter(
+            body__icontains=query, is_deleted=False, created_by__is_active=True
+        )
+        context = {"request": request, "sparse_root": "posts"}
+        posts = sparse_queryset(posts, PostSerializer(many=True, context=context))
+        posts_serializer = PostSerializer(list(posts), many=True, context=context)
+        attach_requested_friend_counts(posts_serializer, "created_by")
 
         return Response(
             {
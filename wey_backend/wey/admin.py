@@ -0,0 +1,89 @@
+import uuid
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(model, using):
+    """
+    Rough row count of a model's table without scanning it: the planner's
+    estimate on PostgreSQL, the largest rowid on SQLite (an upper bound once
+    rows have been deleted). None when the backend has no cheap estimate.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [table]
+            )
+            row = cursor.fetchone()
+            # -1 means the table has never been vacuumed or analyzed.
+            return int(row[0]) if row and row[0] >= 0 else None
+        if connection.vendor == "sqlite":
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for tables too big to COUNT(*) on every changelist page.
+
+    The unfiltered changelist uses estimated_count() once the table holds more
+    than EXACT_COUNT_LIMIT rows. Searches and filters are counted exactly, but
+    only up to FILTERED_COUNT_LIMIT rows, so a broad search stops counting
+    instead of scanning the rest of the table.
+    """
+
+    EXACT_COUNT_LIMIT = 10000
+    FILTERED_COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where:
+            return queryset[: self.FILTERED_COUNT_LIMIT].count()
+        estimate = estimated_count(queryset.model, queryset.db)
+        if estimate is None or estimate <= self.EXACT_COUNT_LIMIT:
+            return queryset.count()
+        return estimate
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for tables with millions of rows.
+
+    - Counts come from EstimatedCountPaginator, and the "N total" link that
+      would count the whole table again is off.
+    - The changelist is newest first. That is `-created_at` when the model
+      has an index leading with created_at, and otherwise the primary key,
+      which is a time-ordered uuid7 for new rows and for tables that went
+      through backfill_uuid7. Set `ordering` for other creation times. Columns
+      can only be sorted if listed in `sortable_by`, which should name indexed
+      fields.
+    - Search only does lookups an index can answer: a pasted id matches the
+      primary key, anything else goes through `search_fields`, which should
+      use exact or prefix lookups on indexed columns.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    sortable_by = ()
+
+    def get_ordering(self, request):
+        if self.ordering:
+            return self.ordering
+        for index in self.model._meta.indexes:
+            if index.condition is None and index.fields[0].lstrip("-") == "created_at":
+                return ("-created_at",)
+        return ("-pk",)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        try:
+            return queryset.filter(pk=uuid.UUID(term)), False
+        except ValueError:
+            return super().get_search_results(request, queryset, term)
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class WeyConfig(AppConfig):
+    name = "wey"
+    # How long each warm-up step took in this process, see
+    # wey.warmup.warm_up_server().
+    warmup_timings = None
+
+    def ready(self):
+        from .db import configure_sqlite
+
+        connection_created.connect(configure_sqlite)
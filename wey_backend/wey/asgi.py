@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wey.settings")
 
 application = get_asgi_application()
+
+# Needs the app registry, so only once the application is set up.
+from wey.warmup import warm_up_server
+
+warm_up_server()
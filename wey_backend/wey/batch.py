@@ -0,0 +1,84 @@
+import json
+import logging
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# Headers describing the batch request's own body, not the sub-requests'.
+_BODY_META = ("CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_CONTENT_ENCODING")
+
+
+def _error(status, detail):
+    return {"status": status, "body": {"detail": detail}}
+
+
+def _sub_request(request, path, query):
+    sub = HttpRequest()
+    sub.method = "GET"
+    sub.path = sub.path_info = path
+    sub.META = {
+        key: value for key, value in request.META.items() if key not in _BODY_META
+    }
+    sub.META.update(
+        REQUEST_METHOD="GET",
+        PATH_INFO=path,
+        QUERY_STRING=query,
+        HTTP_ACCEPT="application/json",
+    )
+    sub.GET = QueryDict(query)
+    sub.COOKIES = request.COOKIES
+    # The same hook DRF's force_authenticate() uses: the sub-request's view
+    # takes this user instead of decoding the JWT again.
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def dispatch(request, url):
+    """
+    Run GET `url` through its view in this process, as `request.user`, and
+    return {"status": ..., "body": ...}. Middleware does not run, so only
+    DRF views are allowed, and a view can opt out with `batchable = False`.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+        return _error(400, "Expected a path such as /posts/.")
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return _error(404, "Not found.")
+
+    view_class = getattr(match.func, "cls", None)
+    if (
+        view_class is None
+        or not issubclass(view_class, APIView)
+        or not getattr(view_class, "batchable", True)
+    ):
+        return _error(400, "This endpoint cannot be batched.")
+
+    try:
+        response = match.func(
+            _sub_request(request, parts.path, parts.query), *match.args, **match.kwargs
+        )
+    except Exception:
+        # DRF turns its own exceptions into responses. Anything else fails
+        # this sub-request only, like it would fail a request of its own.
+        logger.exception("Batched request to %s failed", url)
+        return _error(500, "Server error.")
+    if response.streaming:
+        response.close()
+        return _error(400, "Streaming responses cannot be batched.")
+
+    if isinstance(response, Response) and not response.is_rendered:
+        body = response.data
+    elif response.get("Content-Type", "").startswith("application/json"):
+        # Already rendered, e.g. a response cache hit.
+        body = json.loads(response.content) if response.content else None
+    else:
+        body = response.content.decode(response.charset, "replace")
+    return {"status": response.status_code, "body": body}
@@ -0,0 +1,127 @@
+import atexit
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Set by deferred(): writes are collected here instead of applied.
+_deferred = contextvars.ContextVar("deferred_writes", default=None)
+
+
+@contextlib.contextmanager
+def deferred():
+    """
+    Collect every WriteBuffer write made inside the block, including from
+    gather() worker threads (they run in a copy of this context), and add
+    them on this thread when it exits. Keeps the workers read-only even where
+    a buffer writes through immediately.
+    """
+    writes = []
+    token = _deferred.set(writes)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+        for buffer, items in writes:
+            buffer.add_many(items)
+
+
+class WriteBuffer:
+    """
+    Collect writes in memory, merged per key, and hand them to `apply` in
+    batches from a background thread every `setting` milliseconds
+    (WRITE_BUFFER_FLUSH_MS unless given).
+
+    With an interval of 0 every write is applied immediately, which is what
+    tests and single-user development want. Pending writes are lost if the
+    process dies, so only use this for data that may lag or be approximate.
+    """
+
+    def __init__(self, apply, merge, setting="WRITE_BUFFER_FLUSH_MS"):
+        self.apply = apply
+        self.merge = merge
+        self.setting = setting
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        # A pre-fork master (see wey/warmup.py) may have buffered writes and
+        # started its thread. Those stay with the master, a worker starts over.
+        os.register_at_fork(after_in_child=self._forked)
+
+    @property
+    def interval(self):
+        return getattr(settings, self.setting) / 1000
+
+    def add(self, key, value):
+        writes = _deferred.get()
+        if writes is not None:
+            writes.append((self, [(key, value)]))
+            return
+        if not self.interval:
+            self.apply({key: value})
+            return
+
+        with self._lock:
+            if key in self._pending:
+                value = self.merge(self._pending[key], value)
+            self._pending[key] = value
+            if self._thread is None:
+                self._start()
+
+    def add_many(self, items):
+        """add() each (key, value) pair, taking the lock once."""
+        writes = _deferred.get()
+        if writes is not None:
+            writes.append((self, list(items)))
+            return
+        if not self.interval:
+            batch = {}
+            for key, value in items:
+                batch[key] = self.merge(batch[key], value) if key in batch else value
+            if batch:
+                self.apply(batch)
+            return
+
+        with self._lock:
+            for key, value in items:
+                if key in self._pending:
+                    value = self.merge(self._pending[key], value)
+                self._pending[key] = value
+            if self._thread is None:
+                self._start()
+
+    def pending(self, key, default=None):
+        with self._lock:
+            return self._pending.get(key, default)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if batch:
+            self.apply(batch)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing %r failed", self.apply)
+
+    def _forked(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
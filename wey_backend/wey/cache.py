@@ -0,0 +1,116 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+# Per-process hit and miss counts by view, see CacheStatsView.
+stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _record(view, outcome):
+    with _stats_lock:
+        stats[(view, outcome)] += 1
+
+
+def _version_keys(names):
+    return [f"version:{name}" for name in names]
+
+
+def get_versions(names):
+    """
+    Current value of each version counter. A missing counter (never bumped, or
+    evicted) starts at the current time in nanoseconds rather than 0, so it
+    can never come back to a value an old cached response was stored under.
+    """
+    keys = _version_keys(names)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(*names):
+    """
+    Invalidate every cached response that depends on one of `names`. Runs once
+    the current transaction commits, so a concurrent request can't cache the
+    old data under the new version.
+    """
+
+    def bump():
+        for key in _version_keys(names):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def cache_response(timeout=None, versions=None, key=None):
+    """
+    Cache the rendered bytes of an APIView handler whose response is the same
+    for every user, so hits skip the ORM, serializers and rendering.
+    Authentication and permissions still run as usual.
+
+    The cache key is made from the view, the URL arguments, the negotiated
+    media type, `key(request, *args, **kwargs)` (the query string by default)
+    and the current value of every version counter returned by
+    `versions(request, *args, **kwargs)`. Call bump_version() with one of
+    those names when the underlying data changes. Only 200 responses are
+    cached.
+    """
+    if timeout is None:
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            view = f"{type(self).__module__}.{type(self).__name__}.{method.__name__}"
+            parts = [
+                view,
+                request.accepted_media_type,
+                repr(args),
+                repr(sorted(kwargs.items())),
+                key(request, *args, **kwargs) if key else request.GET.urlencode(),
+            ]
+            if versions:
+                parts.extend(map(str, get_versions(versions(request, *args, **kwargs))))
+            cache_key = (
+                "response:" + hashlib.sha256("|".join(parts).encode()).hexdigest()
+            )
+
+            cached = cache.get(cache_key)
+            if cached is not None:
+                _record(view, "hit")
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Cache"] = "HIT"
+                # Lets CompressionMiddleware cache the compressed variant.
+                response.cache_key, response.cache_timeout = cache_key, timeout
+                return response
+
+            _record(view, "miss")
+            response = method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                response = self.finalize_response(request, response, *args, **kwargs)
+                response.render()
+                cache.set(
+                    cache_key, (response.content, response["Content-Type"]), timeout
+                )
+                response.cache_key, response.cache_timeout = cache_key, timeout
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
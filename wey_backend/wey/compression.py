@@ -0,0 +1,134 @@
+import gzip
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+_accept_re = re.compile(r"\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+
+
+def _gzip(content):
+    return gzip.compress(
+        content, compresslevel=settings.COMPRESSION_LEVELS["gzip"], mtime=0
+    )
+
+
+def _brotli(content):
+    return brotli.compress(content, quality=settings.COMPRESSION_LEVELS["br"])
+
+
+def _zstd(content):
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_LEVELS["zstd"]).compress(
+        content
+    )
+
+
+def available_codecs():
+    """Encoding -> compress function, for the installed libraries."""
+    codecs = {"gzip": _gzip}
+    if brotli is not None:
+        codecs["br"] = _brotli
+    if zstandard is not None:
+        codecs["zstd"] = _zstd
+    return codecs
+
+
+def negotiate(accept_encoding):
+    """
+    Pick the encoding to use for an Accept-Encoding header: the highest q value
+    among the ones we can produce, ties broken by COMPRESSION_ENCODINGS order.
+    """
+    codecs = available_codecs()
+    accepted = {}
+    for coding, q in _accept_re.findall(accept_encoding or ""):
+        try:
+            accepted[coding.lower()] = float(q) if q else 1.0
+        except ValueError:
+            continue
+    candidates = [
+        (accepted.get(coding, accepted.get("*", 0)), -rank, coding)
+        for rank, coding in enumerate(settings.COMPRESSION_ENCODINGS)
+        if coding in codecs
+    ]
+    candidates = [c for c in candidates if c[0] > 0]
+    return max(candidates)[2] if candidates else None
+
+
+def compress(content, encoding):
+    return available_codecs()[encoding](content)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli, zstd or gzip, whichever the client prefers
+    and is installed (gzip always is). Skips streaming responses (event
+    streams, file downloads), bodies under COMPRESSION_MIN_SIZE and content
+    types that are already compressed.
+
+    Responses from wey.cache.cache_response carry their cache key, and their
+    compressed variant is cached next to them, so a hot payload is compressed
+    once per version instead of on every request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None:
+            return response
+
+        cache_key = getattr(response, "cache_key", None)
+        compressed = None
+        if cache_key is not None:
+            compressed = cache.get(f"{cache_key}:{encoding}")
+        if compressed is None:
+            compressed = compress(response.content, encoding)
+            if cache_key is not None:
+                cache.set(f"{cache_key}:{encoding}", compressed, response.cache_timeout)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The representation changed, so a strong ETag no longer applies.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
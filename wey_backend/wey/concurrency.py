@@ -0,0 +1,44 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.SUBFETCH_WORKERS, thread_name_prefix="wey-subfetch"
+        )
+    return _executor
+
+
+def _run(func):
+    # Worker threads live outside the request cycle, so they have to retire
+    # stale connections themselves, the same way request_started/finished do.
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+def gather(*funcs):
+    """
+    Call independent, read-only functions and return their results in order.
+
+    With PARALLEL_SUBFETCH on they run on a shared thread pool, each thread using
+    its own (persistent) database connection. Inside a transaction they run
+    sequentially, since other connections cannot see uncommitted rows.
+    """
+    if not settings.PARALLEL_SUBFETCH or len(funcs) < 2 or connection.in_atomic_block:
+        return [func() for func in funcs]
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(contextvars.copy_context().run, _run, func) for func in funcs
+    ]
+    return [future.result() for future in futures]
@@ -0,0 +1,16 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to each new SQLite connection.
+
+    WAL lets readers run alongside the single writer, and synchronous=NORMAL is
+    safe under WAL while avoiding an fsync per commit. Other journal modes are
+    paired with synchronous=FULL.
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
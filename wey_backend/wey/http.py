@@ -0,0 +1,78 @@
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single `bytes=` range, None to send everything."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes.
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    return start, end
+
+
+def ranged_file_response(request, path, content_type, filename=None):
+    """
+    Serve a file, honouring a single `Range: bytes=...` request so interrupted
+    downloads can resume. Anything else gets the whole file through
+    FileResponse, which lets the WSGI server use sendfile.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+
+    byte_range = None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if "HTTP_RANGE" in request.META and (if_range is None or if_range == etag):
+        byte_range = _parse_range(request.META["HTTP_RANGE"], size)
+        if byte_range is not None and byte_range[0] > byte_range[1]:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(
+            open(path, "rb"),
+            content_type=content_type,
+            as_attachment=filename is not None,
+            filename=filename or "",
+        )
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+        if filename:
+            response["Content-Disposition"] = content_disposition_header(True, filename)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,90 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from wey.cache import bump_version
+from wey.ids import uuid7_at
+
+# Models whose ids are only referenced by foreign keys, which are rewritten
+# along with them. Users and posts are not: their ids are also held in tokens,
+# links, notification targets, deletion jobs and cache keys.
+MODELS = (
+    "posts.Like",
+    "posts.Comment",
+    "posts.Attachment",
+    "posts.PostRevision",
+    "posts.CommentRevision",
+    "chat.Message",
+)
+# Post details embed these ids, so their cached responses have to go.
+IN_POST_DETAIL = ("posts.Comment", "posts.Attachment")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the uuid4 primary keys of rows created before uuid7 ids to "
+        "uuid7s of their created_at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", choices=MODELS, default=MODELS)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        for label in options["models"]:
+            model = apps.get_model(label)
+            rewritten = backfill(model, options["batch_size"])
+            self.stdout.write(f"{label}: rewrote {rewritten} ids.")
+
+
+def backfill(model, batch_size):
+    """
+    Walk `model` in primary key order and give every row whose id isn't a
+    uuid7 the uuid7 of its created_at. Foreign keys pointing at the rows are
+    rewritten in the same transaction, the constraints are only checked on
+    commit.
+    """
+    pk = model._meta.pk
+    references = [
+        (related, field)
+        for related in apps.get_models(include_auto_created=True)
+        for field in related._meta.concrete_fields
+        if field.is_relation and field.related_model is model
+    ]
+    in_post_detail = model._meta.label in IN_POST_DETAIL
+    rewritten, last = 0, None
+    while True:
+        rows = model._base_manager.order_by("pk")
+        if last is not None:
+            rows = rows.filter(pk__gt=last)
+        rows = list(rows.values_list("pk", "created_at")[:batch_size])
+        if not rows:
+            return rewritten
+        last = rows[-1][0]
+        ids = {
+            old: uuid7_at(created_at) for old, created_at in rows if old.version != 7
+        }
+        if not ids:
+            continue
+
+        def rewrite(attname):
+            whens = [
+                When(**{attname: old}, then=Value(new)) for old, new in ids.items()
+            ]
+            return Case(*whens, output_field=pk)
+
+        with transaction.atomic():
+            for related, field in references:
+                related._base_manager.filter(**{f"{field.attname}__in": ids}).update(
+                    **{field.attname: rewrite(field.attname)}
+                )
+            model._base_manager.filter(pk__in=ids).update(
+                **{pk.attname: rewrite(pk.attname)}
+            )
+            if in_post_detail:
+                post_ids = model._base_manager.filter(pk__in=ids.values()).values_list(
+                    "post_id", flat=True
+                )
+                bump_version(*{f"post:{post_id}" for post_id in post_ids})
+        rewritten += len(ids)
@@ -0,0 +1,73 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from posts.models import Post
+from wey.compression import available_codecs
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress a real feed payload with every available encoding and report "
+        "bytes on the wire and CPU time. Test data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument("--runs", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            content = self.feed_payload(options["posts"])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"identity: {len(content)} bytes")
+        for encoding, compress in available_codecs().items():
+            started = time.process_time()
+            for _ in range(options["runs"]):
+                compressed = compress(content)
+            cpu = (time.process_time() - started) / options["runs"]
+
+            # What a response cache hit pays instead: fetching the stored
+            # variant.
+            cache.set("bench_compression", compressed)
+            started = time.process_time()
+            for _ in range(options["runs"]):
+                cache.get("bench_compression")
+            cached = (time.process_time() - started) / options["runs"]
+            cache.delete("bench_compression")
+
+            self.stdout.write(
+                f"{encoding}: {len(compressed)} bytes "
+                f"({len(compressed) / len(content):.1%}), "
+                f"{cpu * 1000:.2f}ms CPU per response, "
+                f"{cached * 1000:.3f}ms from the cache"
+            )
+
+    def feed_payload(self, count):
+        stamp = time.time_ns()
+        user = User.objects.create_user(name="bench", email=f"bench-{stamp}@bench")
+        friends = User.objects.bulk_create(
+            User(name=f"Friend {i}", email=f"friend-{stamp}-{i}@bench.local")
+            for i in range(20)
+        )
+        user.friends.add(*friends)
+        Post.objects.bulk_create(
+            Post(
+                body=f"Post number {i}: had a great time at the lake today, "
+                "photos coming soon!",
+                created_by=friends[i % len(friends)],
+                likes_count=i * 7 % 300,
+                comments_count=i % 17,
+            )
+            for i in range(count)
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse("posts"), HTTP_HOST="localhost")
+        return response.content
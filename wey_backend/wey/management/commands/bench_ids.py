@@ -0,0 +1,83 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from wey.ids import uuid7
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare insert throughput and primary key index size of uuid4 and "
+        "uuid7 ids on the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        for name, generate in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+            table = f"bench_ids_{name}"
+            self.create_table(table)
+            try:
+                elapsed, tail = self.fill(table, generate, options)
+                size = self.index_size(table)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE {table}")
+
+            rows = options["rows"]
+            self.stdout.write(
+                f"{connection.vendor} {name}: {rows} rows in {elapsed:.1f}s = "
+                f"{rows / elapsed:.0f} rows/s, last 10% at {tail:.0f} rows/s, "
+                f"pk index {size / 2**20:.1f} MiB"
+            )
+
+    def create_table(self, table):
+        id_type = "uuid" if connection.vendor == "postgresql" else "char(32)"
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            # Shaped like posts_like.
+            cursor.execute(
+                f"CREATE TABLE {table} (id {id_type} PRIMARY KEY, "
+                f"created_at timestamp NOT NULL, post_id {id_type} NOT NULL)"
+            )
+
+    def fill(self, table, generate, options):
+        rows, batch_size = options["rows"], options["batch_size"]
+        to_db = str if connection.vendor == "postgresql" else lambda u: u.hex
+        post_id = to_db(uuid.uuid4())
+        sql = f"INSERT INTO {table} (id, created_at, post_id) VALUES (%s, %s, %s)"
+
+        started = time.perf_counter()
+        tail_started = None
+        done = 0
+        while done < rows:
+            if tail_started is None and done >= rows * 0.9:
+                tail_started, tail_from = time.perf_counter(), done
+            now = timezone.now()
+            batch = [
+                (to_db(generate()), now, post_id)
+                for _ in range(min(batch_size, rows - done))
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+            done += len(batch)
+        finished = time.perf_counter()
+
+        tail = (rows - tail_from) / (finished - tail_started)
+        return finished - started, tail
+
+    def index_size(self, table):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT pg_relation_size(%s)", [f"{table}_pkey"])
+            else:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = %s",
+                    [f"sqlite_autoindex_{table}_1"],
+                )
+            return cursor.fetchone()[0]
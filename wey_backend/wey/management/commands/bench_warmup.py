@@ -0,0 +1,126 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from accounts.models import User
+from posts.models import Post
+from wey.warmup import client, warm_up_server
+
+MODES = {
+    "cold": {"WEY_WARMUP": "0"},
+    "warm": {"WEY_WARMUP": "1", "WEY_WARMUP_REQUESTS": ""},
+    # WEY_WARMUP_REQUESTS and WEY_WARMUP_USER are filled in by handle().
+    "replay": {"WEY_WARMUP": "1"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the first request to each endpoint in fresh processes, "
+        "without warm-up, with it, and with it replaying a request."
+    )
+    # System checks import the URLconf, which a server process doesn't do
+    # before its first request.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        # Internal: run in each fresh process, prints one JSON line.
+        parser.add_argument("--child", nargs=3, metavar=("METHOD", "PATH", "USER"))
+
+    def handle(self, *args, **options):
+        if options["child"]:
+            return self.child(*options["child"])
+
+        user = User.objects.create_user(
+            name="bench", email=f"bench-{time.time_ns()}@bench.local"
+        )
+        post = Post.objects.create(body="bench", created_by=user)
+        endpoints = {
+            "feed": ("get", reverse("posts")),
+            "post": ("get", reverse("post_detail", args=[post.id])),
+            "profile": ("get", reverse("profile_summary", args=[user.id])),
+            "signup": ("post", reverse("signup")),
+        }
+        MODES["replay"].update(
+            WEY_WARMUP_REQUESTS=reverse("posts"), WEY_WARMUP_USER=user.email
+        )
+        try:
+            for name, (method, path) in endpoints.items():
+                results = {
+                    mode: [
+                        self.spawn(env, method, path, user.id)
+                        for _ in range(options["runs"])
+                    ]
+                    for mode, env in MODES.items()
+                }
+                first = {
+                    mode: statistics.median(r["first"] for r in runs)
+                    for mode, runs in results.items()
+                }
+                steady = statistics.median(r["second"] for r in results["cold"])
+                self.stdout.write(
+                    f"{name}: first request "
+                    + ", ".join(f"{mode} {ms:.1f} ms" for mode, ms in first.items())
+                    + f"; steady state {steady:.1f} ms"
+                )
+            for mode in ("warm", "replay"):
+                warmup = self.spawn(MODES[mode], "get", "/", user.id)["warmup"]
+                self.stdout.write(
+                    f"{mode} start-up: "
+                    + ", ".join(f"{step} {ms:.1f} ms" for step, ms in warmup.items())
+                )
+        finally:
+            post.delete()
+            user.delete()
+
+    def spawn(self, env, method, path, user_id):
+        output = subprocess.run(
+            [
+                sys.executable,
+                str(Path(settings.BASE_DIR) / "manage.py"),
+                "bench_warmup",
+                "--child",
+                method,
+                path,
+                str(user_id),
+            ],
+            env={**os.environ, **env},
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        return json.loads(output.splitlines()[-1])
+
+    def child(self, method, path, user_id):
+        # No query: whether a connection is open yet is part of what's measured.
+        requests = client(User(id=user_id))
+        # Like a server (wey/wsgi.py), load the middleware and warm up before
+        # the first request.
+        requests.handler.load_middleware()
+        warm_up_server()
+        # A common password: the form checks it, rejects it and saves nothing.
+        data = {"name": "bench", "password1": "password", "password2": "password"}
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            getattr(requests, method)(path, data if method == "post" else None)
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            json.dumps(
+                {
+                    "first": timings[0],
+                    "second": timings[1],
+                    "warmup": apps.get_app_config("wey").warmup_timings,
+                }
+            )
+        )
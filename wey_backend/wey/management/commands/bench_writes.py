@@ -0,0 +1,83 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import User
+from posts.models import Comment, Like, Post
+
+
+class Command(BaseCommand):
+    help = "Measure like/comment write throughput against the configured database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--ops", type=int, default=500, help="writes per thread")
+        parser.add_argument(
+            "--reconnect",
+            action="store_true",
+            help="close the connection after every write, like CONN_MAX_AGE=0",
+        )
+        parser.add_argument(
+            "--journal-mode",
+            help="override SQLITE_PRAGMAS['journal_mode'] (e.g. delete, wal)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and str(
+            connection.settings_dict["NAME"]
+        ) == str(settings.BASE_DIR / "db.sqlite3"):
+            raise CommandError(
+                "Refusing to write to the committed db.sqlite3, "
+                "set WEY_DB_NAME to a copy of it."
+            )
+        if options["journal_mode"]:
+            settings.SQLITE_PRAGMAS["journal_mode"] = options["journal_mode"]
+            settings.SQLITE_PRAGMAS["synchronous"] = (
+                "normal" if options["journal_mode"].lower() == "wal" else "full"
+            )
+            connection.close()
+
+        users = [
+            User.objects.create_user(
+                name=f"bench{i}", email=f"bench-{i}-{time.time_ns()}@bench.local"
+            )
+            for i in range(options["threads"])
+        ]
+        post = Post.objects.create(body="bench", created_by=users[0])
+        errors = []
+
+        def writer(user):
+            try:
+                for i in range(options["ops"]):
+                    if i % 2:
+                        Comment.objects.create(body="bench", created_by=user, post=post)
+                    else:
+                        Like.objects.create(created_by=user, post=post)
+                    if options["reconnect"]:
+                        connection.close()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = options["threads"] * options["ops"]
+        post.delete()
+        User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self.stdout.write(
+            f"{connection.vendor} journal_mode={settings.SQLITE_PRAGMAS['journal_mode']} "
+            f"reconnect={options['reconnect']} threads={options['threads']}: "
+            f"{total} writes in {elapsed:.2f}s = {total / elapsed:.0f} writes/s, "
+            f"{len(errors)} errors"
+        )
@@ -0,0 +1,34 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .routers import get_authenticated_user, is_read_only, pin_to_primary, routing_for
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with routing_for(request):
+            response = self.get_response(request)
+        self.process_response(request, response)
+        return response
+
+    async def __acall__(self, request):
+        with routing_for(request):
+            response = await self.get_response(request)
+        self.process_response(request, response)
+        return response
+
+    def process_response(self, request, response):
+        if not is_read_only(request) and response.status_code < 400:
+            user = get_authenticated_user(request)
+            if user is not None:
+                pin_to_primary(user)
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def encode_cursor(value, id):
+    """An opaque cursor for the row after (value, id) in a keyset scan."""
+    data = json.dumps([value.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(datetime, UUID) from encode_cursor(), ValueError if it isn't one."""
+    try:
+        value, id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(cursor) from e
+    if not isinstance(value, str) or not isinstance(id, str):
+        raise ValueError(cursor)
+    value = parse_datetime(value)
+    if value is None:
+        raise ValueError(cursor)
+    return value, uuid.UUID(id)
+
+
+def get_cursor(request, name="before"):
+    """The decoded ?before= cursor, None if absent. Invalid ones are a 400."""
+    cursor = request.query_params.get(name)
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise ValidationError({name: ["Invalid cursor."]})
+
+
+def before_cursor(queryset, field, cursor, id_field="pk"):
+    """
+    `queryset` newest first by (field, id_field), limited to the rows after
+    `cursor`. The id breaks ties, so rows sharing a timestamp with the end
+    of a page are neither skipped nor repeated.
+    """
+    queryset = queryset.order_by(f"-{field}", f"-{id_field}")
+    if cursor is None:
+        return queryset
+    value, id = cursor
+    return queryset.filter(
+        Q(**{f"{field}__lt": value}) | Q(**{field: value, f"{id_field}__lt": id})
+    )
@@ -0,0 +1,104 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+_current_request = ContextVar("wey_current_request", default=None)
+
+
+def _sticky_key(user_id):
+    return f"replica:sticky:{user_id}"
+
+
+def pin_to_primary(user):
+    cache.set(_sticky_key(user.pk), True, settings.READ_YOUR_WRITES_SECONDS)
+
+
+@contextmanager
+def routing_for(request):
+    token = _current_request.set(request)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+def get_authenticated_user(request):
+    # Only trust a user DRF has already resolved. Touching Django's lazy session
+    # user here would run a query and re-enter the router.
+    user = request.__dict__.get("user")
+    if issubclass(type(user), AbstractBaseUser):
+        return user
+    return None
+
+
+def _target(settings_dict):
+    return settings_dict["NAME"], settings_dict.get("HOST")
+
+
+def _replicas():
+    # A replica that points at the primary's database (e.g. a test mirror) would
+    # only add a second connection that cannot see the primary's open transaction.
+    # Compares connection.settings_dict, the only place a test mirror gets the
+    # primary's settings.
+    primary = _target(connections[DEFAULT_DB_ALIAS].settings_dict)
+    return [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if alias not in connections.settings
+        or _target(connections[alias].settings_dict) != primary
+    ]
+
+
+def is_read_only(request):
+    """
+    Whether `request` only reads: a safe method, or a view that declares
+    `read_only = True` although it takes a POST (e.g. BatchView).
+    """
+    if request.method in SAFE_METHODS:
+        return True
+    view_class = getattr(getattr(request, "resolver_match", None), "func", None)
+    return getattr(getattr(view_class, "cls", None), "read_only", False)
+
+
+def _use_primary(request):
+    if not is_read_only(request):
+        return True
+
+    if "_use_primary" not in request.__dict__:
+        user = get_authenticated_user(request)
+        if user is None:
+            return False
+        request._use_primary = bool(cache.get(_sticky_key(user.pk)))
+    return request._use_primary
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads made while serving a GET (or a read-only view, see
+    is_read_only()) to a replica and everything else to the primary. Requests outside the middleware (shell, management commands, tests)
+    always use the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        request = _current_request.get()
+        if request is None:
+            return None
+        replicas = _replicas()
+        if not replicas or _use_primary(request):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Tests write impressions through (and so skip them) unless they opt in with
+    override_settings: a flush thread would write outside the test's
+    transaction.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.IMPRESSIONS_FLUSH_MS = 0
@@ -0,0 +1,168 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _parse(value):
+    """ "id,created_by.name" -> {"id": {}, "created_by": {"name": {}}}"""
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _path(serializer):
+    """Field names from the root serializer down to this one."""
+    names = []
+    while serializer.parent is not None:
+        if serializer.field_name:
+            names.append(serializer.field_name)
+        serializer = serializer.parent
+    return reversed(names)
+
+
+def _spec(serializer, param):
+    """
+    The part of `?fields=` or `?expand=` that applies to this (possibly nested)
+    serializer. None means the parameter doesn't restrict it.
+    """
+    context = serializer.context
+    value = context.get(param)
+    if value is None and "request" in context:
+        value = context["request"].query_params.get(param)
+    if value is None:
+        return None
+    tree = _parse(value)
+    path = list(_path(serializer))
+    if context.get("sparse_root"):
+        path.insert(0, context["sparse_root"])
+    for name in path:
+        tree = tree.get(name)
+        if not tree:
+            # For fields, a nested object selected without sub-fields is kept
+            # whole. For expand, an expanded object's own relations collapse.
+            return {} if param == "expand" else None
+    return tree
+
+
+class SparseFieldsMixin:
+    """
+    Let the client choose what it gets back:
+
+    - `?fields=id,body,created_by.name` keeps only the listed fields. A dotted
+      path selects fields of a nested object, a bare nested name keeps all of
+      it.
+    - `?expand=created_by` embeds only the listed nested objects and renders
+      every other one as its id. Fields selected with a dotted path count as
+      expanded.
+
+    Without either parameter the representation is unchanged. Outside a request
+    the same strings can be passed as context["fields"] and context["expand"].
+    Views that return several serializers under top-level keys pass that key as
+    context["sparse_root"], so paths start with it: `?fields=posts.id,user.name`.
+    Pair it with sparse_queryset() so unrequested columns and joins are not
+    loaded either.
+    """
+
+    # Model columns each SerializerMethodField reads, for sparse_queryset().
+    # Method fields missing here disable the .only() pruning.
+    method_sources = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = _spec(self, "fields")
+        if selected:
+            fields = {name: field for name, field in fields.items() if name in selected}
+
+        expanded = _spec(self, "expand")
+        if expanded is not None:
+            for name, field in list(fields.items()):
+                if name in expanded or (selected and selected.get(name)):
+                    continue
+                many = isinstance(field, serializers.ListSerializer)
+                if isinstance(
+                    field.child if many else field, serializers.BaseSerializer
+                ):
+                    kwargs = {"source": field.source} if field.source else {}
+                    fields[name] = serializers.PrimaryKeyRelatedField(
+                        read_only=True, many=many, **kwargs
+                    )
+        return fields
+
+
+def is_requested(serializer, path):
+    """Whether the dotted field path is part of the serializer's output."""
+    for name in path.split("."):
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        if not isinstance(serializer, serializers.BaseSerializer):
+            return False
+        serializer = serializer.fields.get(name)
+        if serializer is None:
+            return False
+    return True
+
+
+def _collect(serializer, model, prefix, only, related):
+    """
+    Add the columns and forward joins the serializer reads to `only` and
+    `related`. Returns False if some field's columns can't be known.
+    """
+    complete = True
+    for name, field in serializer.fields.items():
+        if isinstance(
+            field, (serializers.ListSerializer, serializers.ManyRelatedField)
+        ):
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            sources = getattr(serializer, "method_sources", {}).get(name)
+            if sources is None:
+                complete = False
+            else:
+                only.extend(prefix + source for source in sources)
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            complete = False
+            continue
+        if not model_field.concrete:
+            continue
+        only.append(prefix + field.source)
+        if isinstance(field, serializers.BaseSerializer) and model_field.is_relation:
+            related.append(prefix + field.source)
+            complete &= _collect(
+                field,
+                model_field.related_model,
+                f"{prefix}{field.source}__",
+                only,
+                related,
+            )
+    return complete
+
+
+def sparse_queryset(queryset, serializer):
+    """
+    Limit `queryset` to what `serializer` will render: select_related() for
+    embedded foreign keys and, when every field's columns are known, .only()
+    for the columns.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    only, related = [], []
+    complete = _collect(serializer, queryset.model, "", only, related)
+    if related:
+        queryset = queryset.select_related(*related)
+    if complete:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+class BatchSerializer(serializers.Serializer):
+    MAX_BATCH_SIZE = 20
+
+    requests = serializers.ListField(
+        child=serializers.CharField(), min_length=1, max_length=MAX_BATCH_SIZE
+    )
@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -60,16 +63,27 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework_simplejwt",
     "corsheaders",
+    "wey.apps.WeyConfig",
     "accounts.apps.AccountsConfig",
     "posts",
     "search",
+    "realtime",
+    "chat",
+    "notifications",
+    "exports",
+    "deletions",
+    "profiling",
+    "archive",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "profiling.middleware.ProfilingMiddleware",
+    "wey.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "wey.middleware.ReplicaRoutingMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -100,13 +114,219 @@ WSGI_APPLICATION = "wey.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# The profile is picked from the environment so the same settings work for local
+# SQLite development and a Postgres deployment. Connections are kept open for
+# WEY_DB_CONN_MAX_AGE seconds and health checked before being reused.
+
+DB_ENGINE = os.environ.get("WEY_DB_ENGINE", "sqlite")
+DB_CONN_MAX_AGE = int(os.environ.get("WEY_DB_CONN_MAX_AGE", "60"))
+
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("WEY_DB_NAME", "wey"),
+            "USER": os.environ.get("WEY_DB_USER", "wey"),
+            "PASSWORD": os.environ.get("WEY_DB_PASSWORD", ""),
+            "HOST": os.environ.get("WEY_DB_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("WEY_DB_PORT", "5432"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+    # psycopg 3 connection pool, only understood by Django 5.1+. Persistent
+    # connections are mutually exclusive with the pool, so older versions keep
+    # using CONN_MAX_AGE (or an external pooler such as pgbouncer).
+    if os.environ.get("WEY_DB_POOL") == "1" and django.VERSION >= (5, 1):
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("WEY_DB_POOL_MIN", "2")),
+            "max_size": int(os.environ.get("WEY_DB_POOL_MAX", "10")),
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("WEY_DB_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # Seconds a writer waits on a locked database before erroring.
+                "timeout": 20,
+            },
+        }
+    }
+
+# Read replica. WEY_DB_REPLICA is the replica host for Postgres or a second
+# database file for SQLite. Tests mirror it onto the primary.
+DATABASE_REPLICAS = []
+
+if os.environ.get("WEY_DB_REPLICA"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST" if DB_ENGINE == "postgres" else "NAME": os.environ["WEY_DB_REPLICA"],
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_REPLICAS = ["replica"]
+
+DATABASE_ROUTERS = ["wey.routers.PrimaryReplicaRouter"]
+
+# Seconds a user's reads stay on the primary after they wrote something, so they
+# see their own post or like even if the replica lags behind.
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("WEY_READ_YOUR_WRITES_SECONDS", "5"))
+
+# PRAGMAs applied to every new SQLite connection, see wey/db.py. Switching to
+# WAL is the default. The committed db.sqlite3 is stored in WAL mode already,
+# so opening it doesn't rewrite its header. Tests run on their own database and
+# the write benchmark refuses the committed file.
+# synchronous=NORMAL is only durable under WAL, other journals keep FULL.
+SQLITE_JOURNAL_MODE = os.environ.get("WEY_SQLITE_JOURNAL_MODE", "wal").lower()
+SQLITE_PRAGMAS = {
+    "journal_mode": SQLITE_JOURNAL_MODE,
+    "synchronous": "normal" if SQLITE_JOURNAL_MODE == "wal" else "full",
+    "busy_timeout": 20000,
+    "cache_size": -20000,
+    "temp_store": "memory",
+    "mmap_size": 134217728,
 }
 
+REDIS_URL = os.environ.get("WEY_REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# Default lifetime of responses cached with wey.cache.cache_response. Entries
+# are also invalidated by version bumps, this only bounds how long e.g. the
+# "5 minutes ago" in a cached post can drift.
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Sampling profiler (profiling/). A request is profiled if a staff user sends
+# an X-Profile header, or at random at the rate given here for its view, e.g.
+# WEY_PROFILE_RATES="posts.views.PostListView=0.01,search.views.SearchView=0.05".
+PROFILING_SAMPLE_RATES = {
+    view: float(rate)
+    for view, _, rate in (
+        item.partition("=")
+        for item in os.environ.get("WEY_PROFILE_RATES", "").split(",")
+        if item
+    )
+}
+PROFILING_INTERVAL_MS = float(os.environ.get("WEY_PROFILE_INTERVAL_MS", "5"))
+# How many of the latest profiles the hot function summaries aggregate.
+PROFILING_AGGREGATE_PROFILES = 200
+# Older profiles of a view are deleted as new ones are stored.
+PROFILING_KEEP_PER_VIEW = 1000
+
+
+# Friend id sets cached by accounts.utils.get_friend_ids. They are versioned
+# like cached responses, so this only bounds memory use.
+FRIEND_IDS_CACHE_TIMEOUT = 3600
+
+
+# Response compression (wey/compression.py). Encodings in order of preference;
+# brotli and zstd are used when the `brotli` / `zstandard` packages are
+# installed. Bodies smaller than COMPRESSION_MIN_SIZE bytes go out as they are.
+COMPRESSION_ENCODINGS = ["br", "zstd", "gzip"]
+COMPRESSION_LEVELS = {"br": 5, "zstd": 3, "gzip": 6}
+COMPRESSION_MIN_SIZE = 1024
+
+
+# Run independent sub-queries of aggregate endpoints on a thread pool, see
+# wey/concurrency.py.
+PARALLEL_SUBFETCH = os.environ.get("WEY_PARALLEL_SUBFETCH") == "1"
+SUBFETCH_WORKERS = int(os.environ.get("WEY_SUBFETCH_WORKERS", "8"))
+
+
+# Warm-up run by wsgi.py and asgi.py when a server process starts
+# (wey/warmup.py), so the first requests after a deploy don't build URL
+# resolvers, serializer fields, translations and password validators.
+# WARMUP_REQUESTS are paths fetched through the whole stack, as WARMUP_USER
+# (an email) if set; views record what that user sees, so use a dedicated
+# account. Set WEY_WARMUP_PRELOAD=1 when the application is imported by a
+# pre-fork master (gunicorn --preload), so the master's database connections
+# are closed instead of being inherited by the workers.
+WARMUP = os.environ.get("WEY_WARMUP") == "1"
+WARMUP_PRELOAD = os.environ.get("WEY_WARMUP_PRELOAD") == "1"
+WARMUP_REQUESTS = [p for p in os.environ.get("WEY_WARMUP_REQUESTS", "").split(",") if p]
+WARMUP_USER = os.environ.get("WEY_WARMUP_USER")
+
+
+# How often buffered writes (see wey/buffers.py) are flushed to the database.
+# 0 writes through immediately.
+WRITE_BUFFER_FLUSH_MS = int(os.environ.get("WEY_WRITE_BUFFER_FLUSH_MS", "0"))
+# The same for post impressions (posts/impressions.py), on by default. Views
+# are only counted while this is on: writing each one through would add writes
+# to every feed page and response cache hit. wey.runner turns it off in tests.
+IMPRESSIONS_FLUSH_MS = int(os.environ.get("WEY_IMPRESSIONS_FLUSH_MS", "1000"))
+
+TEST_RUNNER = "wey.runner.TestRunner"
+
+
+# Likes, comments and friend requests for the same target within this many
+# seconds are shown as one notification ("X and 312 others liked your post").
+NOTIFICATION_WINDOW_SECONDS = 6 * 60 * 60
+
+
+# Where finished account exports (exports app) are written. Built by the
+# `process_exports` worker, never inside a request.
+EXPORT_ROOT = Path(os.environ.get("WEY_EXPORT_ROOT", BASE_DIR / "var" / "exports"))
+# A running export that hasn't sent a heartbeat for this long lost its worker
+# and is retried, up to EXPORT_MAX_ATTEMPTS times in all.
+EXPORT_STALE_SECONDS = 600
+EXPORT_MAX_ATTEMPTS = 3
+
+
+# Deleted accounts and posts are hidden right away and purged later by the
+# `process_deletions` worker, this many rows per statement.
+DELETION_BATCH_SIZE = 500
+# A running deletion that hasn't reported progress for this long lost its
+# worker and is queued again.
+DELETION_STALE_SECONDS = 600
+
+
+# Posts older than ARCHIVE_AFTER_DAYS with no likes or comments since are moved
+# out of the hot tables by the `archive_old_posts` job, about
+# ARCHIVE_BATCH_SIZE rows per transaction.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("WEY_ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = 500
+
+
+# Ranked feed (PostListView ?mode=ranked). A post scores
+# (1 + likes * like_weight + comments * comment_weight) halved every
+# half_life_hours; posts older than max_age_days drop out of it.
+FEED_RANKING = {
+    "like_weight": 1.0,
+    "comment_weight": 2.0,
+    "half_life_hours": 24,
+    "max_age_days": 7,
+    "candidates": 200,
+    "page_size": 50,
+    "affinity_days": 30,
+}
+
+
+# Push channel for new posts, likes and comments. Use
+# realtime.broker.RedisBroker when running more than one process.
+REALTIME_BROKER = os.environ.get(
+    "WEY_REALTIME_BROKER", "realtime.broker.InProcessBroker"
+)
+REALTIME_HEARTBEAT_SECONDS = 15
+# How long a ticket from realtime.views.StreamTicketView can be used.
+REALTIME_TICKET_SECONDS = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -144,6 +364,21 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+
+# Uploads (attachments, avatars). Files are named by content hash and served
+# by wey.media.serve_media from signed URLs. With MEDIA_ACCEL set to
+# "x-accel-redirect" (nginx, an `internal` location at MEDIA_ACCEL_PREFIX
+# aliased to MEDIA_ROOT) or "x-sendfile" the front server sends the bytes.
+MEDIA_ROOT = Path(os.environ.get("WEY_MEDIA_ROOT", BASE_DIR / "var" / "media"))
+MEDIA_URL = "/media/"
+MEDIA_ACCEL = os.environ.get("WEY_MEDIA_ACCEL", "")
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+
+STORAGES = {
+    "default": {"BACKEND": "wey.media.ContentHashedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
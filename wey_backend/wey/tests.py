@@ -0,0 +1,504 @@
+import gzip
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.contrib import admin
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from accounts.utils import friends_changed
+from accounts.views import MeView
+from posts import counters, impressions
+from posts.models import Comment, CommentRevision, Like, Post
+
+from . import compression, warmup
+from .admin import EstimatedCountPaginator, ScalableModelAdmin
+from .cache import stats
+from .concurrency import gather
+from .ids import uuid7
+from .middleware import ReplicaRoutingMiddleware
+from .routers import PrimaryReplicaRouter, routing_for
+
+
+class UUID7Tests(SimpleTestCase):
+    def test_version_and_variant(self):
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_embeds_current_time(self):
+        ms = uuid7().int >> 80
+        self.assertAlmostEqual(ms / 1000, time.time(), delta=1)
+
+    def test_ids_increase(self):
+        ids = [uuid7() for _ in range(10000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_new_rows_use_uuid7(self):
+        self.assertEqual(Post._meta.pk.default, uuid7)
+        self.assertEqual(User._meta.pk.default, uuid7)
+
+
+class UUID7BackfillTests(TestCase):
+    def test_old_ids_follow_created_at(self):
+        user = User.objects.create_user(name="old", email="old@gmail.com")
+        post = Post.objects.create(body="Old", created_by=user)
+        comments = [
+            Comment.objects.create(
+                id=uuid.uuid4(), body=str(day), post=post, created_by=user
+            )
+            for day in range(5)
+        ]
+        for day, comment in enumerate(comments):
+            Comment.objects.filter(id=comment.id).update(
+                created_at=timezone.now() - timedelta(days=5 - day)
+            )
+        revision = CommentRevision.objects.create(comment=comments[0], body="Older")
+        Like.objects.create(id=uuid.uuid4(), post=post, created_by=user)
+
+        call_command("backfill_uuid7", "posts.Comment", "posts.Like", stdout=StringIO())
+
+        ids = list(Comment.objects.order_by("created_at").values_list("id", flat=True))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(id.version == 7 for id in ids))
+        self.assertEqual(Like.objects.get().id.version, 7)
+        revision.refresh_from_db()
+        self.assertEqual(revision.comment_id, ids[0])
+        # Users and posts keep their ids.
+        self.assertTrue(Post.objects.filter(id=post.id).exists())
+
+
+class SQLitePragmaTests(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            # NORMAL (1) under WAL, FULL (2) with any other journal.
+            expected = 1 if settings.SQLITE_JOURNAL_MODE == "wal" else 2
+            self.assertEqual(cursor.fetchone()[0], expected)
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 20000)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            name="reader", email="reader@abc.com", password="foo"
+        )
+        cache.clear()
+
+    def db_for_read(self, request):
+        with routing_for(request):
+            return self.router.db_for_read(Post)
+
+    def test_reads_outside_a_request_use_primary(self):
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_get_reads_go_to_replica(self):
+        request = self.factory.get("/posts/")
+        request.user = self.user
+        self.assertEqual(self.db_for_read(request), "replica_1")
+
+    def test_write_requests_read_from_primary(self):
+        request = self.factory.post("/posts/create")
+        self.assertEqual(self.db_for_read(request), "default")
+        self.assertEqual(self.router.db_for_write(Post), "default")
+
+    def test_user_is_pinned_to_primary_after_a_write(self):
+        def view(request):
+            request.user = self.user
+            return HttpResponse(status=201)
+
+        ReplicaRoutingMiddleware(view)(self.factory.post("/posts/create"))
+
+        request = self.factory.get("/posts/")
+        request.user = self.user
+        self.assertEqual(self.db_for_read(request), "default")
+
+        other = User.objects.create_user(
+            name="other", email="other@abc.com", password="foo"
+        )
+        request = self.factory.get("/posts/")
+        request.user = other
+        self.assertEqual(self.db_for_read(request), "replica_1")
+
+    def test_batch_reads_from_replica_without_pinning(self):
+        def view(request):
+            request.user = self.user
+            self.assertEqual(self.router.db_for_read(Post), "replica_1")
+            return HttpResponse()
+
+        request = self.factory.post(reverse("batch"))
+        request.resolver_match = resolve(reverse("batch"))
+        ReplicaRoutingMiddleware(view)(request)
+
+        request = self.factory.get("/posts/")
+        request.user = self.user
+        self.assertEqual(self.db_for_read(request), "replica_1")
+
+    def test_test_mirror_of_primary_is_skipped(self):
+        # Like set_as_test_mirror(): the replica's own settings keep their
+        # NAME, only the connection's settings_dict points at the primary.
+        replica = {**connections.settings["default"], "NAME": "replica.sqlite3"}
+        with mock.patch.dict(connections.settings, {"replica_1": replica}):
+            self.addCleanup(delattr, connections._connections, "replica_1")
+            connections["replica_1"].settings_dict = connection.settings_dict
+            request = self.factory.get("/posts/")
+            request.user = self.user
+            self.assertEqual(self.db_for_read(request), "default")
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        stats.clear()
+        self.user = User.objects.create_user(
+            name="reader", email="reader@abc.com", password="foo"
+        )
+        self.post = Post.objects.create(body="Viral", created_by=self.user)
+        self.client.force_authenticate(self.user)
+
+    def get_post(self):
+        return self.client.get(reverse("post_detail", args=[self.post.id]))
+
+    def test_hit_skips_queries_and_rendering(self):
+        miss = self.get_post()
+        self.assertEqual(miss["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            hit = self.get_post()
+        self.assertEqual(hit["X-Cache"], "HIT")
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(hit["Content-Type"], miss["Content-Type"])
+
+    def test_like_bumps_version(self):
+        self.get_post()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("like_post", args=[self.post.id]))
+
+        response = self.get_post()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["post"]["likes_count"], 1)
+
+    def test_counter_flush_bumps_version(self):
+        self.get_post()
+        # Another process's flush: no like view ran here.
+        with self.captureOnCommitCallbacks(execute=True):
+            counters._apply({self.post.id: (1, 0, 1.0)})
+
+        response = self.get_post()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["post"]["likes_count"], 1)
+
+    def test_friendship_leaves_search_cached(self):
+        response = self.client.post(reverse("search"), {"query": "reader"})
+        self.assertEqual(response.json()["users"][0]["friends_count"], 0)
+        friend = User.objects.create_user(name="friend", email="friend@abc.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.friends.add(friend)
+            friends_changed(self.user.id, friend.id)
+
+        # The count catches up when the entry expires.
+        response = self.client.post(reverse("search"), {"query": "reader"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.json()["users"][0]["friends_count"], 0)
+
+    def test_missing_post_is_not_cached(self):
+        Post.objects.filter(id=self.post.id).update(is_deleted=True)
+        self.assertEqual(self.get_post().status_code, 404)
+        self.assertEqual(self.get_post().status_code, 404)
+        view = "posts.views.PostDetailView.get"
+        self.assertEqual(stats[(view, "miss")], 2)
+
+    def test_stats_are_staff_only(self):
+        self.get_post()
+        self.get_post()
+        self.assertEqual(self.client.get(reverse("cache_stats")).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("cache_stats"))
+        self.assertEqual(
+            response.data["posts.views.PostDetailView.get"],
+            {"hit": 1, "miss": 1, "hit_ratio": 0.5},
+        )
+
+
+@override_settings(COMPRESSION_ENCODINGS=["gzip"], COMPRESSION_MIN_SIZE=200)
+class CompressionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            name="reader", email="reader@abc.com", password="foo"
+        )
+        self.post = Post.objects.create(body="Viral " * 100, created_by=self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_negotiate(self):
+        self.assertEqual(compression.negotiate("gzip, deflate"), "gzip")
+        self.assertEqual(compression.negotiate("*"), "gzip")
+        self.assertIsNone(compression.negotiate("gzip;q=0, deflate"))
+        self.assertIsNone(compression.negotiate(""))
+
+    def test_large_json_is_compressed(self):
+        response = self.client.get(reverse("posts"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn(b"Viral", gzip.decompress(response.content))
+
+    def test_small_or_unaccepted_responses_are_left_alone(self):
+        response = self.client.get(reverse("posts"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+        self.post.delete()
+        response = self.client.get(reverse("posts"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_cached_response_is_compressed_once(self):
+        url = reverse("post_detail", args=[self.post.id])
+        with mock.patch.object(
+            compression, "compress", wraps=compression.compress
+        ) as compress:
+            miss = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            hit = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(hit["X-Cache"], "HIT")
+        self.assertEqual(hit["Content-Encoding"], "gzip")
+        self.assertEqual(hit.content, miss.content)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), MEDIA_ACCEL="")
+class MediaTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            name="reader", email="reader@abc.com", password="foo"
+        )
+        self.user.avatar.save("me.PNG", ContentFile(b"0123456789"))
+
+    def test_names_are_content_hashes(self):
+        self.assertRegex(self.user.avatar.name, r"^avatars/[0-9a-f]{32}\.png$")
+        other = User.objects.create_user(
+            name="other", email="other@abc.com", password="foo"
+        )
+        other.avatar.save("me.PNG", ContentFile(b"something else"))
+        self.assertNotEqual(other.avatar.name, self.user.avatar.name)
+
+    def test_serve_signed_url_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.user.avatar.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertIn("immutable", response["Cache-Control"])
+
+        response = self.client.get(self.user.avatar.url, HTTP_RANGE="bytes=2-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+
+    def test_bad_signature(self):
+        url = self.user.avatar.url.split("?")[0]
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url, {"s": "forged"}).status_code, 404)
+
+    def test_front_server_offload(self):
+        name = self.user.avatar.name
+        with override_settings(MEDIA_ACCEL="x-accel-redirect"):
+            response = self.client.get(self.user.avatar.url)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{name}")
+        self.assertEqual(response.content, b"")
+
+        with override_settings(MEDIA_ACCEL="x-sendfile"):
+            response = self.client.get(self.user.avatar.url)
+        self.assertEqual(response["X-Sendfile"], self.user.avatar.path)
+
+
+class BatchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            name="reader", email="reader@abc.com", password="foo"
+        )
+        self.post = Post.objects.create(body="Hello", created_by=self.user)
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *urls):
+        return self.client.post(
+            reverse("batch"), {"requests": list(urls)}, format="json"
+        )
+
+    def test_responses_match_individual_requests(self):
+        post_url = reverse("post_detail", args=[self.post.id])
+        self.client.get(post_url)  # The second fetch is a cache hit.
+        urls = [reverse("me"), reverse("posts") + "?fields=id,body", post_url]
+
+        response = self.batch(*urls)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["responses"]
+        self.assertEqual([result["path"] for result in results], urls)
+        for url, result in zip(urls, results):
+            self.assertEqual(result["status"], 200)
+            self.assertEqual(result["body"], self.client.get(url).json())
+
+    def test_sub_requests_run_as_the_caller(self):
+        other = User.objects.create_user(
+            name="other", email="other@abc.com", password="foo"
+        )
+        self.client.force_authenticate(other)
+        response = self.batch(reverse("me"))
+        self.assertEqual(response.json()["responses"][0]["body"]["name"], "other")
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.batch(reverse("me")).status_code, 401)
+
+    def test_errors_are_per_sub_request(self):
+        missing = reverse("post_detail", args=[uuid.uuid4()])
+        response = self.batch(missing, "/nowhere/", "https://example.com/posts/")
+        statuses = [result["status"] for result in response.json()["responses"]]
+        self.assertEqual(statuses, [404, 404, 400])
+
+    def test_crash_fails_only_its_sub_request(self):
+        with mock.patch.object(
+            MeView, "get", side_effect=RuntimeError
+        ), self.assertLogs("wey.batch"):
+            response = self.batch(reverse("me"), reverse("posts"))
+        statuses = [result["status"] for result in response.json()["responses"]]
+        self.assertEqual(statuses, [500, 200])
+
+    @override_settings(IMPRESSIONS_FLUSH_MS=60000)
+    def test_views_are_counted_after_the_sub_requests(self):
+        def gather_then_check(*funcs):
+            results = gather(*funcs)
+            # Nothing written from the (possibly parallel) sub-requests.
+            self.assertIsNone(impressions.buffer.pending(self.post.id))
+            return results
+
+        post_url = reverse("post_detail", args=[self.post.id])
+        with mock.patch.object(impressions.buffer, "_thread", object()), mock.patch(
+            "wey.views.gather", gather_then_check
+        ):
+            self.batch(post_url)
+        self.assertEqual(impressions.buffer.pending(self.post.id)[0], 1)
+        impressions.buffer.flush()
+
+    def test_only_api_views_are_batched(self):
+        response = self.batch(reverse("batch"), reverse("media", args=["a.png"]))
+        statuses = [result["status"] for result in response.json()["responses"]]
+        self.assertEqual(statuses, [400, 400])
+
+    def test_limits(self):
+        self.assertEqual(self.batch().status_code, 400)
+        self.assertEqual(self.batch(*[reverse("me")] * 21).status_code, 400)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            name="reader", email="reader@abc.com", password="foo"
+        )
+        for i in range(5):
+            Post.objects.create(body=str(i), created_by=self.user)
+
+    def test_small_tables_are_counted(self):
+        paginator = EstimatedCountPaginator(Post.objects.order_by("-pk"), 2)
+        self.assertEqual(paginator.count, 5)
+
+    @mock.patch.object(EstimatedCountPaginator, "EXACT_COUNT_LIMIT", 2)
+    def test_large_tables_are_estimated(self):
+        paginator = EstimatedCountPaginator(Post.objects.order_by("-pk"), 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 5)
+        self.assertNotIn("COUNT", queries[-1]["sql"])
+
+    @mock.patch.object(EstimatedCountPaginator, "FILTERED_COUNT_LIMIT", 3)
+    def test_filtered_counts_are_capped(self):
+        queryset = Post.objects.filter(created_by=self.user).order_by("-pk")
+        self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 3)
+
+
+class ScalableModelAdminTests(TestCase):
+    def test_newest_first_reads_an_index(self):
+        request = RequestFactory().get("/")
+        orderings = {
+            model: model_admin.get_ordering(request)
+            for model, model_admin in admin.site._registry.items()
+            if isinstance(model_admin, ScalableModelAdmin)
+        }
+        self.assertEqual(orderings[Post], ("-created_at",))
+        self.assertEqual(orderings[User], ("-date_joined",))
+        self.assertEqual(orderings[Like], ("-pk",))
+        for model, ordering in orderings.items():
+            field = ordering[0].lstrip("-")
+            if field != "pk":
+                leading = [index.fields[0] for index in model._meta.indexes]
+                self.assertIn(field, leading, model)
+
+
+class WarmupTests(TestCase):
+    def test_runs_every_step(self):
+        timings = warmup.warm_up()
+        self.assertEqual(list(timings), [name for name, _ in warmup.STEPS])
+
+    def test_failing_step_is_skipped(self):
+        steps = [("broken", mock.Mock(side_effect=RuntimeError)), ("ok", mock.Mock())]
+        with mock.patch.object(warmup, "STEPS", steps), self.assertLogs(
+            "wey.warmup", "ERROR"
+        ):
+            timings = warmup.warm_up()
+        self.assertEqual(list(timings), ["broken", "ok"])
+        steps[1][1].assert_called_once()
+
+    def test_server_warms_up_when_enabled(self):
+        config = apps.get_app_config("wey")
+        self.addCleanup(setattr, config, "warmup_timings", None)
+        with mock.patch.object(warmup, "STEPS", []), mock.patch.object(
+            warmup.connections, "close_all"
+        ) as close_all:
+            warmup.warm_up_server()
+            self.assertIsNone(config.warmup_timings)
+            with override_settings(WARMUP=True):
+                warmup.warm_up_server()
+                # A worker keeps the connections it opened.
+                close_all.assert_not_called()
+                with override_settings(WARMUP_PRELOAD=True):
+                    warmup.warm_up_server()
+        self.assertEqual(config.warmup_timings, {})
+        # Forked workers must not inherit the master's connections.
+        close_all.assert_called_once()
+
+    def test_replays_requests_as_user(self):
+        user = User.objects.create_user(
+            name="warmup", email="warmup@gmail.com", password="test"
+        )
+        statuses = []
+        get = warmup.Client.get
+
+        def record(client, path, *args, **kwargs):
+            response = get(client, path, *args, **kwargs)
+            statuses.append((path, response.status_code))
+            return response
+
+        with override_settings(
+            WARMUP_REQUESTS=[reverse("posts"), reverse("me")],
+            WARMUP_USER=user.email,
+        ), mock.patch.object(warmup.Client, "get", record):
+            warmup.replay_requests()
+        self.assertEqual(statuses, [(reverse("posts"), 200), (reverse("me"), 200)])
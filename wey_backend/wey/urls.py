@@ -14,12 +14,24 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
 from django.contrib import admin
 from django.urls import path, include
 
+from .media import serve_media
+from .views import BatchView, CacheStatsView
+
 urlpatterns = [
     path("accounts/", include("accounts.urls")),
     path("admin/", admin.site.urls),
     path("posts/", include("posts.urls")),
     path("search/", include("search.urls")),
+    path("realtime/", include("realtime.urls")),
+    path("chat/", include("chat.urls")),
+    path("notifications/", include("notifications.urls")),
+    path("exports/", include("exports.urls")),
+    path("profiling/", include("profiling.urls")),
+    path("batch", BatchView.as_view(), name="batch"),
+    path("cache/stats", CacheStatsView.as_view(), name="cache_stats"),
+    path("media/<path:name>", serve_media, name="media"),
 ]
@@ -0,0 +1,64 @@
+import functools
+
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .batch import dispatch
+from .buffers import deferred
+from .cache import stats
+from .concurrency import gather
+from .serializers import BatchSerializer
+
+
+class CacheStatsView(APIView):
+    """Response cache hits and misses by view, for this process."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        views = {}
+        for (view, outcome), count in sorted(stats.items()):
+            views.setdefault(view, {"hit": 0, "miss": 0})[outcome] = count
+        for counts in views.values():
+            counts["hit_ratio"] = round(
+                counts["hit"] / (counts["hit"] + counts["miss"]), 3
+            )
+        return Response(views)
+
+
+class BatchView(APIView):
+    """
+    Run several GET requests in one round trip, e.g. everything a page needs
+    on load:
+
+        POST /batch {"requests": ["/accounts/me/", "/posts/?page=1"]}
+
+    The client is authenticated once and each sub-request runs its view in
+    this process as that user. Responses come back in the same order. With
+    PARALLEL_SUBFETCH on, sub-requests run concurrently (see gather()).
+    Only GETs are run, so the database router treats it as a read.
+    """
+
+    batchable = False
+    read_only = True
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        urls = serializer.validated_data["requests"]
+        # Views that count views (posts.impressions) write on this thread.
+        with deferred():
+            results = gather(
+                *(functools.partial(dispatch, request, url) for url in urls)
+            )
+        return Response(
+            {
+                "responses": [
+                    {"path": url, **result} for url, result in zip(urls, results)
+                ]
+            }
+        )
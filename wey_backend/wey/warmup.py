@@ -0,0 +1,135 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.db import connections
+from django.test import Client
+from django.urls import get_resolver
+from django.utils import timezone
+from django.utils.timesince import timesince
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+
+def warm_urls():
+    # Compiles every pattern and builds the reverse lookup tables.
+    get_resolver().reverse_dict
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def warm_serializers():
+    """Build the fields of every serializer defined in the project's apps."""
+    project = {
+        config.name
+        for config in apps.get_app_configs()
+        if config.path.startswith(str(settings.BASE_DIR))
+    }
+    for cls in set(_subclasses(serializers.BaseSerializer)):
+        if cls.__module__.split(".")[0] not in project:
+            continue
+        try:
+            cls(context={}).fields
+        except Exception:
+            # Serializers that need arguments warm up on their first request.
+            logger.debug("Could not warm up %s", cls.__qualname__, exc_info=True)
+
+
+def warm_translations():
+    # Loads the message catalogs of every installed app.
+    timesince(timezone.now() - timedelta(days=1))
+
+
+def warm_password_validators():
+    # CommonPasswordValidator reads its 20,000 passwords when created.
+    password_validation.get_default_password_validators()
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def client(user=None):
+    """A test client for requests to this process, authenticated as `user`."""
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    host = next(
+        (h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith(".")),
+        "localhost",
+    )
+    headers = {"HTTP_HOST": host}
+    if user is not None:
+        token = RefreshToken.for_user(user).access_token
+        headers["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return Client(**headers)
+
+
+def replay_requests():
+    """GET each of WARMUP_REQUESTS through the whole middleware stack."""
+    if not settings.WARMUP_REQUESTS:
+        return
+    user = None
+    if settings.WARMUP_USER:
+        user = apps.get_model(settings.AUTH_USER_MODEL).objects.get(
+            email=settings.WARMUP_USER
+        )
+    requests = client(user)
+    for path in settings.WARMUP_REQUESTS:
+        requests.get(path)
+
+
+STEPS = [
+    ("urls", warm_urls),
+    ("serializers", warm_serializers),
+    ("translations", warm_translations),
+    ("password_validators", warm_password_validators),
+    ("connections", open_connections),
+    ("requests", replay_requests),
+]
+
+
+def warm_up():
+    """
+    Run each step of STEPS and return how long each took, in ms. A failing
+    step is logged and skipped: a worker that starts cold is better than one
+    that doesn't start.
+    """
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        timings[name] = (time.perf_counter() - started) * 1000
+    logger.info(
+        "Warmed up in %.0f ms: %s",
+        sum(timings.values()),
+        ", ".join(f"{name} {ms:.1f} ms" for name, ms in timings.items()),
+    )
+    return timings
+
+
+def warm_up_server():
+    """
+    warm_up() if WARMUP is on. Called by wsgi.py and asgi.py once Django is
+    fully set up, so it runs in server processes only. Each worker that
+    imports the application itself keeps the connections it opened. With
+    WARMUP_PRELOAD this is a pre-fork master (gunicorn --preload): the workers
+    inherit everything it built, but must not share its database sockets, so
+    the connections are closed again.
+    """
+    if not settings.WARMUP:
+        return
+    apps.get_app_config("wey").warmup_timings = warm_up()
+    if settings.WARMUP_PRELOAD:
+        connections.close_all()